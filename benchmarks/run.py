@@ -0,0 +1,415 @@
+# File: benchmarks/run.py
+
+"""
+Benchmarks for the solver, plotter and unit converter hot paths.
+
+Each benchmark is timed timeit-style (auto-ranged loop count, several
+repeats) and reported as median/min/mean microseconds per call. Results are
+written as JSON and can be compared against a stored baseline; any benchmark
+whose median is slower than the baseline by more than the threshold counts
+as a regression and makes the run exit with status 1.
+
+    python -m benchmarks.run                                   # print a table
+    python -m benchmarks.run -o results.json --save-baseline benchmarks/baseline.json
+    python -m benchmarks.run --baseline benchmarks/baseline.json --threshold 0.25
+    python -m benchmarks.run -k solver -k units                # only matching names
+
+GUI benchmarks render through Qt's offscreen platform and Matplotlib's Agg
+canvas, so no display is needed.
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import warnings
+
+BENCHMARKS = []
+
+
+def benchmark(name):
+    """
+    Registers a benchmark. The decorated function does its setup and returns
+    the zero-argument callable to time.
+    """
+    def register(setup):
+        BENCHMARKS.append((name, setup))
+        return setup
+    return register
+
+
+def measure(func, repeat: int = 5, min_time: float = 0.1) -> dict:
+    """
+    Times func like timeit.Timer.autorange: the loop count grows until one
+    repeat takes at least min_time, then `repeat` repeats are recorded.
+    """
+    func()  # warm-up, not timed
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time or number >= 1 << 20:
+            break
+        number *= 2 if elapsed > min_time / 10 else 10
+
+    runs = [elapsed / number]
+    for _ in range(repeat - 1):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        runs.append((time.perf_counter() - start) / number)
+
+    return {
+        'median_us': round(statistics.median(runs) * 1e6, 3),
+        'min_us': round(min(runs) * 1e6, 3),
+        'mean_us': round(statistics.fmean(runs) * 1e6, 3),
+        'repeat': repeat,
+        'number': number,
+    }
+
+
+# --- Solver -----------------------------------------------------------------
+
+# case → (expression, tier that must answer it)
+SOLVER_CASES = {
+    'arithmetic': ("2*(3+4)/7 - 5^2", 'numeric'),
+    'trig_degrees': ("sin(30) + cos(60) * tan(45)", 'numeric'),
+    'functions': ("sqrt(2) + log(10) + exp(1) + 5!", 'numeric'),
+    'symbolic': ("x**2 + 2*x*y + y**2", 'sympy'),
+    'units': ("3 ft + 20 cm in m", 'units'),
+    'math_fallback': ("hypot(3, 4) + hypot(5, 12)", 'math'),  # SymPy has no hypot
+}
+
+
+def clear_solver_caches():
+    from logic import numeric, solver
+    solver.invalidate_expression_cache()
+    numeric._compile_cache.clear()
+
+
+def check_tier(expr, tier):
+    """
+    Fails the benchmark when expr is no longer answered by the tier it is
+    meant to time.
+    """
+    from logic.solver import evaluate_expression_tiered
+    actual = evaluate_expression_tiered(expr)[1]
+    if actual != tier:
+        raise RuntimeError(f"{expr!r} is answered by the {actual} tier, not {tier}")
+
+
+for _case, (_expr, _tier) in SOLVER_CASES.items():
+    @benchmark(f"solver.evaluate.cold.{_case}")
+    def _cold(expr=_expr, tier=_tier):
+        from logic.solver import evaluate_expression
+        check_tier(expr, tier)
+
+        def run():
+            clear_solver_caches()
+            evaluate_expression(expr)
+        return run
+
+    @benchmark(f"solver.evaluate.warm.{_case}")
+    def _warm(expr=_expr, tier=_tier):
+        from logic.solver import evaluate_expression
+        check_tier(expr, tier)
+        return lambda: evaluate_expression(expr)
+
+
+@benchmark("solver.parse_expr.uncached")
+def _parse():
+    from sympy.parsing.sympy_parser import parse_expr
+    from logic.solver import allowed_symbols, transformations
+    return lambda: parse_expr("sin(x)**2 + cos(x)**2 + tan(y/2)", local_dict=dict(allowed_symbols),
+                              transformations=transformations)
+
+
+def legacy_apply_degree_mode(expr):
+    # The tree rewrite degree mode used before degree_symbols, kept for comparison
+    from sympy import acos, asin, atan, cos, pi, sin, tan
+    return expr.replace(
+        sin, lambda x: sin(x * pi / 180)
+    ).replace(
+        cos, lambda x: cos(x * pi / 180)
+    ).replace(
+        tan, lambda x: tan(x * pi / 180)
+    ).replace(
+        asin, lambda x: asin(x) * 180 / pi
+    ).replace(
+        acos, lambda x: acos(x) * 180 / pi
+    ).replace(
+        atan, lambda x: atan(x) * 180 / pi
+    )
+
+
+DEGREE_CASES = {
+    'trig': "sin(x)**2 + cos(x)**2 + atan(y/2) + asin(z)",
+    'polynomial': " + ".join(f"{i}*x**{i}*y" for i in range(1, 40)),
+}
+
+for _case, _expr in DEGREE_CASES.items():
+    @benchmark(f"solver.degree_mode.rewrite.{_case}")
+    def _degree_rewrite(expr=_expr):
+        from sympy.parsing.sympy_parser import parse_expr
+        from logic.solver import allowed_symbols, transformations
+        return lambda: legacy_apply_degree_mode(
+            parse_expr(expr, local_dict=dict(allowed_symbols), transformations=transformations)
+        )
+
+    @benchmark(f"solver.degree_mode.table.{_case}")
+    def _degree_table(expr=_expr):
+        from sympy.parsing.sympy_parser import parse_expr
+        from logic.solver import degree_symbols, transformations
+        return lambda: parse_expr(expr, local_dict=dict(degree_symbols), transformations=transformations)
+
+
+REPEATED_FORMULA = "(sin(x) + sqrt(2)*y)^2 + exp(sin(x) + sqrt(2)*y) + cos(x)*(sin(x) + sqrt(2)*y)"
+
+
+@benchmark("solver.optimize_expression.codegen")
+def _optimize():
+    from logic import solver
+
+    def run():
+        solver._formulas.clear()
+        cache_dir, solver.formula_cache_dir = solver.formula_cache_dir, None
+        try:
+            solver.optimize_expression(REPEATED_FORMULA)
+        finally:
+            solver.formula_cache_dir = cache_dir
+    return run
+
+
+@benchmark("solver.evaluate_array.1e5")
+def _evaluate_array():
+    import numpy as np
+    from logic.solver import evaluate_array
+    rng = np.random.default_rng(0)
+    columns = {'x': rng.random(100_000) * 360, 'y': rng.random(100_000)}
+    return lambda: evaluate_array(REPEATED_FORMULA, columns)
+
+
+@benchmark("solver.batch.100")
+def _batch():
+    from logic.batch import evaluate_many
+    expressions = [f"{i} * sin({i}) + sqrt({i})" for i in range(100)]
+    return lambda: list(evaluate_many(expressions))
+
+
+# --- Plotting engine ----------------------------------------------------------
+
+@benchmark("plot.lambdify")
+def _lambdify():
+    from logic.plotting import PlotFunction
+    return lambda: PlotFunction("sin(a*x) * exp(-x**2/10) + y*cos(x)")
+
+
+@benchmark("plot.grid.2d.500")
+def _grid_2d():
+    from logic.plotting import compile_plot_function, linear_grid
+    func = compile_plot_function("sin(a*x) * exp(-x**2/10)")
+    x = linear_grid(-10.0, 10.0, 500)
+    return lambda: func(x, a=1.5)
+
+
+@benchmark("plot.grid.3d.100x100")
+def _grid_3d():
+    from logic.plotting import compile_plot_function, mesh_grid
+    func = compile_plot_function("sin(sqrt(x**2 + y**2) + a)")
+    X, Y = mesh_grid((-10.0, 10.0), (-10.0, 10.0), 100)
+    return lambda: func(X, Y, 1.5)
+
+
+@benchmark("plot.adaptive_sample.tan")
+def _adaptive():
+    from logic.plotting import adaptive_sample, compile_plot_function
+    func = compile_plot_function("tan(x)")
+    return lambda: adaptive_sample(func, -10.0, 10.0)
+
+
+# --- Graph view (offscreen Qt + Agg) -------------------------------------------
+
+_qt_app = None
+
+
+def graph_view():
+    global _qt_app
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    warnings.filterwarnings("ignore", message="Glyph .* missing from font")  # emoji titles
+    from PyQt5.QtWidgets import QApplication
+    from ui.graph_view import GraphView
+    _qt_app = QApplication.instance() or QApplication(sys.argv[:1])
+    view = GraphView()
+    view.resize(800, 600)
+    return view
+
+
+def render(view, expr):
+    view.expressions = [expr]
+    view.colors = ['blue']
+    view.plot_graphs()
+
+
+@benchmark("graph.plot_graphs.2d")
+def _plot_2d():
+    view = graph_view()
+    return lambda: render(view, "sin(a*x) * exp(-x**2/10)")
+
+
+@benchmark("graph.plot_graphs.3d")
+def _plot_3d():
+    view = graph_view()
+    return lambda: render(view, "sin(sqrt(x**2 + y**2) + a)")
+
+
+def animation_frame(view):
+    value = view.slider.value() % 100 + 1
+    view.slider.blockSignals(True)
+    view.slider.setValue(value)
+    view.slider.blockSignals(False)
+    view.update_plot_data()
+    view.canvas.draw()
+
+
+@benchmark("graph.animation_frame.2d")
+def _frame_2d():
+    view = graph_view()
+    render(view, "sin(a*x) * exp(-x**2/10)")
+    return lambda: animation_frame(view)
+
+
+@benchmark("graph.animation_frame.3d")
+def _frame_3d():
+    view = graph_view()
+    render(view, "sin(sqrt(x**2 + y**2) + a)")
+    return lambda: animation_frame(view)
+
+
+# --- Units ------------------------------------------------------------------
+
+@benchmark("units.convert.scalar")
+def _convert():
+    from logic.units import convert
+    return lambda: convert(98.6, 'degF', 'degC')
+
+
+@benchmark("units.parse_unit.compound.uncached")
+def _parse_unit():
+    from logic.units import parse_unit
+    return lambda: parse_unit.__wrapped__("kg*m^2/s^3")
+
+
+@benchmark("units.convert_array.1e6")
+def _convert_array():
+    import numpy as np
+    from logic.unit_batch import convert_array
+    values = np.random.default_rng(0).random(1_000_000)
+    return lambda: convert_array(values, 'degF', 'degC', inplace=True)
+
+
+@benchmark("units.convert_rows.10k")
+def _convert_rows():
+    from logic.unit_batch import convert_rows
+    from logic.units import conversion
+    template = [[str(i), f"{i * 0.37:.3f}"] for i in range(10_000)]
+    columns = [(1, conversion('mph', 'km/h'))]
+    return lambda: convert_rows([row[:] for row in template], columns)
+
+
+# --- Runner -----------------------------------------------------------------
+
+def run_benchmarks(patterns=(), repeat: int = 5, min_time: float = 0.1, report=print) -> dict:
+    """
+    Runs every registered benchmark whose name contains one of the patterns
+    (all of them when patterns is empty) and returns name → timing dict.
+    Benchmarks that cannot run (e.g. PyQt5 missing) are reported and skipped.
+    """
+    results = {}
+    for name, setup in BENCHMARKS:
+        if patterns and not any(pattern in name for pattern in patterns):
+            continue
+        try:
+            results[name] = measure(setup(), repeat, min_time)
+        except Exception as e:
+            report(f"{name:<44} skipped: {e}")
+            continue
+        report(f"{name:<44} {results[name]['median_us']:>14.1f} µs")
+    return results
+
+
+def environment() -> dict:
+    info = {'python': platform.python_version(), 'platform': platform.platform(), 'timestamp': time.time()}
+    for module in ('sympy', 'numpy', 'matplotlib'):
+        try:
+            info[module] = __import__(module).__version__
+        except ImportError:
+            pass
+    return info
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list:
+    """
+    Benchmarks slower than the baseline median by more than `threshold`
+    (0.25 = 25%), as (name, baseline µs, current µs, ratio).
+    """
+    regressions = []
+    for name, timing in results.items():
+        reference = baseline.get('results', {}).get(name)
+        if not reference:
+            continue
+        ratio = timing['median_us'] / reference['median_us']
+        if ratio > 1 + threshold:
+            regressions.append((name, reference['median_us'], timing['median_us'], ratio))
+    return regressions
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.run",
+        description="Benchmark the solver, plotter and converter hot paths."
+    )
+    parser.add_argument("-k", "--filter", action="append", default=[], help="only run names containing this text")
+    parser.add_argument("-o", "--output", help="write results as JSON to this file")
+    parser.add_argument("--baseline", help="JSON results to compare against")
+    parser.add_argument("--save-baseline", help="also write the results to this baseline file")
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed slowdown before failing (0.25 = 25%%)")
+    parser.add_argument("--repeat", type=int, default=5, help="timed repeats per benchmark")
+    parser.add_argument("--min-time", type=float, default=0.1, help="minimum seconds per repeat")
+    parser.add_argument("--list", action="store_true", help="list benchmark names and exit")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.list:
+        for name, _ in BENCHMARKS:
+            print(name)
+        return 0
+
+    document = {
+        'environment': environment(),
+        'results': run_benchmarks(args.filter, args.repeat, args.min_time),
+    }
+    for path in filter(None, (args.output, args.save_baseline)):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(document, f, indent=2, sort_keys=True)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(document['results'], baseline, args.threshold)
+        for name, before, after, ratio in regressions:
+            print(f"❌ Regression: {name} {before:.1f} µs → {after:.1f} µs ({(ratio - 1) * 100:+.0f}%)")
+        if regressions:
+            return 1
+        print(f"✅ No regressions beyond {args.threshold:.0%} against {args.baseline}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
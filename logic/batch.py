@@ -0,0 +1,258 @@
+# File: logic/batch.py
+
+"""
+Headless batch evaluation over logic.solver.
+
+Reads one expression per line (file or stdin) and writes one JSON object per
+line with the value, status, error and timing of each evaluation. Nothing in
+here touches PyQt5, matplotlib or speech_recognition, so it is safe to run on
+servers without a display.
+
+    python -m logic.batch expressions.txt -o results.jsonl
+    cat expressions.txt | python -m logic.batch --radians
+    python -m logic.batch big.txt --workers 8 --chunk-size 256 --unordered
+    python -m logic.batch untrusted.txt --timeout 2 --memory-mb 512
+    python -m logic.batch constants.txt --precision 100
+    python -m logic.batch table.csv --sweep "v^2 / (2*g)" -o table_out.csv
+    python -m logic.batch steps.txt --session project.sqlite3   # keep variables between runs
+"""
+
+import argparse
+import json
+import sys
+import time
+
+from logic import metrics, solver
+from logic.guard import MAX_DIGITS, EvaluationLimits, evaluate_guarded, parse_limit
+from logic.solver import computed_precision, evaluate_expression_tiered
+
+RESULT_PREFIX = "✅ Result: "
+ASSIGNED_PREFIX = "✅ Assigned: "
+FALLBACK_PREFIX = "⚠️ SymPy failed. Math fallback: "
+ERROR_PREFIX = "❌ "
+
+
+def parse_result(text: str) -> dict:
+    """
+    Splits a solver result string into status, value and error fields.
+    Evaluations stopped by a limit (see logic.guard) get status 'limit'.
+    """
+    limit = parse_limit(text)
+    if limit is not None:
+        return {'status': 'limit', 'value': None, 'error': f"{limit[0]}: {limit[1]}"}
+    if text.startswith(RESULT_PREFIX):
+        return {'status': 'ok', 'value': text[len(RESULT_PREFIX):], 'error': None}
+    if text.startswith(ASSIGNED_PREFIX):
+        return {'status': 'assigned', 'value': text[len(ASSIGNED_PREFIX):], 'error': None}
+    if text.startswith(FALLBACK_PREFIX):
+        return {'status': 'fallback', 'value': text[len(FALLBACK_PREFIX):], 'error': None}
+    error = text[len(ERROR_PREFIX):] if text.startswith(ERROR_PREFIX) else text
+    if error.startswith("Error: "):
+        error = error[len("Error: "):]
+    return {'status': 'error', 'value': None, 'error': error}
+
+
+def evaluate_one(expr: str, deg_mode: bool = True, index: int = 0, limits: EvaluationLimits = None) -> dict:
+    """
+    Evaluates a single expression and returns its structured result, under
+    the given limits when there are any. 'precision' is the number of digits
+    the value was computed with (None when no tier produced it).
+    """
+    start = time.perf_counter()
+    try:
+        if limits is None:
+            text, tier = evaluate_expression_tiered(expr, deg_mode)
+        else:
+            text, tier = evaluate_guarded(expr, deg_mode, limits)
+    except Exception as e:
+        text, tier = f"❌ Error: {str(e)}", None
+    elapsed_ms = (time.perf_counter() - start) * 1000.0
+    result = {
+        'index': index, 'expression': expr, **parse_result(text),
+        'tier': tier, 'precision': None if tier is None else computed_precision(tier),
+        'elapsed_ms': round(elapsed_ms, 3)
+    }
+    if result['status'] == 'assigned':
+        # The value as of this assignment, for record_results: with --workers
+        # later assignments may already have run by the time it is recorded
+        name = solver.normalize_expression(expr).split('=', 1)[0].strip()
+        if name in solver.user_namespace:
+            result['_variable'] = (name, solver.user_namespace[name])
+    return result
+
+
+def iter_expressions(lines):
+    """
+    Yields stripped expressions, skipping blank lines and # comments.
+    """
+    for line in lines:
+        expr = line.strip()
+        if expr and not expr.startswith('#'):
+            yield expr
+
+
+def evaluate_many(expressions, deg_mode: bool = True, limits: EvaluationLimits = None):
+    """
+    Lazily evaluates an iterable of expressions in order, yielding one result
+    dict per expression. Assignments stay visible to later expressions.
+    """
+    for index, expr in enumerate(expressions):
+        yield evaluate_one(expr, deg_mode, index, limits)
+
+
+def result_text(result: dict) -> str:
+    """
+    The solver string a result dict was parsed from (see parse_result).
+    """
+    prefixes = {'ok': RESULT_PREFIX, 'assigned': ASSIGNED_PREFIX, 'fallback': FALLBACK_PREFIX}
+    if result['status'] in prefixes:
+        return prefixes[result['status']] + result['value']
+    return f"{ERROR_PREFIX}Error: {result['error']}"
+
+
+def record_results(results, store, deg_mode: bool = True):
+    """
+    Passes results through, appending each one to a logic.session store
+    together with the value it assigned, if any.
+    """
+    for result in results:
+        store.record(result['expression'], result_text(result), result['tier'], deg_mode,
+                     variable=result.get('_variable'))
+        yield result
+
+
+def write_jsonl(results, stream):
+    """
+    Writes result dicts as JSON lines, flushing after each so output streams.
+    Returns the number of results that did not evaluate cleanly.
+    """
+    failures = 0
+    for result in results:
+        if result['status'] in ('error', 'limit'):
+            failures += 1
+        if '_variable' in result:
+            result = {key: value for key, value in result.items() if key != '_variable'}
+        stream.write(json.dumps(result, ensure_ascii=False) + "\n")
+        stream.flush()
+    return failures
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="python -m logic.batch",
+        description="Evaluate expressions line by line and write JSONL results."
+    )
+    parser.add_argument("input", nargs="?", default="-", help="expression file, one per line ('-' for stdin)")
+    parser.add_argument("-o", "--output", default="-", help="JSONL output file ('-' for stdout)")
+    parser.add_argument("--radians", action="store_true", help="evaluate trig functions in radians")
+    parser.add_argument("-j", "--workers", type=int, default=1, help="worker processes (0 = one per CPU)")
+    parser.add_argument("--chunk-size", type=int, default=64, help="expressions per worker task")
+    parser.add_argument("--unordered", action="store_true", help="emit results as soon as their chunk finishes")
+    parser.add_argument("--precision", type=int, default=solver.DEFAULT_PRECISION,
+                        help=f"significant digits (up to {solver.MAX_PRECISION}; above 15 SymPy/mpmath evaluate)")
+    parser.add_argument("--strict", action="store_true", help="exit with status 1 if any expression fails")
+    parser.add_argument("--timeout", type=float,
+                        help="seconds allowed per expression (evaluates in the sandbox)")
+    parser.add_argument("--max-digits", type=int,
+                        help=f"reject powers and factorials with more digits than this (default {MAX_DIGITS:,}; 0 = no limit)")
+    parser.add_argument("--max-result-chars", type=int, help="reject results longer than this")
+    parser.add_argument("--sandbox", action="store_true",
+                        help="evaluate in a child process that is killed on timeout")
+    parser.add_argument("--memory-mb", type=int, help="memory cap for the sandbox process (POSIX)")
+    parser.add_argument("--sweep", metavar="EXPR",
+                        help="treat the input as a CSV with a header row and append EXPR evaluated per row, "
+                             "vectorized over the columns it names")
+    parser.add_argument("--session", metavar="PATH",
+                        help="restore variables from this session file first, and append every evaluation to it")
+    parser.add_argument("--metrics", metavar="PATH",
+                        help="record per-stage solver timings and write them here (.json, otherwise Prometheus text); "
+                             "with --workers only the main process is measured")
+    return parser
+
+
+def build_limits(args):
+    """
+    EvaluationLimits from the command line. Powers and factorials are bounded
+    at guard.MAX_DIGITS digits unless --max-digits 0 turns the check off, so
+    a stray 9**9**9 cannot stall a run. A --timeout always uses the sandbox:
+    an in-process evaluation that timed out would keep running against the
+    solver's state.
+    """
+    max_digits = MAX_DIGITS if args.max_digits is None else args.max_digits or None
+    requested = (args.timeout, args.max_digits, args.max_result_chars, args.memory_mb)
+    if not args.sandbox and all(value is None for value in requested):
+        return EvaluationLimits(max_digits=max_digits, max_result_chars=None)
+    limits = EvaluationLimits(timeout=args.timeout, max_digits=max_digits,
+                              sandbox=args.sandbox or args.timeout is not None or args.memory_mb is not None,
+                              memory_mb=args.memory_mb)
+    if args.max_result_chars is not None:
+        limits.max_result_chars = args.max_result_chars
+    return limits
+
+
+def sweep(expr: str, input_path: str, output_path: str, deg_mode: bool = True, chunk_size: int = 65536) -> int:
+    """
+    The --sweep mode: one vectorized solver.evaluate_csv pass over a CSV table.
+    """
+    source = sys.stdin if input_path == "-" else open(input_path, newline="", encoding="utf-8")
+    sink = sys.stdout if output_path == "-" else open(output_path, "w", newline="", encoding="utf-8")
+    try:
+        solver.evaluate_csv(expr, source, sink, deg_mode, chunk_size=chunk_size)
+    except Exception as e:
+        print(f"❌ Error: {str(e)}", file=sys.stderr)
+        return 1
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if sink is not sys.stdout:
+            sink.close()
+    return 0
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    deg_mode = not args.radians
+    limits = build_limits(args)
+    solver.set_precision(args.precision)
+    if args.metrics:
+        metrics.enable()
+
+    if args.sweep:
+        return sweep(args.sweep, args.input, args.output, deg_mode)
+
+    store = None
+    if args.session:
+        from logic.session import SessionStore
+        store = SessionStore(args.session, commit_every=1000)
+        store.restore()
+
+    source = sys.stdin if args.input == "-" else open(args.input, encoding="utf-8")
+    sink = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+    try:
+        expressions = iter_expressions(source)
+        if args.workers == 1:
+            results = evaluate_many(expressions, deg_mode, limits)
+        else:
+            from logic.parallel import evaluate_parallel
+            results = evaluate_parallel(
+                expressions, deg_mode, workers=args.workers or None,
+                chunk_size=args.chunk_size, ordered=not args.unordered, limits=limits
+            )
+        if store is not None:
+            results = record_results(results, store, deg_mode)
+        failures = write_jsonl(results, sink)
+        if args.metrics:
+            metrics.write(args.metrics)
+    finally:
+        if store is not None:
+            store.close()
+        if source is not sys.stdin:
+            source.close()
+        if sink is not sys.stdout:
+            sink.close()
+
+    return 1 if args.strict and failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
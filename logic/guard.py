@@ -0,0 +1,430 @@
+# File: logic/guard.py
+
+"""
+Guarded evaluation for untrusted input.
+
+evaluate_guarded wraps logic.solver with three layers of protection:
+
+1. A static size check. The expression is parsed with the numeric tier's
+   grammar and every power and factorial is bounded in log10 space, so
+   9**9**9 or factorial(10**7) is rejected before SymPy (which evaluates
+   integer powers while parsing) or Python ints ever try to build it.
+2. A wall-clock timeout. With a SandboxExecutor the evaluation runs in a
+   child process that is killed and replaced, optionally under a memory cap.
+   In-process, a timed-out evaluation is abandoned on its thread (Python
+   threads cannot be killed) and keeps running against the solver's shared
+   state, so use the sandbox whenever more evaluations follow.
+3. A limit on the length of the result text, for symbolic blow-ups such as
+   expand((x+y)**200).
+
+Every limit violation is returned as "❌ Limit exceeded (<kind>): <message>"
+with kind one of digits, timeout, memory or size, so callers (and
+logic.batch) can tell it apart from ordinary errors.
+"""
+
+import ast
+import math
+import multiprocessing
+import operator
+import re
+import threading
+import time
+from collections import namedtuple
+
+from logic import metrics, numeric, solver
+
+try:
+    import resource  # POSIX only; the memory cap is skipped elsewhere
+except ImportError:
+    resource = None
+
+MAX_DIGITS = 100_000
+MAX_RESULT_CHARS = 10_000
+
+LIMIT_PREFIX = "❌ Limit exceeded"
+CANCELLED_RESULT = "❌ Error: Evaluation cancelled"
+CANCEL_POLL_S = 0.05
+_LIMIT_RE = re.compile(r"❌ Limit exceeded \((\w+)\): (.*)", re.DOTALL)
+
+
+class LimitExceeded(Exception):
+    """Raised when an expression would exceed an evaluation limit."""
+
+    def __init__(self, kind: str, message: str):
+        super().__init__(message)
+        self.kind = kind
+
+
+def limit_result(kind: str, message: str) -> str:
+    return f"{LIMIT_PREFIX} ({kind}): {message}"
+
+
+def parse_limit(text: str):
+    """
+    (kind, message) for a limit result string, otherwise None.
+    """
+    match = _LIMIT_RE.fullmatch(text)
+    return (match.group(1), match.group(2)) if match else None
+
+
+class EvaluationLimits:
+    """
+    Limits for evaluate_guarded. timeout is in seconds (None for no limit);
+    sandbox=True runs evaluations in a killable child process, capped at
+    memory_mb where the platform supports it, and started with the given
+    multiprocessing start_method (None for the platform default; use
+    "spawn" from processes that run other threads, such as the GUI).
+    """
+
+    def __init__(self, timeout=None, max_digits=MAX_DIGITS, max_result_chars=MAX_RESULT_CHARS,
+                 sandbox=False, memory_mb=None, start_method=None):
+        self.timeout = timeout
+        self.max_digits = max_digits
+        self.max_result_chars = max_result_chars
+        self.sandbox = sandbox
+        self.memory_mb = memory_mb
+        self.start_method = start_method
+
+
+DEFAULT_LIMITS = EvaluationLimits()
+
+_LOG10_E = math.log10(math.e)
+
+# What is known about a sub-expression: bounds on log10|value| (None when
+# unknown) and its exact value when it fits a float
+_Magnitude = namedtuple('_Magnitude', 'low high value')
+_UNKNOWN = _Magnitude(None, None, None)
+
+_FLOAT_OPS = {
+    ast.Add: operator.add, ast.Sub: operator.sub, ast.Mult: operator.mul,
+    ast.Div: operator.truediv, ast.Mod: operator.mod, ast.Pow: operator.pow,
+}
+
+
+def _known(value):
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return _UNKNOWN
+    if not value:
+        return _Magnitude(-math.inf, -math.inf, 0.0)
+    digits = math.log10(abs(value))  # exact for ints of any size
+    return _Magnitude(digits, digits, float(value) if digits < 300 else None)
+
+
+def _add(*terms):
+    return None if any(term is None for term in terms) else sum(terms)
+
+
+class _MagnitudeChecker:
+    """
+    Walks a numeric-tier ast and bounds log10|value| of each sub-expression
+    from above and below; float arithmetic cannot hang, so sub-expressions
+    that fit a float are computed exactly. Raises LimitExceeded for any power
+    or factorial whose bound exceeds max_digits. Anything depending on an
+    unknown name, or on a difference that could cancel to nearly zero where
+    a lower bound is needed, is left to the timeout.
+    """
+
+    def __init__(self, values, max_digits):
+        self.values = values
+        self.max_digits = max_digits
+
+    def check(self, digits, what):
+        if digits is not None and digits > self.max_digits:
+            shown = f"about {digits:.3g}" if math.isfinite(digits) else "too many"
+            raise LimitExceeded(
+                'digits', f"{what} would have {shown} digits (limit {self.max_digits:,})"
+            )
+        return digits
+
+    def bound(self, node):
+        if isinstance(node, ast.Constant):
+            return _known(node.value)
+        if isinstance(node, ast.Name):
+            return _known(self.values.get(node.id))
+        if isinstance(node, ast.UnaryOp):
+            operand = self.bound(node.operand)
+            if operand.value is not None and isinstance(node.op, ast.USub):
+                return operand._replace(value=-operand.value)
+            return operand
+        if isinstance(node, ast.BinOp):
+            return self.binary(node.op, self.bound(node.left), self.bound(node.right))
+        if isinstance(node, ast.Call):
+            return self.call(node)
+        return _UNKNOWN
+
+    def binary(self, op, left, right):
+        if left.value is not None and right.value is not None and type(op) in _FLOAT_OPS:
+            try:
+                exact = _known(_FLOAT_OPS[type(op)](left.value, right.value))
+            except (ArithmeticError, ValueError):
+                exact = _UNKNOWN  # overflow (handled below) or an error the evaluation reports
+            underflow = exact.value == 0 and isinstance(op, (ast.Mult, ast.Div, ast.Pow)) \
+                and left.value and right.value
+            if exact.value is not None and not underflow:
+                return exact
+        if isinstance(op, ast.Pow):
+            return self.power(left, right)
+        if isinstance(op, (ast.Add, ast.Sub)):
+            high = None if left.high is None or right.high is None else max(left.high, right.high) + math.log10(2)
+            return _Magnitude(None, high, None)  # terms may cancel: no lower bound
+        if isinstance(op, ast.Mult):
+            return _Magnitude(_add(left.low, right.low), _add(left.high, right.high), None)
+        if isinstance(op, ast.Div):
+            return _Magnitude(
+                _add(left.low, None if right.high is None else -right.high),
+                _add(left.high, None if right.low is None else -right.low),
+                None,
+            )
+        if isinstance(op, ast.Mod):
+            return _Magnitude(None, right.high, None)
+        return _UNKNOWN
+
+    def power(self, base, exponent):
+        if exponent.high is None or base.value == 0:
+            return _UNKNOWN  # 0 to a negative power is an error, not a big number
+        # |b**e| lies between 10**(-|e| * s) and 10**(|e| * s), s = max |log10|b||;
+        # a non-negative exponent only needs the upper bound of |b|
+        if exponent.value is not None and exponent.value >= 0:
+            scale = None if base.high is None else max(base.high, 0.0)
+        elif base.low is None or base.high is None:
+            return _UNKNOWN
+        else:
+            scale = max(abs(base.low), abs(base.high))
+        if scale is None:
+            return _UNKNOWN
+        if not scale:
+            return _Magnitude(0.0, 0.0, None)  # |base| == 1
+        times = 10 ** exponent.high if exponent.high < 300 else math.inf
+        digits = self.check(times * scale, "Power")
+        return _Magnitude(-digits, digits, None)
+
+    def call(self, node):
+        args = [self.bound(arg) for arg in node.args]
+        name = node.func.id if isinstance(node.func, ast.Name) else ""
+        if name in ('factorial', 'math.factorial'):
+            return self.factorial(args[0]) if args else _UNKNOWN
+        function = self.values.get(name)
+        if callable(function) and args and all(arg.value is not None for arg in args):
+            try:
+                exact = _known(function(*(arg.value for arg in args)))
+            except (ArithmeticError, ValueError, TypeError):
+                exact = _UNKNOWN
+            if exact.value is not None:
+                return exact
+        if name in ('exp', 'math.exp') and args and args[0].high is not None:
+            high = 10 ** args[0].high * _LOG10_E if args[0].high < 300 else math.inf
+            return _Magnitude(-high, high, None)
+        if name in ('sqrt', 'math.sqrt') and args and args[0].high is not None:
+            return _Magnitude(None if args[0].low is None else args[0].low / 2, args[0].high / 2, None)
+        highs = [arg.high for arg in args]
+        return _Magnitude(None, max(highs, default=0.0) if None not in highs else None, None)
+
+    def factorial(self, argument):
+        if argument.high is None:
+            return _UNKNOWN
+        n = 10 ** argument.high if argument.high < 300 else math.inf
+        # Stirling: log10(n!) ~ n log10(n / e) + log10(2 pi n) / 2
+        digits = n * math.log10(n / math.e) + math.log10(2 * math.pi * n) / 2 if n > 2 else 1.0
+        return _Magnitude(0.0, self.check(digits, "Factorial"), None)
+
+
+def check_limits(expr: str, max_digits: int = MAX_DIGITS, deg_mode: bool = True):
+    """
+    Raises LimitExceeded if a power or factorial in expr would produce more
+    than max_digits digits. Numeric user variables are taken into account;
+    expressions outside the numeric grammar are left to the timeout.
+    """
+    expr = solver.normalize_expression(expr)
+    if '=' in expr:
+        expr = expr.split('=', 1)[1].strip()
+    # Shares the numeric tier's compile cache, so the check costs no extra parse
+    compiled = numeric.compile_cached(expr)
+    if compiled is None:
+        return
+    _MagnitudeChecker(solver.numeric_environment(deg_mode), max_digits).bound(compiled.tree)
+
+
+def _check_result(text: str, limits: EvaluationLimits) -> str:
+    if limits.max_result_chars is not None and len(text) > limits.max_result_chars:
+        return limit_result(
+            'size', f"result has {len(text):,} characters (limit {limits.max_result_chars:,})"
+        )
+    return text
+
+
+def evaluate_guarded(expr: str, deg_mode: bool = True, limits: EvaluationLimits = DEFAULT_LIMITS,
+                     cancelled=None):
+    """
+    evaluate_expression_tiered under `limits`. Returns (result, tier); tier is
+    None when a limit stopped the evaluation or rejected its result.
+    max_digits=None skips the static size check. In the sandbox, a
+    `cancelled` callable that turns true kills the evaluation and returns
+    CANCELLED_RESULT.
+    """
+    solver.resolve_variables(expr)  # restored variables reach the sandbox parsed
+    if limits.max_digits is not None:
+        try:
+            check_limits(expr, limits.max_digits, deg_mode)
+        except LimitExceeded as e:
+            return limit_result(e.kind, str(e)), None
+
+    if limits.sandbox:
+        text, tier = get_sandbox(limits.memory_mb, limits.start_method).evaluate(
+            expr, deg_mode, limits.timeout, cancelled
+        )
+    elif limits.timeout is not None:
+        text, tier = _evaluate_in_thread(expr, deg_mode, limits.timeout)
+    else:
+        text, tier = solver.evaluate_expression_tiered(expr, deg_mode)
+    checked = _check_result(text, limits)
+    return checked, tier if checked is text else None
+
+
+def _evaluate_in_thread(expr, deg_mode, timeout):
+    outcome = []
+
+    def run():
+        try:
+            outcome.append(solver.evaluate_expression_tiered(expr, deg_mode))
+        except Exception as e:
+            outcome.append((f"❌ Error: {str(e)}", None))
+
+    worker = threading.Thread(target=run, name="guarded-evaluation", daemon=True)
+    worker.start()
+    worker.join(timeout)
+    if worker.is_alive():
+        # Cannot be stopped; it finishes (or not) in the background
+        return limit_result('timeout', f"evaluation took longer than {timeout:g} s"), None
+    return outcome[0]
+
+
+def _sandbox_main(conn, memory_mb):
+    if memory_mb and resource is not None:
+        limit = int(memory_mb) * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+    while True:
+        try:
+            expr, deg_mode, namespace, precision, record_metrics = conn.recv()
+        except EOFError:
+            break
+        solver.set_precision(precision)
+        metrics.enable(record_metrics)
+        if namespace is not None:
+            solver.user_namespace.clear()
+            solver.user_namespace.update(namespace)
+            solver.invalidate_expression_cache()
+
+        assignment = None
+        try:
+            text, tier = solver.evaluate_expression_tiered(expr, deg_mode)
+            if text.startswith("✅ Assigned: "):
+                name = solver.normalize_expression(expr).split('=', 1)[0].strip()
+                assignment = (name, solver.user_namespace[name])
+        except MemoryError:
+            text, tier = limit_result('memory', f"evaluation needed more than {memory_mb} MB"), None
+        except Exception as e:
+            text, tier = f"❌ Error: {str(e)}", None
+        # Timings recorded here are merged into the parent's registry
+        conn.send((text, tier, assignment, metrics.drain() if record_metrics else None))
+
+
+class SandboxExecutor:
+    """
+    Evaluates expressions in a child process that is killed on timeout (or
+    when it dies from the memory cap) and transparently restarted. The
+    child gets a copy of user_namespace whenever it changes, and successful
+    assignments are copied back so the parent's namespace stays current, as
+    are solver metrics when recording is on. An evaluation can be given a
+    `cancelled` callable, polled while waiting, to stop it from another
+    thread.
+    """
+
+    def __init__(self, memory_mb=None, start_method=None):
+        self.memory_mb = memory_mb
+        self.start_method = start_method
+        self.process = None
+        self.conn = None
+        self.synced_version = None
+
+    def start(self):
+        context = multiprocessing.get_context(self.start_method)
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(
+            target=_sandbox_main, args=(child_conn, self.memory_mb), name="calculator-sandbox", daemon=True
+        )
+        self.process.start()
+        child_conn.close()
+        self.synced_version = None
+
+    def close(self):
+        if self.process is not None:
+            self.process.kill()
+            self.process.join()
+            self.conn.close()
+        self.process = None
+        self.conn = None
+
+    def evaluate(self, expr: str, deg_mode: bool = True, timeout=None, cancelled=None):
+        if self.process is None or not self.process.is_alive():
+            self.close()
+            self.start()
+
+        namespace = None
+        if self.synced_version != solver.namespace_version:
+            namespace = dict(solver.user_namespace)
+        self.conn.send((expr, deg_mode, namespace, solver.precision, metrics.enabled))
+        self.synced_version = solver.namespace_version
+
+        finished = self.wait(timeout, cancelled)
+        if finished is None:
+            self.close()
+            return CANCELLED_RESULT, None
+        if not finished:
+            self.close()
+            return limit_result('timeout', f"evaluation took longer than {timeout:g} s"), None
+        try:
+            text, tier, assignment, recorded = self.conn.recv()
+        except (EOFError, OSError):
+            self.close()
+            cap = f" (memory limit {self.memory_mb} MB)" if self.memory_mb else ""
+            return limit_result('memory', f"evaluation process died{cap}"), None
+
+        if recorded is not None:
+            metrics.merge(*recorded)
+        if assignment is not None:
+            name, value = assignment
+            solver.user_namespace[name] = value
+            solver.invalidate_expression_cache()
+            self.synced_version = solver.namespace_version  # the child already has it
+        return text, tier
+
+
+    def wait(self, timeout, cancelled=None):
+        """
+        True once the child has answered, False on timeout, None as soon as
+        cancelled() turns true (checked every CANCEL_POLL_S seconds).
+        """
+        if cancelled is None:
+            return self.conn.poll(timeout)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while not cancelled():
+            step = CANCEL_POLL_S if deadline is None else min(CANCEL_POLL_S, deadline - time.monotonic())
+            if step <= 0:
+                return False
+            if self.conn.poll(step):
+                return True
+        return None
+
+
+_sandboxes = {}
+
+
+def get_sandbox(memory_mb=None, start_method=None) -> SandboxExecutor:
+    """
+    Shared SandboxExecutor per memory cap and start method, started on first use.
+    """
+    key = (memory_mb, start_method)
+    if key not in _sandboxes:
+        _sandboxes[key] = SandboxExecutor(memory_mb, start_method)
+    return _sandboxes[key]
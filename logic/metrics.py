@@ -0,0 +1,166 @@
+# File: logic/metrics.py
+
+"""
+Opt-in, in-process metrics for the evaluation pipeline.
+
+logic.solver records how long each stage takes (normalize, parse, evalf,
+numeric, units, math_fallback, evaluate) and counts
+events such as which tier answered, fallbacks and errors. Recording is off
+by default; call sites check the module-level `enabled` flag before reading
+the clock, so a disabled registry costs one attribute lookup per stage.
+
+    from logic import metrics
+    metrics.enable()
+    ...
+    print(metrics.to_prometheus())
+    metrics.write("metrics.json")
+
+Setting CALC_METRICS=1 in the environment enables recording at import.
+"""
+
+import json
+import os
+import threading
+import time
+
+enabled = os.environ.get("CALC_METRICS", "") not in ("", "0")
+
+# stage → [count, total seconds, max seconds]
+_stages = {}
+# event → count
+_counters = {}
+_lock = threading.Lock()
+
+clock = time.perf_counter
+
+
+def enable(on: bool = True):
+    global enabled
+    enabled = bool(on)
+
+
+def disable():
+    enable(False)
+
+
+def record(stage: str, started: float):
+    """
+    Records one run of a stage that began at clock() value `started`.
+    """
+    elapsed = clock() - started
+    with _lock:
+        entry = _stages.get(stage)
+        if entry is None:
+            _stages[stage] = [1, elapsed, elapsed]
+        else:
+            entry[0] += 1
+            entry[1] += elapsed
+            if elapsed > entry[2]:
+                entry[2] = elapsed
+
+
+def increment(event: str, amount: int = 1):
+    with _lock:
+        _counters[event] = _counters.get(event, 0) + amount
+
+
+def drain():
+    """
+    Returns the raw registry (stages, counters) and clears it, for shipping
+    to merge() in another process (see logic.guard's sandbox).
+    """
+    with _lock:
+        stages = {name: list(entry) for name, entry in _stages.items()}
+        counters = dict(_counters)
+        _stages.clear()
+        _counters.clear()
+    return stages, counters
+
+
+def merge(stages: dict, counters: dict):
+    """
+    Adds a registry returned by drain() into this one.
+    """
+    with _lock:
+        for name, (count, total, peak) in stages.items():
+            entry = _stages.get(name)
+            if entry is None:
+                _stages[name] = [count, total, peak]
+            else:
+                entry[0] += count
+                entry[1] += total
+                entry[2] = max(entry[2], peak)
+        for name, count in counters.items():
+            _counters[name] = _counters.get(name, 0) + count
+
+
+def reset():
+    with _lock:
+        _stages.clear()
+        _counters.clear()
+
+
+def snapshot() -> dict:
+    """
+    Copy of the registry: per-stage count/total/mean/max in milliseconds,
+    event counters, and fallback/error rates per evaluation.
+    """
+    with _lock:
+        stages = {name: list(entry) for name, entry in _stages.items()}
+        counters = dict(_counters)
+
+    evaluations = counters.get('evaluations', 0)
+    return {
+        'enabled': enabled,
+        'stages': {
+            name: {
+                'count': count,
+                'total_ms': round(total * 1000, 4),
+                'mean_ms': round(total / count * 1000, 4),
+                'max_ms': round(peak * 1000, 4),
+            }
+            for name, (count, total, peak) in sorted(stages.items())
+        },
+        'counters': dict(sorted(counters.items())),
+        'fallback_rate': counters.get('fallbacks', 0) / evaluations if evaluations else 0.0,
+        'error_rate': counters.get('errors', 0) / evaluations if evaluations else 0.0,
+    }
+
+
+def to_json(indent: int = 2) -> str:
+    return json.dumps(snapshot(), indent=indent)
+
+
+def to_prometheus(prefix: str = "calculator") -> str:
+    """
+    Registry in the Prometheus text exposition format.
+    """
+    data = snapshot()
+    lines = [
+        f"# HELP {prefix}_stage_seconds Time spent in each evaluation stage.",
+        f"# TYPE {prefix}_stage_seconds summary",
+    ]
+    for name, stage in data['stages'].items():
+        lines.append(f'{prefix}_stage_seconds_count{{stage="{name}"}} {stage["count"]}')
+        lines.append(f'{prefix}_stage_seconds_sum{{stage="{name}"}} {stage["total_ms"] / 1000:.9f}')
+    lines.append(f"# HELP {prefix}_stage_max_seconds Slowest single run of each stage.")
+    lines.append(f"# TYPE {prefix}_stage_max_seconds gauge")
+    for name, stage in data['stages'].items():
+        lines.append(f'{prefix}_stage_max_seconds{{stage="{name}"}} {stage["max_ms"] / 1000:.9f}')
+    lines.append(f"# HELP {prefix}_events_total Evaluation events by kind.")
+    lines.append(f"# TYPE {prefix}_events_total counter")
+    for name, count in data['counters'].items():
+        lines.append(f'{prefix}_events_total{{event="{name}"}} {count}')
+    for rate in ('fallback_rate', 'error_rate'):
+        lines.append(f"# TYPE {prefix}_{rate} gauge")
+        lines.append(f"{prefix}_{rate} {data[rate]:.6f}")
+    return "\n".join(lines) + "\n"
+
+
+def write(path: str):
+    """
+    Writes a JSON snapshot for *.json paths, Prometheus text otherwise.
+    """
+    text = to_json() if path.endswith(".json") else to_prometheus()
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
@@ -0,0 +1,396 @@
+# File: logic/numeric.py
+
+"""
+Fast, eval-free numeric engine for the solver.
+
+Plain arithmetic such as 2*(3+4)/7 or sin(30) does not need SymPy. Expressions
+in calculator syntax (^, ×, ÷, π, √, n!, implicit multiplication, math.sin(...)
+from the keypad) are tokenized and parsed into a Python ast tree that can only
+contain numbers, names, arithmetic and plain calls. The tree is compiled once
+to a code object and cached. Anything outside the grammar is rejected so the
+caller can escalate to SymPy.
+"""
+
+import ast
+import math
+import re
+from collections import OrderedDict
+
+
+class NumericUnsupported(ValueError):
+    """Raised when an expression needs more than the numeric tier offers."""
+
+
+def _factorial(n):
+    if isinstance(n, float) and n.is_integer():
+        n = int(n)
+    if not isinstance(n, int) or isinstance(n, bool):
+        raise NumericUnsupported("factorial of a non-integer")
+    return math.factorial(n)
+
+
+# Degree-mode trig: exact at multiples of 90° so sin(180) is 0, not 1.2e-16
+def _sin_deg(x):
+    r = math.fmod(x, 360.0)
+    if r % 90 == 0:
+        return (0.0, 1.0, 0.0, -1.0)[int(r // 90) % 4]
+    return math.sin(math.radians(r))
+
+
+def _cos_deg(x):
+    r = math.fmod(x, 360.0)
+    if r % 90 == 0:
+        return (1.0, 0.0, -1.0, 0.0)[int(r // 90) % 4]
+    return math.cos(math.radians(r))
+
+
+def _tan_deg(x):
+    r = math.fmod(x, 180.0)
+    if r % 180 == 0:
+        return 0.0
+    if r % 90 == 0:
+        raise ZeroDivisionError("tan is undefined at odd multiples of 90°")
+    return math.tan(math.radians(r))
+
+
+# Radian trig: exact where the argument is (to within rounding) a nonzero
+# multiple of pi/2 as computed from math.pi, so sin(pi) is 0, not 1.2e-16.
+# A hand-typed 3.14159265358979 is several ulps away and is left alone.
+def _quarter_turns(x):
+    turns = round(x / (math.pi / 2))
+    if turns and abs(x - turns * (math.pi / 2)) <= 4 * math.ulp(x):
+        return turns
+    return None
+
+
+def _sin_rad(x):
+    turns = _quarter_turns(x)
+    if turns is not None:
+        return (0.0, 1.0, 0.0, -1.0)[turns % 4]
+    return math.sin(x)
+
+
+def _cos_rad(x):
+    turns = _quarter_turns(x)
+    if turns is not None:
+        return (1.0, 0.0, -1.0, 0.0)[turns % 4]
+    return math.cos(x)
+
+
+def _tan_rad(x):
+    turns = _quarter_turns(x)
+    if turns is not None:
+        if turns % 2:
+            raise ZeroDivisionError("tan is undefined at odd multiples of pi/2")
+        return 0.0
+    return math.tan(x)
+
+
+def _asin_deg(x):
+    return math.degrees(math.asin(x))
+
+
+def _acos_deg(x):
+    return math.degrees(math.acos(x))
+
+
+def _atan_deg(x):
+    return math.degrees(math.atan(x))
+
+
+def _reciprocal(func):
+    # sec = 1/cos and friends; a zero denominator raises, so the symbolic tier answers
+    def apply(x):
+        return 1.0 / func(x)
+    return apply
+
+
+def _of_reciprocal(func):
+    # asec(x) = acos(1/x) and friends
+    def apply(x):
+        return func(1.0 / x)
+    return apply
+
+
+def _in_degrees(func):
+    def apply(x):
+        return math.degrees(func(x))
+    return apply
+
+
+# Same names as solver.allowed_symbols. log10 is left out on purpose: the
+# symbolic tier binds it to SymPy's natural log, so it always escalates.
+radian_functions = {
+    'sin': _sin_rad, 'cos': _cos_rad, 'tan': _tan_rad,
+    'sec': _reciprocal(_cos_rad), 'csc': _reciprocal(_sin_rad), 'cot': _reciprocal(_tan_rad),
+    'asin': math.asin, 'acos': math.acos, 'atan': math.atan,
+    'asec': _of_reciprocal(math.acos), 'acsc': _of_reciprocal(math.asin), 'acot': _of_reciprocal(math.atan),
+    'sinh': math.sinh, 'cosh': math.cosh, 'tanh': math.tanh,
+    'sech': _reciprocal(math.cosh), 'csch': _reciprocal(math.sinh), 'coth': _reciprocal(math.tanh),
+    'asinh': math.asinh, 'acosh': math.acosh, 'atanh': math.atanh,
+    'asech': _of_reciprocal(math.acosh), 'acsch': _of_reciprocal(math.asinh), 'acoth': _of_reciprocal(math.atanh),
+    'log': math.log, 'ln': math.log,
+    'sqrt': math.sqrt, 'abs': abs,
+    'exp': math.exp, 'factorial': _factorial,
+}
+
+# Hyperbolic functions take no angle, so only the circular ones change
+degree_functions = {
+    **radian_functions,
+    'sin': _sin_deg, 'cos': _cos_deg, 'tan': _tan_deg,
+    'sec': _reciprocal(_cos_deg), 'csc': _reciprocal(_sin_deg), 'cot': _reciprocal(_tan_deg),
+    'asin': _asin_deg, 'acos': _acos_deg, 'atan': _atan_deg,
+    'asec': _in_degrees(_of_reciprocal(math.acos)), 'acsc': _in_degrees(_of_reciprocal(math.asin)),
+    'acot': _in_degrees(_of_reciprocal(math.atan)),
+}
+
+# Historic math-fallback meaning of log on the keypad: base 10
+fallback_functions = {**radian_functions, 'log': math.log10, 'log10': math.log10}
+
+constants = {'pi': math.pi, 'e': math.e, 'E': math.e}
+
+# math.<name> spellings produced by the keypad keep Python's radian semantics
+math_names = {
+    f"math.{name}": getattr(math, name) for name in dir(math) if not name.startswith("_")
+}
+
+# Single-pass tokenizer: numbers, names (optionally math.-qualified), operators
+_TOKEN_RE = re.compile(r"""
+    (?P<space>\s+)
+  | (?P<number>(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?)
+  | (?P<name>(?:math\.)?[A-Za-z_][A-Za-z_0-9]*)
+  | (?P<op>\*\*|[-+*/%^(),!√π×÷])
+""", re.VERBOSE)
+
+_ADD_OPS = {'+': ast.Add, '-': ast.Sub}
+_MUL_OPS = {'*': ast.Mult, '×': ast.Mult, '/': ast.Div, '÷': ast.Div, '%': ast.Mod}
+_POW_OPS = ('**', '^')
+
+
+def tokenize(source: str):
+    """
+    Splits an expression into (kind, text) tokens, kind being 'number',
+    'name' or 'op'. Raises NumericUnsupported on any other character.
+    """
+    tokens = []
+    pos = 0
+    while pos < len(source):
+        match = _TOKEN_RE.match(source, pos)
+        if match is None:
+            raise NumericUnsupported(f"unexpected character {source[pos]!r}")
+        if match.lastgroup != 'space':
+            tokens.append((match.lastgroup, match.group()))
+        pos = match.end()
+    return tokens
+
+
+class _Parser:
+    """
+    Recursive-descent parser from calculator syntax to a Python ast tree.
+
+        expr    := term (('+' | '-') term)*
+        term    := unary (('*' | '/' | '%') unary | <implicit> power)*
+        unary   := ('+' | '-') unary | power
+        power   := postfix (('**' | '^') unary)?
+        postfix := primary '!'?
+        primary := number | name | name '(' args ')' | '(' expr ')' | '√' postfix | 'π'
+
+    Implicit multiplication covers 2x, 2(3), (1)(2) and 2π like SymPy's
+    implicit_multiplication transformation.
+    """
+
+    def __init__(self, tokens):
+        self.tokens = tokens
+        self.pos = 0
+        self.names = set()
+
+    def peek(self):
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else (None, None)
+
+    def take(self):
+        token = self.peek()
+        self.pos += 1
+        return token
+
+    def expect(self, text):
+        kind, value = self.take()
+        if value != text:
+            raise NumericUnsupported(f"expected {text!r}")
+
+    def parse(self):
+        if not self.tokens:
+            raise NumericUnsupported("empty expression")
+        node = self.expr()
+        if self.pos != len(self.tokens):
+            raise NumericUnsupported(f"unexpected {self.peek()[1]!r}")
+        return node
+
+    def expr(self):
+        node = self.term()
+        while self.peek()[1] in _ADD_OPS:
+            op = _ADD_OPS[self.take()[1]]
+            node = ast.BinOp(node, op(), self.term())
+        return node
+
+    def term(self):
+        node = self.unary()
+        while True:
+            kind, value = self.peek()
+            if value in _MUL_OPS:
+                self.take()
+                node = ast.BinOp(node, _MUL_OPS[value](), self.unary())
+            elif kind in ('number', 'name') or value in ('(', '√', 'π'):
+                node = ast.BinOp(node, ast.Mult(), self.power())
+            else:
+                return node
+
+    def unary(self):
+        value = self.peek()[1]
+        if value == '-':
+            self.take()
+            return ast.UnaryOp(ast.USub(), self.unary())
+        if value == '+':
+            self.take()
+            return ast.UnaryOp(ast.UAdd(), self.unary())
+        return self.power()
+
+    def power(self):
+        node = self.postfix()
+        if self.peek()[1] in _POW_OPS:
+            self.take()
+            node = ast.BinOp(node, ast.Pow(), self.unary())
+        return node
+
+    def postfix(self):
+        node = self.primary()
+        if self.peek()[1] == '!':
+            self.take()
+            if self.peek()[1] == '!':
+                raise NumericUnsupported("double factorial")
+            node = self.call('factorial', [node])
+        return node
+
+    def primary(self):
+        kind, value = self.take()
+        if kind == 'number':
+            is_float = '.' in value or 'e' in value or 'E' in value
+            return ast.Constant(float(value) if is_float else int(value))
+        if kind == 'name':
+            if self.peek()[1] == '(':
+                self.take()
+                return self.call(value, self.arguments())
+            return self.name(value)
+        if value == '(':
+            node = self.expr()
+            self.expect(')')
+            return node
+        if value == '√':
+            return self.call('sqrt', [self.postfix()])
+        if value == 'π':
+            return self.name('pi')
+        raise NumericUnsupported(f"unexpected {value!r}" if value else "unexpected end of expression")
+
+    def arguments(self):
+        args = []
+        if self.peek()[1] != ')':
+            args.append(self.expr())
+            while self.peek()[1] == ',':
+                self.take()
+                args.append(self.expr())
+        self.expect(')')
+        return args
+
+    def name(self, identifier):
+        self.names.add(identifier)
+        return ast.Name(identifier, ast.Load())
+
+    def call(self, identifier, args):
+        return ast.Call(self.name(identifier), args, [])
+
+
+class CompiledExpression:
+    """
+    A validated, compiled expression plus the free names it reads and its
+    ast tree (walked by logic.guard's size check).
+    """
+    __slots__ = ('source', 'code', 'names', 'tree')
+
+    def __init__(self, source, code, names, tree=None):
+        self.source = source
+        self.code = code
+        self.names = names
+        self.tree = tree
+
+    def __call__(self, env):
+        return eval(self.code, env)
+
+
+def compile_expression(source: str) -> CompiledExpression:
+    """
+    Tokenizes and parses an expression into a Python ast tree built only from
+    numbers, names, arithmetic and plain calls, then compiles it once.
+    Raises NumericUnsupported for anything outside that grammar.
+    """
+    parser = _Parser(tokenize(source))
+    tree = ast.fix_missing_locations(ast.Expression(parser.parse()))
+    return CompiledExpression(source, compile(tree, '<numeric>', 'eval'), frozenset(parser.names), tree.body)
+
+
+compile_cache_size = 1024
+_compile_cache = OrderedDict()
+
+
+def compile_cached(source: str):
+    """
+    Cached compile_expression. Returns None (also cached) when the expression
+    is not eligible for the numeric tier.
+    """
+    if source in _compile_cache:
+        _compile_cache.move_to_end(source)
+        return _compile_cache[source]
+
+    try:
+        compiled = compile_expression(source)
+    except NumericUnsupported:
+        compiled = None
+
+    _compile_cache[source] = compiled
+    if len(_compile_cache) > compile_cache_size:
+        _compile_cache.popitem(last=False)
+    return compiled
+
+
+def build_environment(deg_mode: bool = True, variables=None, unbound=(), functions=None) -> dict:
+    """
+    Globals for evaluating compiled expressions. User variables shadow
+    functions and constants, as they do in the symbolic tier; names listed in
+    unbound (symbolic user variables) are removed so they force escalation.
+    """
+    env = {'__builtins__': {}}
+    env.update(math_names)
+    if functions is None:
+        functions = degree_functions if deg_mode else radian_functions
+    env.update(functions)
+    env.update(constants)
+    if variables:
+        env.update(variables)
+    for name in unbound:
+        env.pop(name, None)
+    return env
+
+
+def evaluate(compiled: CompiledExpression, env: dict):
+    """
+    Runs a compiled expression. Raises NumericUnsupported if it reads a name
+    missing from env or produces anything other than a finite real number.
+    """
+    missing = compiled.names - env.keys()
+    if missing:
+        raise NumericUnsupported(f"unknown name(s): {', '.join(sorted(missing))}")
+
+    value = compiled(env)
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise NumericUnsupported("result is not a real number")
+    if isinstance(value, float) and not math.isfinite(value):
+        raise NumericUnsupported("result is not finite")
+    return value
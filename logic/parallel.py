@@ -0,0 +1,155 @@
+# File: logic/parallel.py
+
+"""
+Process-pool evaluation for large expression batches.
+
+Plain expressions are grouped into chunks and evaluated by worker processes,
+each of which keeps its own warm parse cache between chunks. Assignments are
+evaluated in the parent, in input order, so every chunk is tagged with the
+version of user_namespace that was current when its expressions appeared.
+Workers get the starting namespace once, through the pool initializer; a
+snapshot is pickled once per later version and shipped only with chunks
+submitted after an assignment changed it.
+"""
+
+import os
+import pickle
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+
+from logic import solver
+from logic.batch import evaluate_one
+
+DEFAULT_CHUNK_SIZE = 64
+
+# Namespace version currently installed in this worker process
+_worker_token = None
+
+
+def is_assignment(expr: str) -> bool:
+    """
+    Mirrors the solver's rule: any '=' makes the expression an assignment.
+    """
+    return '=' in expr
+
+
+def _warm_worker(deg_mode, precision=solver.DEFAULT_PRECISION, token=None, namespace=None):
+    solver.set_precision(precision)
+    if namespace is not None:
+        _install_namespace(token, namespace)
+    # Pay SymPy's lazy import and parser setup once per worker, not per chunk
+    try:
+        solver.parse_cached("sin(1) + 1", deg_mode)
+    except Exception:
+        pass
+
+
+def _install_namespace(token, namespace):
+    global _worker_token
+    if token != _worker_token:
+        if isinstance(namespace, bytes):
+            namespace = pickle.loads(namespace)
+        solver.user_namespace.clear()
+        solver.user_namespace.update(namespace)
+        solver.invalidate_expression_cache()
+        _worker_token = token
+
+
+def _evaluate_chunk(start, expressions, deg_mode, token, namespace=None, limits=None):
+    # namespace is None when the worker already has version `token` from its initializer
+    _install_namespace(token, namespace)
+    return start, [evaluate_one(expr, deg_mode, start + offset, limits) for offset, expr in enumerate(expressions)]
+
+
+class _ResultBuffer:
+    """
+    Collects finished chunks and releases them either in input order or as
+    soon as they arrive.
+    """
+
+    def __init__(self, ordered):
+        self.ordered = ordered
+        self.pending = {}
+        self.next_index = 0
+
+    def add(self, start, results):
+        self.pending[start] = results
+
+    def release(self):
+        released = []
+        if self.ordered:
+            while self.next_index in self.pending:
+                results = self.pending.pop(self.next_index)
+                self.next_index += len(results)
+                released.extend(results)
+        else:
+            for start in sorted(self.pending):
+                released.extend(self.pending[start])
+            self.pending.clear()
+        return released
+
+
+def evaluate_parallel(expressions, deg_mode: bool = True, workers: int = None,
+                      chunk_size: int = DEFAULT_CHUNK_SIZE, ordered: bool = True, limits=None):
+    """
+    Evaluates an iterable of expressions across a process pool and yields the
+    same result dicts as logic.batch.evaluate_many.
+
+    With ordered=False results are yielded as chunks complete; each result
+    still carries its input 'index'. The input is consumed lazily, with at
+    most two chunks in flight per worker. limits (logic.guard.EvaluationLimits)
+    apply inside every worker.
+    """
+    workers = workers or os.cpu_count() or 1
+    chunk_size = max(1, int(chunk_size))
+    max_in_flight = workers * 2
+    buffer = _ResultBuffer(ordered)
+    in_flight = set()
+    initial_token = solver.namespace_version
+    snapshot = {'token': initial_token, 'namespace': None}
+
+    def submit(start, chunk):
+        # Re-pickle only when an assignment has changed the namespace; until
+        # then every worker already has it from the initializer
+        if snapshot['token'] != solver.namespace_version:
+            snapshot['token'] = solver.namespace_version
+            snapshot['namespace'] = pickle.dumps(dict(solver.user_namespace))
+        in_flight.add(pool.submit(
+            _evaluate_chunk, start, chunk, deg_mode, snapshot['token'], snapshot['namespace'], limits
+        ))
+
+    def collect(block):
+        if not in_flight:
+            return
+        done, _ = wait(in_flight, timeout=None if block else 0, return_when=FIRST_COMPLETED)
+        for future in done:
+            in_flight.discard(future)
+            buffer.add(*future.result())
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_warm_worker,
+                             initargs=(deg_mode, solver.precision, initial_token, dict(solver.user_namespace))) as pool:
+        chunk, chunk_start = [], 0
+        for index, expr in enumerate(expressions):
+            solver.resolve_variables(expr)  # workers only see parsed variables
+            if is_assignment(expr):
+                if chunk:
+                    submit(chunk_start, chunk)
+                    chunk = []
+                buffer.add(index, [evaluate_one(expr, deg_mode, index, limits)])
+            else:
+                if not chunk:
+                    chunk_start = index
+                chunk.append(expr)
+                if len(chunk) >= chunk_size:
+                    submit(chunk_start, chunk)
+                    chunk = []
+
+            collect(block=len(in_flight) >= max_in_flight)
+            yield from buffer.release()
+
+        if chunk:
+            submit(chunk_start, chunk)
+
+        while in_flight:
+            collect(block=True)
+            yield from buffer.release()
+        yield from buffer.release()
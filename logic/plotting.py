@@ -0,0 +1,208 @@
+# File: logic/plotting.py
+
+"""
+GUI-free plotting engine used by ui.graph_view.
+
+Each plot expression is parsed and lambdified once, with the animation
+variable `a` kept as a real parameter instead of being pasted into the text.
+Sampling grids are cached and shared, so a slider tick only re-runs the NumPy
+kernel on arrays that already exist.
+"""
+
+from functools import lru_cache
+
+import numpy as np
+import sympy as sp
+from sympy.parsing.sympy_parser import parse_expr
+
+from logic.solver import allowed_symbols, transformations
+
+x_sym, y_sym, a_sym = sp.symbols('x y a')
+
+# Plot variables on top of the solver's function table (e → E, ln → log, ...)
+plot_symbols = {**allowed_symbols, 'x': x_sym, 'y': y_sym, 'a': a_sym}
+
+DEFAULT_RANGE = (-10.0, 10.0)
+DEFAULT_POINTS = 500
+
+# Adaptive 2D sampling: deviation allowed from a straight segment, as a
+# fraction of the curve's typical height, and how far intervals may be halved
+ADAPTIVE_TOLERANCE = 1e-3
+ADAPTIVE_MAX_DEPTH = 16
+
+
+class PlotFunction:
+    """
+    A plot expression parsed and lambdified once. Call it with NumPy arrays
+    for x (and y for surfaces) plus the current value of `a`.
+    """
+
+    def __init__(self, source: str):
+        self.source = source
+        self.expr = parse_expr(source.replace('π', 'pi'), local_dict=dict(plot_symbols), transformations=transformations)
+
+        free = self.expr.free_symbols
+        unknown = free - {x_sym, y_sym, a_sym}
+        if unknown:
+            names = ", ".join(sorted(str(s) for s in unknown))
+            raise ValueError(f"Unknown variable(s): {names}")
+
+        self.is_3d = y_sym in free
+        self.uses_parameter = a_sym in free
+        self._kernel = sp.lambdify((x_sym, y_sym, a_sym), self.expr, modules=["numpy"])
+
+    def __call__(self, X, Y=None, a: float = 0.0):
+        with np.errstate(all='ignore'):
+            Z = self._kernel(X, 0.0 if Y is None else Y, a)
+            Z = np.asarray(Z)
+            if np.iscomplexobj(Z):
+                Z = np.where(np.abs(Z.imag) < 1e-12, Z.real, np.nan)
+            # float32 grids (surfaces) stay float32; everything else is float64
+            Z = Z.astype(np.float32 if np.asarray(X).dtype == np.float32 else float, copy=False)
+        if Z.shape != np.shape(X):
+            Z = np.broadcast_to(Z, np.shape(X))  # constant expressions
+        return Z
+
+
+@lru_cache(maxsize=128)
+def compile_plot_function(source: str) -> PlotFunction:
+    """
+    Cached PlotFunction factory; parse and lambdify happen once per expression.
+    """
+    return PlotFunction(source)
+
+
+@lru_cache(maxsize=16)
+def linear_grid(lo: float, hi: float, n: int):
+    """
+    Shared, read-only 1D sample grid.
+    """
+    grid = np.linspace(lo, hi, n)
+    grid.flags.writeable = False
+    return grid
+
+
+@lru_cache(maxsize=16)
+def mesh_grid(x_range: tuple, y_range: tuple, n: int):
+    """
+    Shared, read-only float32 n×n meshgrid over x_range × y_range for surface
+    plots, reused across redraws instead of calling np.meshgrid each time.
+    """
+    X, Y = np.meshgrid(
+        np.linspace(*x_range, n, dtype=np.float32), np.linspace(*y_range, n, dtype=np.float32)
+    )
+    X.flags.writeable = False
+    Y.flags.writeable = False
+    return X, Y
+
+
+def robust_span(values):
+    """
+    Height of the bulk of a curve (5th to 95th percentile of finite values),
+    so poles do not make every other feature look flat.
+    """
+    finite = values[np.isfinite(values)]
+    if finite.size == 0:
+        return 1.0
+    lo, hi = np.percentile(finite, [5, 95])
+    return max(hi - lo, 1e-12 * max(1.0, abs(hi)), 1e-12)
+
+
+def adaptive_sample(func, lo: float, hi: float, a: float = 0.0, budget: int = DEFAULT_POINTS,
+                    tolerance: float = ADAPTIVE_TOLERANCE, max_depth: int = ADAPTIVE_MAX_DEPTH):
+    """
+    Samples a 2D curve on [lo, hi] with at most `budget` points.
+
+    Starts from a coarse uniform grid and repeatedly evaluates interval
+    midpoints; a midpoint is kept only where it deviates from the straight
+    segment by more than `tolerance` of the curve height, so smooth stretches
+    stay coarse and wiggles get detail. Intervals that still jump after
+    max_depth halvings, or that flip sign between two very large values, are
+    poles or discontinuities and are returned as NaN breaks, so no vertical
+    line is drawn across them.
+
+    Returns (x, y) float arrays.
+    """
+    n0 = int(max(16, min(budget // 8, 64)))
+    x = np.linspace(lo, hi, n0 + 1)
+    y = np.array(func(x, a=a), dtype=float)
+    min_width = (hi - lo) / n0 / 2 ** max_depth
+
+    # Intervals still to test, with the error that got them there (for budget cuts)
+    active = np.arange(n0)
+    priority = np.full(n0, np.inf)
+    breaks = []
+
+    while active.size:
+        room = budget - x.size
+        if room <= 0:
+            break
+        if active.size > room:
+            keep = np.argsort(-priority, kind='stable')[:room]
+            active, priority = active[keep], priority[keep]
+            order = np.argsort(active)
+            active, priority = active[order], priority[order]
+
+        left, right = x[active], x[active + 1]
+        xm = (left + right) / 2
+        ym = np.array(func(xm, a=a), dtype=float)
+        if ym.shape != xm.shape:
+            ym = np.broadcast_to(ym, xm.shape).copy()
+
+        y_left, y_right = y[active], y[active + 1]
+        with np.errstate(all='ignore'):
+            error = np.abs(ym - (y_left + y_right) / 2) / robust_span(y)
+        finite = np.isfinite([y_left, ym, y_right])
+        error[finite.any(axis=0) & ~finite.all(axis=0)] = np.inf
+        error[~finite.any(axis=0)] = 0.0
+
+        flagged = error > tolerance
+        too_narrow = (right - left) <= 2 * min_width
+        breaks.extend(xm[flagged & too_narrow])
+        refine = flagged & ~too_narrow
+
+        inserted = active[refine]
+        x = np.insert(x, inserted + 1, xm[refine])
+        y = np.insert(y, inserted + 1, ym[refine])
+
+        # Each refined interval becomes two halves, shifted by earlier insertions
+        first_half = inserted + np.arange(inserted.size)
+        active = np.concatenate([first_half, first_half + 1])
+        priority = np.concatenate([error[refine], error[refine]])
+        order = np.argsort(active)
+        active, priority = active[order], priority[order]
+
+    y[~np.isfinite(y)] = np.nan
+
+    # Poles the budget did not let us pin down: a sign flip between two
+    # values that are both far outside the curve's typical height
+    span = robust_span(y)
+    with np.errstate(invalid='ignore'):
+        pole = (y[:-1] * y[1:] < 0) & (np.minimum(np.abs(y[:-1]), np.abs(y[1:])) > span)
+    breaks.extend((x[:-1][pole] + x[1:][pole]) / 2)
+
+    if breaks:
+        breaks = np.sort(breaks)
+        at = np.searchsorted(x, breaks)
+        x = np.insert(x, at, breaks)
+        y = np.insert(y, at, np.nan)
+    return x, y
+
+
+def view_limits(x, y, outlier_ratio: float = 4.0):
+    """
+    y-limits for a sampled curve that keep poles from flattening the rest of
+    the plot, or None when Matplotlib's autoscale is fine.
+    """
+    # Resample uniformly so densely refined pole regions do not dominate
+    uniform = np.interp(np.linspace(x[0], x[-1], 1000), x, y)
+    finite = uniform[np.isfinite(uniform)]
+    if finite.size < 2:
+        return None
+
+    lo, hi = np.percentile(finite, [2, 98])
+    span = max(hi - lo, 1e-12)
+    extent = np.nanmax(y) - np.nanmin(y)
+    if extent <= outlier_ratio * span:
+        return None
+    return float(lo - 0.25 * span), float(hi + 0.25 * span)
@@ -0,0 +1,298 @@
+# File: logic/session.py
+
+"""
+Persistent sessions: user variables and evaluation history in one SQLite file.
+
+Every evaluation is appended to a history table; every assignment also
+appends the new value (as SymPy srepr text) to a variables table indexed by
+(name, id). Nothing is ever updated in place, so the file is an append-only
+log. Restoring a session reads only the latest row per variable through that
+index, so startup cost depends on the number of variables, not on the length
+of the history, and nothing is re-evaluated; a value is only parsed the
+first time an expression uses it, by a parser that accepts SymPy constructor
+calls and nothing else. History search goes through an
+FTS5 trigram index (substring matches stay fast over millions of rows),
+falling back to LIKE on SQLite builds without it. The database runs in WAL
+mode with a memory-mapped file.
+
+    from logic import session
+    store = session.SessionStore()          # DEFAULT_PATH
+    store.restore()                         # variables back into the solver, parsed on first use
+    store.record("x = 2", "✅ Assigned: x = 2.00000000000000", "sympy")
+    store.search("sin(")
+
+    python -m logic.session search "sqrt" -n 20
+    python -m logic.session variables
+"""
+
+import argparse
+import ast
+import os
+import sqlite3
+import sys
+import time
+from functools import partial
+
+import sympy
+from sympy.parsing.sympy_parser import parse_expr
+
+from logic import solver
+
+DEFAULT_PATH = os.environ.get("CALC_SESSION") or os.path.join(
+    os.environ.get("XDG_DATA_HOME") or os.path.join(os.path.expanduser("~"), ".local", "share"),
+    "futuristic-calculator", "session.sqlite3"
+)
+
+SCHEMA_VERSION = 1
+MMAP_SIZE = 256 * 1024 * 1024
+
+ASSIGNED_PREFIX = "✅ Assigned: "
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS history (
+    id INTEGER PRIMARY KEY,
+    time REAL NOT NULL,
+    expression TEXT NOT NULL,
+    result TEXT NOT NULL,
+    tier TEXT,
+    deg_mode INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS variables (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    value TEXT NOT NULL,
+    history_id INTEGER REFERENCES history(id)
+);
+CREATE INDEX IF NOT EXISTS variables_by_name ON variables (name, id);
+"""
+
+_FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS history_text USING fts5(
+    expression, result, content='history', content_rowid='id', tokenize='trigram'
+);
+CREATE TRIGGER IF NOT EXISTS history_text_insert AFTER INSERT ON history BEGIN
+    INSERT INTO history_text (rowid, expression, result) VALUES (new.id, new.expression, new.result);
+END;
+"""
+
+
+
+def _basic_classes(cls=sympy.Basic):
+    for subclass in cls.__subclasses__():
+        yield subclass
+        yield from _basic_classes(subclass)
+
+
+# srepr text only ever calls SymPy classes (by class name, e.g. ExprCondPair,
+# which sympy does not export) and names SymPy singletons (pi, oo, zoo, true,
+# ...), so nothing else is visible while parsing it
+_SREPR_NAMES = {cls.__name__: cls for cls in _basic_classes()}
+_SREPR_NAMES.update(
+    (name, value) for name, value in vars(sympy).items()
+    if not name.startswith('_') and (
+        isinstance(value, sympy.Basic) or (isinstance(value, type) and issubclass(value, sympy.Basic))
+    )
+)
+_SREPR_NODES = (ast.Expression, ast.Call, ast.Name, ast.Load, ast.Constant, ast.keyword,
+                ast.Tuple, ast.List, ast.UnaryOp, ast.USub)
+# The only calls whose positional arguments may be strings (names and decimal digits)
+_STRING_CONSTRUCTORS = {'Symbol', 'Dummy', 'Wild', 'Function', 'Float'}
+
+
+def parse_value(text: str):
+    """
+    A stored srepr value back as a SymPy object. sympify would eval the text;
+    here it must be nothing but SymPy constructor calls with literal
+    arguments, and only Symbol, Float and the like may receive strings
+    (elsewhere a string would be sympified, i.e. evaluated). Only then is it
+    handed to parse_expr, with SymPy classes as the only globals. Raises
+    ValueError for anything else.
+    """
+    tree = ast.parse(text, mode='eval')
+    for node in ast.walk(tree):
+        if not isinstance(node, _SREPR_NODES):
+            raise ValueError(f"Not a SymPy value: {type(node).__name__} in {text[:60]!r}")
+        if isinstance(node, ast.Name) and node.id not in _SREPR_NAMES:
+            raise ValueError(f"Not a SymPy name: {node.id!r}")
+        if isinstance(node, ast.Call):
+            strings_allowed = isinstance(node.func, ast.Name) and node.func.id in _STRING_CONSTRUCTORS
+            for arg in node.args:
+                if isinstance(arg, ast.Constant) and isinstance(arg.value, str) and not strings_allowed:
+                    raise ValueError(f"Unexpected string argument in {text[:60]!r}")
+            for keyword in node.keywords:
+                if not (isinstance(keyword.value, ast.Constant) and isinstance(keyword.value.value, (bool, int))):
+                    raise ValueError(f"Unexpected keyword argument in {text[:60]!r}")
+        if isinstance(node, ast.Constant) and not isinstance(node.value, (str, int, float, bool)):
+            raise ValueError(f"Unexpected literal in {text[:60]!r}")
+    return parse_expr(text, local_dict={}, global_dict={'__builtins__': {}, **_SREPR_NAMES}, transformations=())
+
+
+class SessionStore:
+    """
+    One session file. Writes are committed every `commit_every` records (and
+    on flush/close), so bulk recording does not pay for a commit per row.
+    Not thread-safe: use a store from one thread at a time.
+    """
+
+    def __init__(self, path: str = DEFAULT_PATH, commit_every: int = 1):
+        self.path = path
+        self.commit_every = max(1, int(commit_every))
+        self.pending = 0
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(f"PRAGMA mmap_size={MMAP_SIZE}")
+        self.conn.executescript(_SCHEMA)
+        try:
+            self.conn.executescript(_FTS_SCHEMA)
+            self.full_text = True
+        except sqlite3.OperationalError:
+            self.full_text = False  # no FTS5 / trigram tokenizer in this SQLite build
+        self.conn.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+        self.conn.commit()
+
+    def record(self, expression: str, result: str, tier=None, deg_mode: bool = True, variable=None) -> int:
+        """
+        Appends one evaluation. For a successful assignment the variable's new
+        value is appended as well: `variable` is its (name, value) captured
+        when it was evaluated, and without it the value is read from
+        solver.user_namespace (only right for callers that record each
+        evaluation before running the next). Returns the history id.
+        """
+        cursor = self.conn.execute(
+            "INSERT INTO history (time, expression, result, tier, deg_mode) VALUES (?, ?, ?, ?, ?)",
+            (time.time(), expression, result, tier, int(deg_mode))
+        )
+        history_id = cursor.lastrowid
+        if result.startswith(ASSIGNED_PREFIX):
+            if variable is None:
+                name = solver.normalize_expression(expression).split('=', 1)[0].strip()
+                variable = (name, solver.user_namespace[name]) if name in solver.user_namespace else None
+            if variable is not None:
+                self.conn.execute(
+                    "INSERT INTO variables (name, value, history_id) VALUES (?, ?, ?)",
+                    (variable[0], solver.srepr(variable[1]), history_id)
+                )
+        self.pending += 1
+        if self.pending >= self.commit_every:
+            self.flush()
+        return history_id
+
+    def flush(self):
+        self.conn.commit()
+        self.pending = 0
+
+    def close(self):
+        self.flush()
+        self.conn.close()
+
+    def latest_variables(self) -> dict:
+        """
+        name → srepr text of each variable's most recent value, read through
+        the (name, id) index without touching the history.
+        """
+        rows = self.conn.execute(
+            "SELECT name, value FROM variables WHERE id IN (SELECT MAX(id) FROM variables GROUP BY name)"
+        )
+        return dict(rows)
+
+    def restore(self, names=None) -> int:
+        """
+        Registers the latest value of every stored variable (or only `names`)
+        with the solver and returns how many there were. The srepr text is
+        kept as is and parsed with parse_value the first time an expression
+        mentions the name (see solver.resolve_variables); values that no
+        longer parse are dropped then.
+        """
+        restored = 0
+        for name, text in self.latest_variables().items():
+            if names is not None and name not in names:
+                continue
+            solver.user_namespace.pop(name, None)
+            solver.pending_variables[name] = partial(parse_value, text)
+            restored += 1
+        if restored:
+            solver.invalidate_expression_cache()
+        return restored
+
+    def search(self, text: str, limit: int = 50, before_id=None) -> list:
+        """
+        History rows (id, time, expression, result, tier) whose expression or
+        result contains `text`, newest first. Pass the last id seen as
+        before_id to page further back.
+        """
+        before_id = before_id if before_id is not None else -1
+        if self.full_text and len(text) >= 3:
+            phrase = '"' + text.replace('"', '""') + '"'
+            # Let FTS5 walk its own rowids newest first so LIMIT stops early
+            query = (
+                "SELECT h.id, h.time, h.expression, h.result, h.tier FROM ("
+                "SELECT rowid FROM history_text WHERE history_text MATCH ? AND (? < 0 OR rowid < ?) "
+                "ORDER BY rowid DESC LIMIT ?"
+                ") AS hit JOIN history AS h ON h.id = hit.rowid ORDER BY h.id DESC"
+            )
+            return self.conn.execute(query, (phrase, before_id, before_id, limit)).fetchall()
+
+        # Trigram queries need three characters; shorter text scans with LIKE
+        pattern = "%" + text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+        query = (
+            "SELECT id, time, expression, result, tier FROM history "
+            "WHERE (expression LIKE ? ESCAPE '\\' OR result LIKE ? ESCAPE '\\') AND (? < 0 OR id < ?) "
+            "ORDER BY id DESC LIMIT ?"
+        )
+        return self.conn.execute(query, (pattern, pattern, before_id, before_id, limit)).fetchall()
+
+    def history(self, limit: int = 50, before_id=None) -> list:
+        """
+        Most recent history rows, newest first, paged like search().
+        """
+        before_id = before_id if before_id is not None else -1
+        return self.conn.execute(
+            "SELECT id, time, expression, result, tier FROM history WHERE (? < 0 OR id < ?) "
+            "ORDER BY id DESC LIMIT ?", (before_id, before_id, limit)
+        ).fetchall()
+
+    def __len__(self):
+        return self.conn.execute("SELECT COUNT(*) FROM history").fetchone()[0]
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="python -m logic.session",
+        description="Search the evaluation history and variables of a calculator session."
+    )
+    parser.add_argument("--db", default=DEFAULT_PATH, help="session file")
+    commands = parser.add_subparsers(dest="command", required=True)
+    search = commands.add_parser("search", help="history entries containing TEXT, newest first")
+    search.add_argument("text")
+    search.add_argument("-n", "--limit", type=int, default=20)
+    recent = commands.add_parser("history", help="most recent history entries")
+    recent.add_argument("-n", "--limit", type=int, default=20)
+    commands.add_parser("variables", help="latest value of every stored variable")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    store = SessionStore(args.db)
+    try:
+        if args.command == "variables":
+            for name, text in sorted(store.latest_variables().items()):
+                try:
+                    print(f"{name} = {parse_value(text)}")
+                except (ValueError, SyntaxError) as e:
+                    print(f"{name}: ❌ Error: {e}")
+            return 0
+        rows = store.search(args.text, args.limit) if args.command == "search" else store.history(args.limit)
+        for history_id, stamp, expression, result, _ in rows:
+            when = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(stamp))
+            print(f"{history_id:>8}  {when}  {expression}  →  {result}")
+    finally:
+        store.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
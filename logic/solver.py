@@ -1,47 +1,532 @@
 # File: logic/solver.py
 
+import csv
+import hashlib
+import json
 import math
+import os
+from collections import OrderedDict, namedtuple
+from functools import lru_cache
+from itertools import islice
+import mpmath
 from sympy import *
 from sympy.parsing.sympy_parser import (
     parse_expr, standard_transformations, implicit_multiplication_application,
-    convert_xor, implicit_application
+    convert_xor, implicit_application, rationalize
 )
+from logic import metrics, numeric, units
+
+import re  # after the star import, which would shadow it with SymPy's re()
+import numpy as np
+import sympy
+from sympy.printing.numpy import NumPyPrinter
+from sympy.printing.pycode import PythonCodePrinter
+
+# Angle functions, the ones degree mode changes
+trig_functions = {'sin': sin, 'cos': cos, 'tan': tan, 'sec': sec, 'csc': csc, 'cot': cot}
+inverse_trig_functions = {'asin': asin, 'acos': acos, 'atan': atan, 'asec': asec, 'acsc': acsc, 'acot': acot}
+
+hyperbolic_functions = {
+    'sinh': sinh, 'cosh': cosh, 'tanh': tanh, 'sech': sech, 'csch': csch, 'coth': coth,
+    'asinh': asinh, 'acosh': acosh, 'atanh': atanh, 'asech': asech, 'acsch': acsch, 'acoth': acoth,
+}
 
 # Allowed safe symbols for SymPy
 allowed_symbols = {
-    'sin': sin, 'cos': cos, 'tan': tan,
-    'asin': asin, 'acos': acos, 'atan': atan,
+    **trig_functions, **inverse_trig_functions, **hyperbolic_functions,
     'log': log, 'ln': log, 'log10': log,
     'sqrt': sqrt, 'abs': Abs,
     'exp': exp, 'factorial': factorial,
     'pi': pi, 'e': E
 }
 
+class DegreeFunction:
+    """
+    Parse-time stand-in for an angle function in degree mode. The parser
+    calls it like the SymPy function and gets the radian expression back:
+    sin(30) → sin(30*pi/180) = 1/2, asin(1/2) → asin(1/2)*180/pi = 30.
+    The conversion is part of the parsed tree, so evaluation costs nothing.
+    """
+    __slots__ = ('func', 'inverse')
+
+    def __init__(self, func, inverse=False):
+        self.func = func
+        self.inverse = inverse
+
+    def __call__(self, *args):
+        if self.inverse:
+            return self.func(*args) * 180 / pi
+        return self.func(sympify(args[0]) * pi / 180, *args[1:])
+
+    def __repr__(self):
+        return f"DegreeFunction({self.func.__name__})"
+
+# Parse table for degree mode: allowed_symbols with the angle functions wrapped
+degree_symbols = {
+    **allowed_symbols,
+    **{name: DegreeFunction(func) for name, func in trig_functions.items()},
+    **{name: DegreeFunction(func, inverse=True) for name, func in inverse_trig_functions.items()},
+}
+
+def symbol_table(deg_mode: bool = True) -> dict:
+    """
+    Function and constant names the parser sees in each angle mode.
+    """
+    return degree_symbols if deg_mode else allowed_symbols
+
 # Python math context (used by eval-based fallback)
 math_context = {k: getattr(math, k) for k in dir(math) if not k.startswith("_")}
 math_context.update({'pi': math.pi, 'e': math.e})
 
+# Globals for the math fallback: radians, with log meaning log10 as on the keypad
+_math_fallback_env = numeric.build_environment(functions={**math_context, **numeric.fallback_functions})
+
 # Persistent symbol memory
 user_namespace = {}
+# Variables restored from a session file but not parsed yet (name → loader);
+# resolve_variables moves the ones an expression mentions into user_namespace
+pending_variables = {}
 
 # Enable implicit multiplication like 2x → 2*x, and handle ^ as **
 transformations = (
     standard_transformations +
     (implicit_multiplication_application, convert_xor, implicit_application)
 )
+# Above double precision decimal literals are parsed exactly (0.1 → 1/10)
+exact_transformations = transformations + (rationalize,)
+
+# Significant digits results are computed to. Doubles carry about 15, so
+# above DOUBLE_DIGITS the float tiers step aside and SymPy's evalf (or the
+# mpmath fallback) does the work at the requested precision.
+DEFAULT_PRECISION = 15
+DOUBLE_DIGITS = 15
+MAX_PRECISION = 10_000
+precision = DEFAULT_PRECISION
+
+# Evaluated results per (whole parsed expression, digits): re-entering the same
+# expression at the same precision skips evalf; its subexpressions are not cached
+_evalf_cache = OrderedDict()
+
+# Parsed-expression cache: (normalized text, deg_mode, namespace version) → SymPy tree
+expression_cache_size = 1024
+_expression_cache = OrderedDict()
+_cache_stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'invalidations': 0}
+
+# Bumped whenever user_namespace changes, so cached trees never see stale variables
+namespace_version = 0
+
+# Evaluation tiers reported by evaluate_expression_tiered
+TIER_NUMERIC = "numeric"
+TIER_SYMPY = "sympy"
+TIER_MATH = "math"
+TIER_UNITS = "units"
+
+# Numeric-tier globals per deg_mode, rebuilt when the namespace version changes
+_numeric_envs = {}
+
+# Generated formula functions (optimize_expression): in memory per (normalized
+# text, variables, deg_mode, backend, namespace version), and, only when
+# formula_cache_dir is set, on disk as the reduced expression (srepr data, never
+# code) in files named by a hash of everything they depend on. The least
+# recently used files beyond formula_cache_files are deleted.
+CODEGEN_VERSION = 5
+formula_cache_dir = os.environ.get("CALC_FORMULA_CACHE") or None
+formula_cache_files = 1000
+_formulas = OrderedDict()
+_formula_stats = {'memory_hits': 0, 'disk_hits': 0, 'generated': 0}
+_NAME_RE = re.compile(r"[A-Za-z_]\w*")
+
+# Unit expressions resolved once per (normalized text, deg_mode, namespace version):
+# the compiled tree, globals with every unit bound to its SI scale, and the
+# target unit of a trailing "in <unit>" as a float scale and offset
+UnitPlan = namedtuple('UnitPlan', 'compiled env target affine')
+_unit_plans = OrderedDict()
+_quantity_variables = (None, {})
+_CONVERSION_RE = re.compile(r"\s(?:in|to)(?=\s)")
+_NUMBER = r"(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?"
+_LONE_QUANTITY_RE = re.compile(rf"([-+]?{_NUMBER})\s*([A-Za-z°_]+)")
+# Units that are more often variables (t for time, g for gravity, ...): they
+# only count as units next to another unit or with a conversion target
+VARIABLE_LIKE_UNITS = frozenset({'t', 'g', 'h', 'l'})
 
 def evaluate_expression(expr: str, deg_mode: bool = True) -> str:
     """
-    Smart evaluator that tries symbolic mode first, then math fallback.
+    Smart evaluator: numeric fast path, then symbolic mode, then math fallback.
+    """
+    return evaluate_expression_tiered(expr, deg_mode)[0]
+
+def evaluate_expression_tiered(expr: str, deg_mode: bool = True):
+    """
+    Same as evaluate_expression, but returns (result, tier) where tier names the
+    engine that produced the result: TIER_NUMERIC, TIER_UNITS, TIER_SYMPY or TIER_MATH.
+    computed_precision(tier) gives the digits the result was computed with.
     """
+    resolve_variables(expr)
+    if metrics.enabled:
+        started = metrics.clock()
+        result, tier = _evaluate_tiers(expr, deg_mode)
+        metrics.record('evaluate', started)
+        metrics.increment('evaluations')
+        metrics.increment(f'tier_{tier}')
+        if tier == TIER_MATH:
+            metrics.increment('fallbacks')
+        if result.startswith("❌"):
+            metrics.increment('errors')
+        return result, tier
+    return _evaluate_tiers(expr, deg_mode)
+
+def _evaluate_tiers(expr: str, deg_mode: bool = True):
+    if precision <= DOUBLE_DIGITS:
+        fast_result = evaluate_expression_numeric(expr, deg_mode)
+        if fast_result is not None:
+            return fast_result, TIER_NUMERIC
+
+    units_result = evaluate_expression_units(expr, deg_mode)
+    if units_result is not None:
+        return units_result, TIER_UNITS
+
     sympy_result = evaluate_expression_sympy(expr, deg_mode)
     if sympy_result.startswith("✅"):
-        return sympy_result
+        return sympy_result, TIER_SYMPY
     else:
-        math_result = evaluate_expression_math(expr)
+        timing = metrics.enabled
+        if timing:
+            started = metrics.clock()
+        if precision > DOUBLE_DIGITS:
+            math_result = evaluate_expression_mpmath(expr, precision)
+        else:
+            math_result = evaluate_expression_math(expr)
+        if timing:
+            metrics.record('math_fallback', started)
         if not math_result.startswith("❌"):
-            return f"⚠️ SymPy failed. Math fallback: {math_result}"
-        return sympy_result  # Return SymPy's error message if both fail
+            return f"⚠️ SymPy failed. Math fallback: {math_result}", TIER_MATH
+        return sympy_result, TIER_SYMPY  # Return SymPy's error message if both fail
+
+def resolve_variables(expr: str):
+    """
+    Loads the pending variables (see logic.session) that expr mentions into
+    user_namespace. Every evaluation entry point calls this first, so a
+    restored value is only parsed once something uses it.
+    """
+    if not pending_variables:
+        return
+    names = pending_variables.keys() & set(_NAME_RE.findall(expr))
+    for name in names:
+        load = pending_variables.pop(name)
+        try:
+            user_namespace[name] = load()
+        except Exception:
+            continue  # no longer deserializes: the name stays free
+    if names:
+        invalidate_expression_cache()
+
+def set_precision(digits: int):
+    """
+    Sets the significant digits for every later evaluation (1 to MAX_PRECISION).
+    """
+    global precision
+    digits = int(digits)
+    if not 1 <= digits <= MAX_PRECISION:
+        raise ValueError(f"Precision must be between 1 and {MAX_PRECISION} digits")
+    precision = digits
+
+def computed_precision(tier) -> int:
+    """
+    Digits a result from `tier` was actually computed with at the current
+    precision: the float tiers never exceed a double's DOUBLE_DIGITS.
+    """
+    if tier in (TIER_NUMERIC, TIER_UNITS):
+        return min(precision, DOUBLE_DIGITS)
+    return precision
+
+def evaluate_expression_numeric(expr: str, deg_mode: bool = True):
+    """
+    Evaluates plain arithmetic (numbers, known functions, numeric variables)
+    without SymPy. Returns None when the expression needs the symbolic tier.
+    """
+    expr = normalize_expression(expr)
+    if '=' in expr:
+        return None
+
+    timing = metrics.enabled
+    if timing:
+        started = metrics.clock()
+    compiled = numeric.compile_cached(expr)
+    if compiled is None:
+        return None
+
+    try:
+        value = numeric.evaluate(compiled, numeric_environment(deg_mode))
+    except Exception:
+        return None
+    finally:
+        if timing:
+            metrics.record('numeric', started)
+    return f"✅ Result: {format_numeric(value)}"
+
+def format_numeric(value) -> str:
+    """
+    Formats a float-tier value exactly as SymPy's evalf() would print it at
+    the current precision (at most DOUBLE_DIGITS).
+    """
+    if not value:
+        return "0"
+    digits = min(precision, DOUBLE_DIGITS)
+    return f"{Integer(value).evalf(digits) if isinstance(value, int) else Float(value, digits)}"
+
+def numeric_environment(deg_mode: bool = True) -> dict:
+    """
+    Numeric-tier globals: math functions plus user variables that hold plain
+    numbers. Symbolic variables are left unbound so they force escalation.
+    """
+    cached = _numeric_envs.get(deg_mode)
+    if cached is not None and cached[0] == namespace_version:
+        return cached[1]
+
+    variables, unbound = {}, []
+    for name, value in user_namespace.items():
+        try:
+            if value.is_Integer:
+                variables[name] = int(value)
+            elif value.is_number and value.is_real:
+                variables[name] = float(value)
+            else:
+                unbound.append(name)
+        except (AttributeError, TypeError, OverflowError):
+            unbound.append(name)
+
+    env = numeric.build_environment(deg_mode, variables, unbound)
+    _numeric_envs[deg_mode] = (namespace_version, env)
+    return env
+
+def evaluate_expression_units(expr: str, deg_mode: bool = True):
+    """
+    Evaluates arithmetic on quantities, e.g. 3 ft + 20 cm in m or
+    9.81 m/s^2 * 70 kg, with an optional trailing "in <unit>" / "to <unit>".
+    Returns None when the expression does not use units, or when it has no
+    target unit and does not evaluate as quantities ("2m + 3"): SymPy then
+    reads the units as symbols.
+    """
+    expr = normalize_expression(expr)
+    if '=' in expr:
+        return assign_quantity(expr, deg_mode)
+
+    timing = metrics.enabled
+    if timing:
+        started = metrics.clock()
+    try:
+        plan = unit_plan(expr, deg_mode)
+        if plan is None:
+            return None
+
+        if plan.affine is not None:
+            number, symbol = plan.affine
+            value = units.convert(number, symbol, plan.target[0])
+            return f"✅ Result: {format_numeric(value)} {plan.target[0].replace('**', '^')}"
+
+        value = evaluate_unit_plan(plan)
+        if value is None:
+            return None
+        if isinstance(value, units.Quantity):
+            value, dimension = value.value, value.dimension
+        else:
+            dimension = units.DIMENSIONLESS
+        if not isinstance(value, (int, float)) or not math.isfinite(value):
+            return "❌ Error: Result is not a finite real number"
+
+        if plan.target is None:
+            label = units.format_dimension(dimension)
+        else:
+            label, scale, offset, target_dimension = plan.target
+            if dimension != target_dimension:
+                return f"❌ Error: Cannot convert {units.format_dimension(dimension)} to {label}"
+            value = (value - offset) / scale
+        return f"✅ Result: {format_numeric(value)}" + ("" if label == "1" else f" {label.replace('**', '^')}")
+
+    except Exception as e:
+        return f"❌ Error: {str(e)}"
+    finally:
+        if timing:
+            metrics.record('units', started)
+
+def assign_quantity(expr: str, deg_mode: bool = True):
+    """
+    Unit-aware assignment: "x = 3 ft" stores 0.9144*m (SI magnitude times
+    base-unit symbols) instead of a symbolic ft, so x keeps working in later
+    unit arithmetic and conversions. Returns None when the right-hand side
+    does not use units (see evaluate_expression_units).
+    """
+    var_name, value_expr = map(str.strip, expr.split('=', 1))
+    if not var_name.isidentifier():
+        return None
+    try:
+        plan = unit_plan(value_expr, deg_mode)
+        if plan is None:
+            return None
+        if plan.affine is not None:
+            number, symbol = plan.affine
+            value = units.Quantity(units.convert(number, symbol, 'K'), units.parse_unit('K').dimension)
+        else:
+            value = evaluate_unit_plan(plan)
+            if value is None:
+                return None
+        if isinstance(value, units.Quantity):
+            value, dimension = value.value, value.dimension
+        else:
+            dimension = units.DIMENSIONLESS
+        if not isinstance(value, (int, float)) or not math.isfinite(value):
+            return "❌ Error: Result is not a finite real number"
+    except Exception as e:
+        return f"❌ Error: {str(e)}"
+
+    user_namespace[var_name] = Float(value, DOUBLE_DIGITS) * Mul(*(
+        Symbol(base) ** power for base, power in zip(units.BASE_UNITS, dimension) if power
+    ))
+    invalidate_expression_cache()
+    label = units.format_dimension(dimension)
+    return f"✅ Assigned: {var_name} = {format_numeric(value)}" + ("" if label == "1" else f" {label}")
+
+def quantity_variables() -> dict:
+    """
+    User variables holding quantities (stored by assign_quantity as a number
+    times base-unit symbols), as units.Quantity values for the units tier.
+    """
+    global _quantity_variables
+    if _quantity_variables[0] == namespace_version:
+        return _quantity_variables[1]
+
+    quantities = {}
+    base_env = {base: units.unit_quantity(base) for base in units.BASE_UNITS}
+    for name, value in user_namespace.items():
+        symbols = getattr(value, 'free_symbols', None)
+        if not symbols or any(s.name not in base_env or s.name in user_namespace for s in symbols):
+            continue
+        compiled = numeric.compile_cached(str(value))
+        if compiled is None:
+            continue
+        try:
+            quantities[name] = compiled(base_env)
+        except Exception:
+            continue
+    _quantity_variables = (namespace_version, quantities)
+    return quantities
+
+def evaluate_unit_plan(plan):
+    """
+    Runs a unit plan. Without a target unit the units were only implied, so a
+    dimension or type error returns None instead of raising.
+    """
+    if plan.target is not None:
+        return plan.compiled(plan.env)
+    try:
+        return plan.compiled(plan.env)
+    except (TypeError, ValueError):
+        return None
+
+def unit_plan(expr: str, deg_mode: bool = True):
+    """
+    Cached build_unit_plan for a normalized expression.
+    """
+    key = (expr, deg_mode, namespace_version)
+    if key in _unit_plans:
+        _unit_plans.move_to_end(key)
+        return _unit_plans[key]
+
+    plan = build_unit_plan(expr, deg_mode)
+    _unit_plans[key] = plan
+    while len(_unit_plans) > expression_cache_size:
+        _unit_plans.popitem(last=False)
+    return plan
+
+def build_unit_plan(expr: str, deg_mode: bool = True):
+    """
+    Resolves every unit in an expression to its SI scale factor. Returns None
+    when the expression is not about units: names that are user variables,
+    functions or constants keep their meaning, and without a trailing target
+    unit at least one unit must directly follow a number ("3 m", not "m").
+    """
+    env = numeric_environment(deg_mode)
+    source, target = split_conversion(expr, env)
+
+    # Offset units (degC, degF) only make sense converted on their own
+    lone = _LONE_QUANTITY_RE.fullmatch(source)
+    if lone and lone.group(2) not in env and units.is_unit(lone.group(2)) and units.parse_unit(lone.group(2)).offset:
+        target = target or 'K'
+        units.conversion(lone.group(2), target)
+        return UnitPlan(None, None, (target,), (float(lone.group(1)), lone.group(2)))
+
+    compiled = numeric.compile_cached(source)
+    if compiled is None:
+        return None
+
+    quantities = {name: value for name, value in quantity_variables().items() if name in compiled.names}
+    unit_names = {name for name in compiled.names - env.keys() - quantities.keys() if units.is_unit(name)}
+    if not (unit_names or quantities) or compiled.names - env.keys() - quantities.keys() - unit_names:
+        return None
+    if target is None and not quantities and not _number_before_unit(source, unit_names):
+        return None
+    if target is None and unit_names and unit_names <= VARIABLE_LIKE_UNITS:
+        return None
+
+    if unit_names:
+        grouped = _group_quantities(source, unit_names)
+        if grouped != source:
+            compiled = numeric.compile_expression(grouped)
+
+    unit_env = {**env, **units.quantity_functions, **quantities}
+    unit_env.update((name, units.unit_quantity(name)) for name in unit_names)
+    if target is not None:
+        unit = units.parse_unit(target)
+        if unit.offset and unit_names:
+            units.unit_quantity(target)  # raises: arithmetic results cannot land on an offset scale
+        target = (target, float(unit.scale), float(unit.offset), unit.dimension)
+    return UnitPlan(compiled, unit_env, target, None)
+
+def split_conversion(expr: str, env: dict):
+    """
+    Splits "<expression> in <unit>" (or "to <unit>") into its two halves.
+    The last " in " followed by a valid unit wins, so "3 in + 2 in in cm"
+    still works. Returns (expr, None) when there is no target unit.
+    """
+    for match in reversed(list(_CONVERSION_RE.finditer(expr))):
+        target = expr[match.end():].strip()
+        if target not in env and units.is_unit(target):
+            return expr[:match.start()], target
+    return expr, None
+
+def _group_quantities(source: str, unit_names) -> str:
+    """
+    Binds each number to the unit after it, so "3 m / 1 ft" means
+    (3 m) / (1 ft). Quantities written side by side with nothing between
+    them are a mixed-unit sum ("5 ft 11 in", "1 h 30 min"); side by side
+    quantities of different dimensions are rejected rather than multiplied.
+    A number right after ** is an exponent, so "2**3 m" stays 2**3 * m.
+    """
+    pairs = re.compile(rf"(?<![\w.])(?<!\*\*)(?<!\*\*\s)({_NUMBER})\s*({'|'.join(map(re.escape, unit_names))})(?!\w)(\s*\*\*\s*\d+)?")
+    parts, end, previous = [], 0, None
+    for match in pairs.finditer(source):
+        between = source[end:match.start()]
+        unit = match.group(2) + (match.group(3) or '').replace(' ', '')
+        dimension = units.parse_unit(unit).dimension
+        if previous is not None and not between.strip():
+            if dimension != previous:
+                raise units.UnitError(
+                    f"Put an operator between {units.format_dimension(previous)} and "
+                    f"{units.format_dimension(dimension)} quantities"
+                )
+            between = " + "
+        parts.append(between)
+        parts.append(f"({match.group(1)}*{unit})")
+        end, previous = match.end(), dimension
+    parts.append(source[end:])
+    return "".join(parts)
+
+def _number_before_unit(source: str, unit_names) -> bool:
+    tokens = numeric.tokenize(source)
+    return any(
+        (kind == 'number' or text == ')') and tokens[i + 1][1] in unit_names
+        for i, (kind, text) in enumerate(tokens[:-1])
+    )
 
 def evaluate_expression_sympy(expr: str, deg_mode: bool = True) -> str:
     """
@@ -49,7 +534,7 @@ def evaluate_expression_sympy(expr: str, deg_mode: bool = True) -> str:
     """
     global user_namespace
     try:
-        expr = expr.strip().replace("^", "**").replace("÷", "/").replace("\u00d7", "*").replace("\u03c0", "pi")
+        expr = normalize_expression(expr)
 
         # Variable assignment (e.g., x = 2 + 3)
         if '=' in expr:
@@ -57,73 +542,525 @@ def evaluate_expression_sympy(expr: str, deg_mode: bool = True) -> str:
             if not var_name.isidentifier():
                 return "❌ Invalid variable name."
 
-            parsed_value = parse_expr(value_expr, local_dict={**allowed_symbols, **user_namespace}, transformations=transformations)
-            if deg_mode:
-                parsed_value = apply_degree_mode(parsed_value)
+            parsed_value = parse_cached(value_expr, deg_mode)
 
             user_namespace[var_name] = parsed_value
-            return f"✅ Assigned: {var_name} = {parsed_value.evalf()}"
+            invalidate_expression_cache()
+            return f"✅ Assigned: {var_name} = {evalf_cached(parsed_value, precision)}"
 
         # Normal expression evaluation
-        parsed_expr = parse_expr(expr, local_dict={**allowed_symbols, **user_namespace}, transformations=transformations)
-        if deg_mode:
-            parsed_expr = apply_degree_mode(parsed_expr)
+        parsed_expr = parse_cached(expr, deg_mode)
 
-        result = parsed_expr.evalf()
+        timing = metrics.enabled
+        if timing:
+            started = metrics.clock()
+        result = evalf_cached(parsed_expr, precision)
+        if timing:
+            metrics.record('evalf', started)
         return f"✅ Result: {result}"
 
+    except MemoryError:
+        raise  # let guarded evaluation report it as a limit, not a result
     except Exception as e:
         return f"❌ Error: {str(e)}"
 
+def normalize_expression(expr: str) -> str:
+    """
+    Canonical form of an expression: calculator symbols mapped to SymPy syntax
+    and whitespace collapsed, so equivalent inputs share one cache entry.
+    """
+    timing = metrics.enabled
+    if timing:
+        started = metrics.clock()
+    expr = expr.replace("^", "**").replace("÷", "/").replace("\u00d7", "*").replace("\u03c0", "pi")
+    expr = " ".join(expr.split())
+    if timing:
+        metrics.record('normalize', started)
+    return expr
+
+def parse_cached(expr: str, deg_mode: bool = True):
+    """
+    Parses a normalized expression through the LRU cache; in degree mode the
+    angle functions come from degree_symbols.
+    """
+    exact = precision > DOUBLE_DIGITS
+    key = (expr, deg_mode, namespace_version, exact)
+    cached = _expression_cache.get(key)
+    if cached is not None:
+        _expression_cache.move_to_end(key)
+        _cache_stats['hits'] += 1
+        if metrics.enabled:
+            metrics.increment('parse_cache_hits')
+        return cached
+
+    _cache_stats['misses'] += 1
+    timing = metrics.enabled
+    if timing:
+        started = metrics.clock()
+    parsed = parse_expr(expr, local_dict={**symbol_table(deg_mode), **user_namespace},
+                        transformations=exact_transformations if exact else transformations)
+    if timing:
+        metrics.record('parse', started)
+
+    _expression_cache[key] = parsed
+    while len(_expression_cache) > expression_cache_size:
+        _expression_cache.popitem(last=False)
+        _cache_stats['evictions'] += 1
+    return parsed
+
+def invalidate_expression_cache():
+    """
+    Drops every cached tree. Call after changing user_namespace directly;
+    assignments through the evaluator do this automatically.
+    """
+    global namespace_version
+    namespace_version += 1
+    if _expression_cache:
+        _cache_stats['invalidations'] += 1
+    _expression_cache.clear()
+    _unit_plans.clear()
+    _evalf_cache.clear()
+    _formulas.clear()
+
+def set_expression_cache_size(size: int):
+    """
+    Resizes the expression cache, evicting least recently used entries if needed.
+    """
+    global expression_cache_size
+    expression_cache_size = max(0, int(size))
+    while len(_expression_cache) > expression_cache_size:
+        _expression_cache.popitem(last=False)
+        _cache_stats['evictions'] += 1
+
+def get_cache_stats() -> dict:
+    """
+    Returns hit/miss/eviction counters plus the current cache occupancy.
+    """
+    return {**_cache_stats, 'size': len(_expression_cache), 'max_size': expression_cache_size}
+
+def reset_cache_stats():
+    """
+    Zeroes the cache counters without touching cached entries.
+    """
+    for name in _cache_stats:
+        _cache_stats[name] = 0
+
 def evaluate_expression_math(expression: str) -> str:
     """
     Basic math-only evaluator using Python's math module.
     Used as a fallback or for simpler fast calculations.
     """
     try:
-        replacements = {
-            '^': '**', '×': '*', '÷': '/',
-            'π': 'math.pi', 'e': 'math.e', '√': 'math.sqrt',
-            'sin': 'math.sin', 'cos': 'math.cos', 'tan': 'math.tan',
-            'log': 'math.log10', 'ln': 'math.log', '!': 'math.factorial'
-        }
+        # compile_expression re-raises the parse error when the cache holds None
+        compiled = numeric.compile_cached(expression) or numeric.compile_expression(expression)
+        result = numeric.evaluate(compiled, _math_fallback_env)
+        return str(result)
 
-        for word, repl in replacements.items():
-            expression = expression.replace(word, repl)
-
-        # Implicit multiplication handler: 2(3) → 2*(3), etc.
-        new_expr = ""
-        prev = ""
-        for ch in expression:
-            if ch == '(' and (prev.isdigit() or prev == ')'):
-                new_expr += '*' + ch
-            elif ch.isalpha() and (prev.isdigit() or prev == ')'):
-                new_expr += '*' + ch
-            else:
-                new_expr += ch
-            prev = ch
+    except Exception as e:
+        return f"❌ Error: {str(e)}"
 
-        result = eval(new_expr, {"__builtins__": {}}, {"math": math})
-        return str(result)
+def evalf_cached(tree, digits: int):
+    """
+    tree.evalf(digits) through an LRU cache shared by every precision level.
+    """
+    key = (tree, digits)
+    cached = _evalf_cache.get(key)
+    if cached is not None:
+        _evalf_cache.move_to_end(key)
+        return cached
+
+    result = tree.evalf(digits)
+    _evalf_cache[key] = result
+    while len(_evalf_cache) > expression_cache_size:
+        _evalf_cache.popitem(last=False)
+    return result
+
+@lru_cache(maxsize=32)
+def precision_constants(digits: int) -> dict:
+    """
+    pi and e as mpmath numbers carrying `digits` significant digits (plus
+    guard digits), computed once per precision level.
+    """
+    with mpmath.workdps(digits + 10):
+        return {'pi': +mpmath.pi, 'e': +mpmath.e}
+
+@lru_cache(maxsize=256)
+def _mp_factorial(n, digits: int):
+    with mpmath.workdps(digits + 10):
+        return mpmath.factorial(n)
+
+@lru_cache(maxsize=32)
+def _mpmath_environment(digits: int) -> dict:
+    def factorial_at_precision(n):
+        return _mp_factorial(n, digits)
+
+    functions = {
+        'sin': mpmath.sin, 'cos': mpmath.cos, 'tan': mpmath.tan,
+        'asin': mpmath.asin, 'acos': mpmath.acos, 'atan': mpmath.atan,
+        'log': mpmath.log10, 'log10': mpmath.log10, 'ln': mpmath.ln,
+        'sqrt': mpmath.sqrt, 'abs': mpmath.fabs, 'exp': mpmath.exp,
+        'factorial': factorial_at_precision,
+    }
+    for name in (*trig_functions, *inverse_trig_functions, *hyperbolic_functions):
+        functions.setdefault(name, getattr(mpmath, name))
+    env = numeric.build_environment(functions=functions)
+    for name in list(env):
+        # math.<name> keeps its meaning (natural log, radians) at full precision
+        if name.startswith("math.") and hasattr(mpmath, name[5:]):
+            env[name] = getattr(mpmath, name[5:])
+    env['math.factorial'] = factorial_at_precision
+    constants = precision_constants(digits)
+    env.update({'pi': constants['pi'], 'e': constants['e'], 'E': constants['e'],
+                'math.pi': constants['pi'], 'math.e': constants['e']})
+    return env
+
+def evaluate_expression_mpmath(expression: str, digits: int) -> str:
+    """
+    The math fallback at arbitrary precision: the same grammar and radian
+    semantics as evaluate_expression_math, evaluated with mpmath at `digits`.
+    """
+    try:
+        compiled = numeric.compile_cached(expression) or numeric.compile_expression(expression)
+        env = _mpmath_environment(digits)
+        missing = compiled.names - env.keys()
+        if missing:
+            raise NameError(f"name '{sorted(missing)[0]}' is not defined")
+        with mpmath.workdps(digits):
+            return mpmath.nstr(+compiled(env), digits)
 
     except Exception as e:
         return f"❌ Error: {str(e)}"
 
-def apply_degree_mode(expr):
-    """
-    Converts radians to degrees for trig functions.
-    """
-    return expr.replace(
-        sin, lambda x: sin(x * pi / 180)
-    ).replace(
-        cos, lambda x: cos(x * pi / 180)
-    ).replace(
-        tan, lambda x: tan(x * pi / 180)
-    ).replace(
-        asin, lambda x: asin(x) * 180 / pi
-    ).replace(
-        acos, lambda x: acos(x) * 180 / pi
-    ).replace(
-        atan, lambda x: atan(x) * 180 / pi
+class OptimizedFormula:
+    """
+    A formula compiled to plain Python by optimize_expression. Call it with
+    one value (or NumPy array, for the numpy backend) per variable, in order.
+    """
+
+    def __init__(self, source: str, function, path=None):
+        self.source = source
+        self.function = function
+        self.path = path
+        code = function.__code__
+        self.variables = code.co_varnames[:code.co_argcount]
+
+    def __call__(self, *args):
+        return self.function(*args)
+
+def _gamma_or_nan(x):
+    try:
+        return math.gamma(x)
+    except ValueError:
+        return math.nan  # poles at 0, -1, -2, ...
+    except OverflowError:
+        return math.inf
+
+# Element-wise gamma for generated NumPy code (NumPy has none); factorial(x) is gamma(x + 1)
+vector_gamma = np.vectorize(_gamma_or_nan, otypes=[float])
+
+def vector_sind(x):
+    r = np.fmod(x, 360.0)
+    return np.where(r % 180 == 0, 0.0, np.sin(np.radians(r)))
+
+def vector_cosd(x):
+    r = np.fmod(x, 360.0)
+    return np.where((r - 90) % 180 == 0, 0.0, np.cos(np.radians(r)))
+
+def vector_tand(x):
+    r = np.fmod(x, 180.0)
+    return np.where(r % 180 == 0, 0.0, np.where(r % 90 == 0, np.nan, np.tan(np.radians(r))))
+
+# Degree-mode sin, cos and tan in generated NumPy code: the angle is reduced
+# mod 360 in degrees, so multiples of 90 come out exact (sin(180) is 0, not
+# 1.2e-16) as they do in the numeric tier
+class sind(Function):
+    pass
+
+class cosd(Function):
+    pass
+
+class tand(Function):
+    pass
+
+_DEGREE_FUNCTIONS = {
+    sin: sind, cos: cosd, tan: tand,
+    sec: lambda u: 1 / cosd(u), csc: lambda u: 1 / sind(u), cot: lambda u: cosd(u) / sind(u),
+}
+
+def degree_trig(tree):
+    """
+    Rewrites every trig function of u*pi/180 (degree mode's radian conversion)
+    as sind(u), cosd(u), ... of the angle in degrees.
+    """
+    def in_degrees(node):
+        if node.func not in _DEGREE_FUNCTIONS:
+            return None
+        degrees = expand(node.args[0] * 180 / pi)
+        return None if degrees.has(pi) else degrees
+
+    return tree.replace(
+        lambda node: in_degrees(node) is not None,
+        lambda node: _DEGREE_FUNCTIONS[node.func](in_degrees(node)),
+    )
+
+class _FormulaNumPyPrinter(NumPyPrinter):
+    """
+    NumPyPrinter that keeps every allowed function vectorized: SymPy prints
+    factorial and gamma as math.* calls, which fail on arrays.
+    """
+
+    def _print_sind(self, expr):
+        return f"{self._module_format('logic.solver.vector_sind')}({self._print(expr.args[0])})"
+
+    def _print_cosd(self, expr):
+        return f"{self._module_format('logic.solver.vector_cosd')}({self._print(expr.args[0])})"
+
+    def _print_tand(self, expr):
+        return f"{self._module_format('logic.solver.vector_tand')}({self._print(expr.args[0])})"
+
+    def _print_factorial(self, expr):
+        return f"{self._module_format('logic.solver.vector_gamma')}({self._print(expr.args[0] + 1)})"
+
+    def _print_gamma(self, expr):
+        return f"{self._module_format('logic.solver.vector_gamma')}({self._print(expr.args[0])})"
+
+class _FormulaPythonPrinter(PythonCodePrinter):
+    """
+    PythonCodePrinter for the scalar "math" backend; math.factorial rejects
+    floats, so factorial goes through math.gamma as well.
+    """
+
+    def _print_factorial(self, expr):
+        return f"{self._module_format('math.gamma')}({self._print(expr.args[0] + 1)})"
+
+def fold_constants(tree):
+    """
+    Replaces every constant subexpression (sqrt(2), pi/180, ...) with its
+    float value, so repeated constants look alike to cse and cost nothing
+    at call time. Integers and fractions stay exact (x**2 keeps its integer
+    power); next to a float they are folded in when the tree is rebuilt.
+    """
+    if tree.is_Rational:
+        return tree
+    if tree.is_number:
+        return tree.evalf(DOUBLE_DIGITS + 2)
+    if tree.is_Atom:
+        return tree
+    return tree.func(*[fold_constants(arg) for arg in tree.args])
+
+def reduce_formula(tree):
+    """
+    Folds constants and pulls out shared subterms: (replacements, reduced)
+    as returned by SymPy cse.
+    """
+    replacements, (reduced,) = cse(fold_constants(tree), symbols=numbered_symbols('_cse'))
+    return replacements, reduced
+
+def generate_formula_source(tree, variables, backend: str = "numpy", reduced=None) -> str:
+    """
+    Python source of a function `_formula(*variables)` computing tree: shared
+    subterms become local assignments (SymPy cse) and constants are folded.
+    backend "numpy" works on arrays and scalars, "math" on scalars only.
+    `reduced` is a (replacements, expression) pair from reduce_formula to use
+    instead of reducing tree.
+    """
+    replacements, reduced = reduced or reduce_formula(tree)
+    printer = _FormulaNumPyPrinter() if backend == "numpy" else _FormulaPythonPrinter()
+    try:
+        body = [f"    {name} = {printer.doprint(value)}" for name, value in replacements]
+        body.append(f"    return {printer.doprint(reduced)}")
+    except Exception as e:
+        raise ValueError(f"Cannot generate code for this expression: {e}") from None
+    if backend == "numpy" and 'math' in printer.module_imports:
+        # A math.* call would only fail once it meets an array
+        scalar_only = ", ".join(sorted(printer.module_imports['math']))
+        raise ValueError(f"No vectorized implementation for: {scalar_only}")
+    imports = [f"import {module}" for module in sorted(printer.module_imports)]
+    return "\n".join([*imports, "", "", f"def _formula({', '.join(variables)}):", *body]) + "\n"
+
+def _load_formula(source: str, path=None) -> OptimizedFormula:
+    namespace = {}
+    exec(compile(source, path or "<formula>", "exec"), namespace)
+    return OptimizedFormula(source, namespace['_formula'], path)
+
+def _formula_key(expr, variables, deg_mode, backend) -> str:
+    # Everything the generated code depends on, including user variables the text reads
+    bindings = sorted(
+        (name, srepr(user_namespace[name])) for name in set(_NAME_RE.findall(expr))
+        if name in user_namespace and name not in (variables or ())
     )
+    text = repr((CODEGEN_VERSION, sympy.__version__, expr, variables, deg_mode, backend, bindings))
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+def optimize_expression(expr: str, variables=None, deg_mode: bool = True, backend: str = "numpy"):
+    """
+    Parses expr, folds constants, runs cse and generates a specialized Python
+    function for it (see generate_formula_source). Names in `variables` are
+    bound as arguments, shadowing user_namespace; by default every free
+    symbol becomes one, in sorted order. Raises ValueError for free names
+    that are not among the variables.
 
+    Results are cached in memory and, if formula_cache_dir is set, on disk
+    keyed by a hash of the expression and everything it depends on, so later
+    sessions skip parsing and cse. The files hold the reduced expression as
+    data; the code is always generated here.
+    """
+    expr = normalize_expression(expr)
+    resolve_variables(expr)
+    variables = None if variables is None else tuple(variables)
+    memory_key = (expr, variables, deg_mode, backend, namespace_version)
+    cached = _formulas.get(memory_key)
+    if cached is not None:
+        _formulas.move_to_end(memory_key)
+        _formula_stats['memory_hits'] += 1
+        return cached
+
+    path, formula = None, None
+    if formula_cache_dir:
+        path = os.path.join(formula_cache_dir, _formula_key(expr, variables, deg_mode, backend) + ".json")
+        try:
+            formula = _read_formula(path, backend)
+            _formula_stats['disk_hits'] += 1
+        except (OSError, ValueError, TypeError, KeyError, SyntaxError):
+            pass  # not cached yet (or unreadable): generate it again
+    if formula is None:
+        formula = _generate_formula(expr, variables, deg_mode, backend, path)
+        _formula_stats['generated'] += 1
+
+    _formulas[memory_key] = formula
+    while len(_formulas) > expression_cache_size:
+        _formulas.popitem(last=False)
+    return formula
+
+def _read_formula(path, backend):
+    from logic.session import parse_value  # session imports this module
+
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    replacements = [(Symbol(name), parse_value(value)) for name, value in data['replacements']]
+    reduced = parse_value(data['reduced'])
+    source = generate_formula_source(None, data['variables'], backend, (replacements, reduced))
+    os.utime(path)  # mark it recently used
+    return _load_formula(source, path)
+
+def _generate_formula(expr, variables, deg_mode, backend, path):
+    local_dict = {**symbol_table(deg_mode), **user_namespace}
+    if variables is not None:
+        local_dict.update({name: Symbol(name) for name in variables})
+    tree = parse_expr(expr, local_dict=local_dict, transformations=transformations)
+
+    free = sorted(str(symbol) for symbol in tree.free_symbols)
+    if variables is None:
+        variables = tuple(free)
+    unknown = set(free) - set(variables)
+    if unknown:
+        raise ValueError(f"Unknown variable(s): {', '.join(sorted(unknown))}")
+
+    if deg_mode and backend == "numpy":
+        tree = degree_trig(tree)
+    replacements, reduced = reduce_formula(tree)
+    source = generate_formula_source(tree, variables, backend, (replacements, reduced))
+    formula = _load_formula(source, path)
+    if path is not None:
+        data = {
+            'variables': list(variables),
+            'replacements': [[str(name), srepr(value)] for name, value in replacements],
+            'reduced': srepr(reduced),
+        }
+        try:
+            os.makedirs(formula_cache_dir, exist_ok=True)
+            partial = f"{path}.{os.getpid()}.tmp"
+            with open(partial, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+            os.replace(partial, path)  # readers never see a half-written file
+            _prune_formula_cache()
+        except OSError:
+            pass  # the cache is an optimization; an unwritable directory is fine
+    return formula
+
+def _prune_formula_cache():
+    # Least recently used first: reads touch their file (see _read_formula)
+    with os.scandir(formula_cache_dir) as entries:
+        files = [entry for entry in entries if entry.name.endswith(".json") and entry.is_file()]
+    if len(files) <= formula_cache_files:
+        return
+    files.sort(key=lambda entry: entry.stat().st_mtime)
+    for entry in files[:len(files) - formula_cache_files]:
+        try:
+            os.remove(entry.path)
+        except OSError:
+            pass
+
+def get_formula_cache_stats() -> dict:
+    """
+    How optimize_expression requests were served: from memory, from a cached
+    source file, or by generating code.
+    """
+    return {**_formula_stats, 'size': len(_formulas), 'directory': formula_cache_dir}
+
+def evaluate_array(expr: str, columns: dict, deg_mode: bool = True):
+    """
+    Evaluates expr for every row of `columns` (variable name → NumPy array or
+    sequence, all the same length) in one vectorized call of its optimized
+    NumPy function, e.g.
+
+        evaluate_array("v**2 / (2*g)", {"v": speeds, "g": 9.81 * np.ones(n)})
+
+    Returns a float64 array with NaN where the result is undefined or complex.
+    Runs at double precision whatever set_precision says.
+    """
+    names = tuple(columns)
+    arrays = [np.asarray(columns[name], dtype=float) for name in names]
+    if len({array.shape for array in arrays}) > 1:
+        raise ValueError("All columns must have the same length")
+    shape = arrays[0].shape if arrays else ()
+
+    kernel = optimize_expression(expr, names, deg_mode)
+    with np.errstate(all='ignore'):
+        result = np.asarray(kernel(*arrays))
+        if np.iscomplexobj(result):
+            result = np.where(np.abs(result.imag) < 1e-12, result.real, np.nan)
+        result = result.astype(float)
+    if result.shape != shape:
+        result = np.broadcast_to(result, shape).copy()  # constant expressions
+    return result
+
+def evaluate_csv(expr: str, source, sink, deg_mode: bool = True, column: str = "result",
+                 chunk_size: int = 65536, delimiter: str = ',', digits: int = 15):
+    """
+    Streams a CSV with a header row from source to sink, appending a `column`
+    with expr evaluated per row. Header names used in expr are its variables;
+    cells that are not numbers evaluate to NaN. Results are written with
+    `digits` significant digits. Returns the number of data rows written.
+    """
+    from logic.unit_batch import parse_cells  # a batch helper; keep it out of solver's imports
+
+    reader = csv.reader(source, delimiter=delimiter)
+    writer = csv.writer(sink, delimiter=delimiter, lineterminator="\n")
+
+    header = next(reader, None)
+    if header is None:
+        return 0
+    used = set(_NAME_RE.findall(normalize_expression(expr)))
+    variables = [(name, index) for index, name in enumerate(header) if name in used]
+    kernel_names = [name for name, _ in variables]
+    optimize_expression(expr, kernel_names, deg_mode)  # fail before reading any data
+    writer.writerow(header + [column])
+
+    number_format = f".{digits}g"
+    total = 0
+    while True:
+        rows = list(islice(reader, chunk_size))
+        if not rows:
+            break
+        columns = {
+            name: parse_cells([row[index] if index < len(row) else "" for row in rows])[0]
+            for name, index in variables
+        }
+        # With no variables in the header the expression is a constant
+        values = np.broadcast_to(evaluate_array(expr, columns, deg_mode), len(rows))
+        for row, value in zip(rows, values.tolist()):
+            row.append(format(value, number_format))
+        writer.writerows(rows)
+        total += len(rows)
+    return total
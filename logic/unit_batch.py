@@ -0,0 +1,176 @@
+# File: logic/unit_batch.py
+
+"""
+Bulk unit conversion for NumPy arrays and CSV exports.
+
+Uses the same registry as the converter tab (logic.units), so every unit and
+compound unit it accepts works here. Arrays are converted with one
+multiply(-add) pass, in place when the caller allows it; CSV files are
+streamed in chunks of rows so files larger than memory are fine.
+
+    python -m logic.unit_batch readings.csv -c temp:degF:degC -c speed:mph:km/h -o out.csv
+    cat raw.csv | python -m logic.unit_batch --no-header -c 0:psi:kPa
+"""
+
+import argparse
+import csv
+import sys
+from itertools import islice
+
+import numpy as np
+
+from logic.units import UnitError, conversion
+
+
+def convert_array(values, from_unit: str, to_unit: str, inplace: bool = False):
+    """
+    Converts a NumPy array (or anything array-like) between two units.
+
+    With inplace=True a writable floating-point array is overwritten and
+    returned; otherwise (or for integer input) one new float array is
+    allocated and the transform is applied to it in place.
+    """
+    factor, shift = conversion(from_unit, to_unit)
+    if inplace and isinstance(values, np.ndarray) and values.dtype.kind == 'f' and values.flags.writeable:
+        out = values
+        np.multiply(values, factor, out=out, casting='unsafe')
+    else:
+        values = np.asarray(values)
+        out = np.multiply(values, factor, dtype=values.dtype if values.dtype.kind == 'f' else float)
+    if shift:
+        np.add(out, shift, out=out, casting='unsafe')
+    return out
+
+
+def parse_column_spec(spec: str):
+    """
+    'column:from:to' → (column, from_unit, to_unit). The column is a header
+    name or a 0-based index.
+    """
+    try:
+        column, from_unit, to_unit = spec.rsplit(':', 2)
+    except ValueError:
+        raise UnitError(f"Expected column:from:to, got {spec!r}") from None
+    conversion(from_unit, to_unit)  # fail before reading any data
+    return column, from_unit, to_unit
+
+
+def _resolve_columns(specs, header):
+    resolved = []
+    for column, from_unit, to_unit in specs:
+        if header is not None and column in header:
+            index = header.index(column)
+        elif column.isdigit():
+            index = int(column)
+        else:
+            raise UnitError(f"Unknown column: {column}")
+        resolved.append((index, conversion(from_unit, to_unit)))
+    return resolved
+
+
+def parse_cells(cells):
+    """
+    Cells → float array; cells that are not numbers become NaN and are
+    reported in the returned mask so they can be written back unchanged.
+    """
+    try:
+        return np.array(cells, dtype=float), None
+    except ValueError:
+        values = np.empty(len(cells))
+        bad = np.zeros(len(cells), dtype=bool)
+        for i, cell in enumerate(cells):
+            try:
+                values[i] = float(cell)
+            except ValueError:
+                values[i] = np.nan
+                bad[i] = True
+        return values, bad
+
+
+def convert_rows(rows, columns, precision: int = 15):
+    """
+    Converts the given columns of a chunk of CSV rows in place.
+    columns is a list of (index, (factor, shift)).
+    """
+    number_format = f".{precision}g"
+    for index, (factor, shift) in columns:
+        cells = [row[index] if index < len(row) else "" for row in rows]
+        values, bad = parse_cells(cells)
+        values *= factor
+        if shift:
+            values += shift
+        for i, (row, value) in enumerate(zip(rows, values.tolist())):
+            if index < len(row) and (bad is None or not bad[i]):
+                row[index] = format(value, number_format)
+    return rows
+
+
+def convert_csv(source, sink, specs, header: bool = True, chunk_size: int = 65536,
+                delimiter: str = ',', precision: int = 15):
+    """
+    Streams a CSV from source to sink, converting the columns in specs
+    (list of (column, from_unit, to_unit)) chunk by chunk. Returns the number
+    of data rows written.
+    """
+    reader = csv.reader(source, delimiter=delimiter)
+    writer = csv.writer(sink, delimiter=delimiter, lineterminator="\n")
+
+    header_row = next(reader, None) if header else None
+    if header_row is not None:
+        writer.writerow(header_row)
+    columns = _resolve_columns(specs, header_row)
+
+    total = 0
+    while True:
+        rows = list(islice(reader, chunk_size))
+        if not rows:
+            break
+        writer.writerows(convert_rows(rows, columns, precision))
+        total += len(rows)
+    return total
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="python -m logic.unit_batch",
+        description="Convert CSV columns between units, streaming the file in chunks."
+    )
+    parser.add_argument("input", nargs="?", default="-", help="CSV file ('-' for stdin)")
+    parser.add_argument("-o", "--output", default="-", help="CSV output file ('-' for stdout)")
+    parser.add_argument("-c", "--column", action="append", required=True, metavar="COLUMN:FROM:TO",
+                        help="column (header name or 0-based index) and its units; repeatable")
+    parser.add_argument("--no-header", action="store_true", help="the first row is data, not column names")
+    parser.add_argument("--delimiter", default=",", help="field separator")
+    parser.add_argument("--chunk-size", type=int, default=65536, help="rows converted per chunk")
+    parser.add_argument("--precision", type=int, default=15, help="significant digits written")
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    try:
+        specs = [parse_column_spec(spec) for spec in args.column]
+    except UnitError as e:
+        parser.error(str(e))
+
+    source = sys.stdin if args.input == "-" else open(args.input, newline="", encoding="utf-8")
+    sink = sys.stdout if args.output == "-" else open(args.output, "w", newline="", encoding="utf-8")
+    try:
+        convert_csv(
+            source, sink, specs, header=not args.no_header, chunk_size=args.chunk_size,
+            delimiter=args.delimiter, precision=args.precision
+        )
+    except UnitError as e:
+        print(f"❌ Error: {str(e)}", file=sys.stderr)
+        return 1
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if sink is not sys.stdout:
+            sink.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
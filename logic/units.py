@@ -0,0 +1,456 @@
+# File: logic/units.py
+
+"""
+GUI-free unit registry used by the unit converter.
+
+Every unit is stored as a scale and offset relative to the SI base units plus
+a dimension vector (exponents of m, kg, s, A, K, mol, cd), so a value v in a
+unit is v * scale + offset in SI. SI prefixes (km, mg, kWh, ...) and compound
+units (m/s, kg*m/s^2, km/h) are resolved from that table on demand.
+
+Converting between two units with the same dimension is therefore one
+multiply-add, out = v * factor + shift. The factors for the units listed in
+CATEGORIES are precomputed into a matrix per dimension, and every other pair
+is cached after the first lookup.
+
+    >>> convert(100, 'degC', 'degF')
+    212.0
+    >>> convert(36, 'km/h', 'm/s')
+    10.0
+"""
+
+import math
+import re
+from collections import namedtuple
+from fractions import Fraction
+from functools import lru_cache
+
+import numpy as np
+
+
+class UnitError(ValueError):
+    """Raised for unknown units and conversions between different dimensions."""
+
+
+BASE_UNITS = ('m', 'kg', 's', 'A', 'K', 'mol', 'cd')
+DIMENSIONLESS = (0,) * len(BASE_UNITS)
+
+# scale and offset are exact Fractions; they only become floats in conversions
+Unit = namedtuple('Unit', 'scale offset dimension')
+
+PREFIXES = {
+    'Y': 24, 'Z': 21, 'E': 18, 'P': 15, 'T': 12, 'G': 9, 'M': 6, 'k': 3,
+    'h': 2, 'da': 1, 'd': -1, 'c': -2, 'm': -3, 'u': -6, 'µ': -6, 'μ': -6,
+    'n': -9, 'p': -12, 'f': -15, 'a': -18, 'z': -21, 'y': -24,
+}
+PREFIXES = {prefix: Fraction(10) ** power for prefix, power in PREFIXES.items()}
+
+_units = {}
+_prefixable = set()
+
+
+def define_unit(names, definition, scale=1, offset=0, prefixable=False):
+    """
+    Adds a unit to the registry. definition is one of BASE_UNITS or a unit
+    expression over units already defined, scale multiplies it and offset is
+    added in SI (for affine units such as degC). The first name is canonical;
+    the others are aliases.
+    """
+    names = names.split() if isinstance(names, str) else names
+    if definition in BASE_UNITS:
+        dimension = tuple(int(base == definition) for base in BASE_UNITS)
+        base = Unit(Fraction(1), Fraction(0), dimension)
+    else:
+        base = parse_unit(definition)
+
+    unit = Unit(base.scale * Fraction(scale), base.offset + Fraction(offset), base.dimension)
+    for name in names:
+        _units[name] = unit
+        if prefixable:
+            _prefixable.add(name)
+    parse_unit.cache_clear()
+    factor_matrix.cache_clear()
+    conversion.cache_clear()
+    return unit
+
+
+def _multiply(a: Unit, b: Unit, power: int = 1) -> Unit:
+    return Unit(
+        a.scale * b.scale ** power, Fraction(0),
+        tuple(x + power * y for x, y in zip(a.dimension, b.dimension)),
+    )
+
+
+def lookup_unit(symbol: str) -> Unit:
+    """
+    A single unit symbol, with an optional SI prefix (km, µs, kWh).
+    """
+    unit = _units.get(symbol)
+    if unit is not None:
+        return unit
+    for prefix in sorted(PREFIXES, key=len, reverse=True):
+        rest = symbol[len(prefix):]
+        if symbol.startswith(prefix) and rest in _prefixable:
+            unit = _units[rest]
+            return Unit(unit.scale * PREFIXES[prefix], Fraction(0), unit.dimension)
+    raise UnitError(f"Unknown unit: {symbol}")
+
+
+_SUPERSCRIPTS = {'²': 2, '³': 3}
+_TOKEN_RE = re.compile(r"""
+    (?P<space>\s+)
+  | (?P<number>\d+(?:\.\d*)?(?:[eE][+-]?\d+)?)
+  | (?P<name>[A-Za-z°µμΩ_]+)
+  | (?P<power>(?:\^|\*\*)\s*\(?\s*(?P<exponent>-?\d+)\s*\)?|[²³])
+  | (?P<op>[*/·])
+""", re.VERBOSE)
+
+
+@lru_cache(maxsize=1024)
+def parse_unit(text: str) -> Unit:
+    """
+    Resolves a unit expression such as 'km/h', 'kg*m/s^2', 'kW h' or 'm²'
+    to its SI scale and dimension. Terms are combined left to right, so
+    a/b*c means (a/b)*c. Affine units (degC, degF) are only valid alone.
+    """
+    text = text.strip()
+    if not text:
+        raise UnitError("Empty unit")
+
+    terms = []  # [operator, Unit, exponent, symbol]
+    pending_op = '*'
+    pos = 0
+    while pos < len(text):
+        match = _TOKEN_RE.match(text, pos)
+        if match is None:
+            raise UnitError(f"Unexpected character {text[pos]!r} in unit {text!r}")
+        pos = match.end()
+        kind = match.lastgroup if match.lastgroup != 'exponent' else 'power'
+        if kind == 'space':
+            continue
+        if kind == 'op':
+            if pending_op is not None and terms:
+                raise UnitError(f"Missing unit in {text!r}")
+            pending_op = '/' if match.group() == '/' else '*'
+        elif kind == 'power':
+            if not terms or pending_op is not None:
+                raise UnitError(f"Misplaced exponent in {text!r}")
+            exponent = match.group('exponent')
+            terms[-1][2] *= int(exponent) if exponent else _SUPERSCRIPTS[match.group()]
+        else:
+            if kind == 'number':
+                unit = Unit(Fraction(match.group()), Fraction(0), DIMENSIONLESS)
+            else:
+                unit = lookup_unit(match.group())
+            terms.append([pending_op or '*', unit, 1, match.group()])
+            pending_op = None
+
+    if pending_op is not None:
+        raise UnitError(f"Missing unit in {text!r}")
+
+    if len(terms) == 1 and terms[0][0] == '*' and terms[0][2] == 1:
+        return terms[0][1]
+
+    result = Unit(Fraction(1), Fraction(0), DIMENSIONLESS)
+    for op, unit, exponent, symbol in terms:
+        if unit.offset:
+            raise UnitError(f"{symbol} has an offset and cannot be part of a compound unit")
+        result = _multiply(result, unit, -exponent if op == '/' else exponent)
+    return result
+
+
+def is_unit(text: str) -> bool:
+    try:
+        parse_unit(text)
+    except UnitError:
+        return False
+    return True
+
+
+ConversionMatrix = namedtuple('ConversionMatrix', 'units index factor shift')
+
+
+@lru_cache(maxsize=None)
+def factor_matrix(category: str) -> ConversionMatrix:
+    """
+    Precomputed conversions between all units of a category:
+    value_in_j = value_in_i * factor[i, j] + shift[i, j].
+    """
+    names = CATEGORIES[category]
+    parsed = [parse_unit(name) for name in names]
+    factor = np.empty((len(names), len(names)))
+    shift = np.empty((len(names), len(names)))
+    for i, source in enumerate(parsed):
+        for j, target in enumerate(parsed):
+            factor[i, j] = source.scale / target.scale
+            shift[i, j] = (source.offset - target.offset) / target.scale
+    factor.flags.writeable = False
+    shift.flags.writeable = False
+    return ConversionMatrix(tuple(names), {name: i for i, name in enumerate(names)}, factor, shift)
+
+
+def category_of(unit: str):
+    """
+    Converter category of a unit ('Length', 'Speed', ...) or None.
+    """
+    return DIMENSION_CATEGORIES.get(parse_unit(unit).dimension)
+
+
+@lru_cache(maxsize=1024)
+def conversion(from_unit: str, to_unit: str):
+    """
+    (factor, shift) such that value_in_to = value_in_from * factor + shift.
+    Raises UnitError when the units measure different things.
+    """
+    source, target = parse_unit(from_unit), parse_unit(to_unit)
+    if source.dimension != target.dimension:
+        raise UnitError(f"Cannot convert {from_unit} to {to_unit}: incompatible dimensions")
+
+    category = DIMENSION_CATEGORIES.get(source.dimension)
+    if category is not None:
+        matrix = factor_matrix(category)
+        i, j = matrix.index.get(from_unit), matrix.index.get(to_unit)
+        if i is not None and j is not None:
+            return float(matrix.factor[i, j]), float(matrix.shift[i, j])
+
+    return float(source.scale / target.scale), float((source.offset - target.offset) / target.scale)
+
+
+def convert(value, from_unit: str, to_unit: str):
+    """
+    Converts a number (or NumPy array) between two compatible units.
+    """
+    factor, shift = conversion(from_unit, to_unit)
+    if shift:
+        return value * factor + shift
+    return value * factor
+
+
+class Quantity:
+    """
+    A float magnitude in SI units plus its dimension vector, used by the
+    solver for unit-bearing arithmetic. Adding or subtracting quantities of
+    different dimensions raises UnitError; multiplying and dividing combine
+    dimensions, and dimensionless results behave like plain floats.
+    """
+    __slots__ = ('value', 'dimension')
+
+    def __init__(self, value, dimension=DIMENSIONLESS):
+        self.value = value
+        self.dimension = dimension
+
+    @staticmethod
+    def _coerce(other):
+        if isinstance(other, Quantity):
+            return other
+        if isinstance(other, (int, float)) and not isinstance(other, bool):
+            return Quantity(other)
+        return None
+
+    def _same_dimension(self, other, verb):
+        other = Quantity._coerce(other)
+        if other is None:
+            return None
+        if other.dimension != self.dimension:
+            raise UnitError(
+                f"Cannot {verb} {format_dimension(self.dimension)} and {format_dimension(other.dimension)}"
+            )
+        return other
+
+    def __add__(self, other):
+        other = self._same_dimension(other, "add")
+        return NotImplemented if other is None else Quantity(self.value + other.value, self.dimension)
+
+    __radd__ = __add__
+
+    def __sub__(self, other):
+        other = self._same_dimension(other, "subtract")
+        return NotImplemented if other is None else Quantity(self.value - other.value, self.dimension)
+
+    def __rsub__(self, other):
+        other = self._same_dimension(other, "subtract")
+        return NotImplemented if other is None else Quantity(other.value - self.value, self.dimension)
+
+    def __mod__(self, other):
+        other = self._same_dimension(other, "take the remainder of")
+        return NotImplemented if other is None else Quantity(self.value % other.value, self.dimension)
+
+    def __mul__(self, other):
+        other = Quantity._coerce(other)
+        if other is None:
+            return NotImplemented
+        return Quantity(self.value * other.value, tuple(a + b for a, b in zip(self.dimension, other.dimension)))
+
+    __rmul__ = __mul__
+
+    def __truediv__(self, other):
+        other = Quantity._coerce(other)
+        if other is None:
+            return NotImplemented
+        return Quantity(self.value / other.value, tuple(a - b for a, b in zip(self.dimension, other.dimension)))
+
+    def __rtruediv__(self, other):
+        other = Quantity._coerce(other)
+        return NotImplemented if other is None else other / self
+
+    def __pow__(self, exponent):
+        exponent = float(exponent)
+        dimension = tuple(a * exponent for a in self.dimension)
+        if any(not d.is_integer() for d in dimension):
+            raise UnitError(f"Cannot raise {format_dimension(self.dimension)} to the power {exponent:g}")
+        return Quantity(self.value ** exponent, tuple(int(d) for d in dimension))
+
+    def __rpow__(self, base):
+        return Quantity(base ** float(self))
+
+    def __neg__(self):
+        return Quantity(-self.value, self.dimension)
+
+    def __pos__(self):
+        return self
+
+    def __abs__(self):
+        return Quantity(abs(self.value), self.dimension)
+
+    def __float__(self):
+        # Lets math functions accept dimensionless quantities (e.g. 3 m / 1 ft)
+        if self.dimension != DIMENSIONLESS:
+            raise UnitError(f"Expected a plain number, got a quantity in {format_dimension(self.dimension)}")
+        return float(self.value)
+
+
+def _quantity_sqrt(x):
+    return x ** 0.5 if isinstance(x, Quantity) else math.sqrt(x)
+
+
+# Functions that must see the Quantity itself rather than its float value
+quantity_functions = {'sqrt': _quantity_sqrt, 'abs': abs}
+
+
+def unit_quantity(symbol: str) -> Quantity:
+    """
+    One unit as a Quantity (its SI scale), for use as a constant in compiled
+    expressions. Affine units are rejected: 10 degC + 5 degC has no single
+    meaning, so temperatures with an offset can only be converted directly.
+    """
+    unit = parse_unit(symbol)
+    if unit.offset:
+        raise UnitError(f"{symbol} has an offset; convert it on its own, e.g. 20 {symbol} in K")
+    return Quantity(float(unit.scale), unit.dimension)
+
+
+def format_dimension(dimension) -> str:
+    """
+    Name of the SI unit for a dimension vector: a named unit when there is
+    one (N, J, m/s), otherwise built from base units (kg*m^2/s^3).
+    """
+    named = SI_UNIT_NAMES.get(dimension)
+    if named is not None:
+        return named
+    if dimension == DIMENSIONLESS:
+        return "1"
+
+    def join(parts):
+        return "*".join(base if power == 1 else f"{base}^{power}" for base, power in parts)
+
+    numerator = [(base, power) for base, power in zip(BASE_UNITS, dimension) if power > 0]
+    denominator = [(base, -power) for base, power in zip(BASE_UNITS, dimension) if power < 0]
+    # a/b/c reads as a/(b*c), which parse_unit understands
+    return (join(numerator) or "1") + "".join(f"/{join([part])}" for part in denominator)
+
+
+# Base units
+define_unit('m metre meter', 'm', prefixable=True)
+define_unit('g gram', 'kg', Fraction(1, 1000), prefixable=True)
+define_unit('s sec second', 's', prefixable=True)
+define_unit('A ampere', 'A', prefixable=True)
+define_unit('K kelvin', 'K', prefixable=True)
+define_unit('mol', 'mol', prefixable=True)
+define_unit('cd candela', 'cd', prefixable=True)
+
+# Length
+define_unit('in inch', 'm', '0.0254')
+define_unit('ft foot feet', 'in', 12)
+define_unit('yd yard', 'ft', 3)
+define_unit('mi mile', 'ft', 5280)
+define_unit('nmi', 'm', 1852)
+define_unit('au', 'm', 149597870700)
+define_unit('ly', 'm', 9460730472580800)
+
+# Mass
+define_unit('t tonne', 'kg', 1000)
+define_unit('lb lbs pound', 'kg', '0.45359237')
+define_unit('oz ounce', 'lb', Fraction(1, 16))
+define_unit('st stone', 'lb', 14)
+
+# Time
+define_unit('min minute', 's', 60)
+define_unit('h hr hour', 'min', 60)
+define_unit('day', 'h', 24)
+define_unit('week wk', 'day', 7)
+define_unit('yr year', 'day', '365.25')
+
+# Temperature: v * scale + offset gives kelvin
+define_unit('degC °C celsius', 'K', 1, '273.15')
+define_unit('degF °F fahrenheit', 'K', Fraction(5, 9), Fraction('273.15') - Fraction(160, 9))
+define_unit('degR °R rankine', 'K', Fraction(5, 9))
+
+# Area and volume
+define_unit('ha hectare', 'm^2', 10000)
+define_unit('acre', 'ft^2', 43560)
+define_unit('L l litre liter', 'dm^3', prefixable=True)
+define_unit('gal gallon', 'in^3', 231)
+define_unit('qt quart', 'gal', Fraction(1, 4))
+define_unit('pt pint', 'qt', Fraction(1, 2))
+define_unit('floz', 'pt', Fraction(1, 16))
+
+# Speed
+define_unit('mph', 'mi/h')
+define_unit('kph', 'km/h')
+define_unit('kn knot', 'nmi/h')
+
+# Mechanics and electricity
+define_unit('Hz hertz', '1/s', prefixable=True)
+define_unit('N newton', 'kg*m/s^2', prefixable=True)
+define_unit('lbf', 'lb*m/s^2', '9.80665')
+define_unit('J joule', 'N*m', prefixable=True)
+define_unit('W watt', 'J/s', prefixable=True)
+define_unit('Wh', 'W*h', prefixable=True)
+define_unit('eV', 'J', '1.602176634e-19', prefixable=True)
+define_unit('cal calorie', 'J', '4.184', prefixable=True)
+define_unit('BTU btu', 'J', '1055.05585262')
+define_unit('hp horsepower', 'W', '745.69987158227022')
+define_unit('Pa pascal', 'N/m^2', prefixable=True)
+define_unit('bar', 'Pa', 100000, prefixable=True)
+define_unit('atm', 'Pa', 101325)
+define_unit('psi', 'lbf/in^2')
+define_unit('mmHg', 'Pa', '133.322387415')
+define_unit('V volt', 'W/A', prefixable=True)
+define_unit('ohm Ω', 'V/A', prefixable=True)
+
+# Units offered by the converter tab, grouped by dimension
+CATEGORIES = {
+    "Length": ["mm", "cm", "m", "km", "in", "ft", "yd", "mi", "nmi"],
+    "Weight": ["mg", "g", "kg", "t", "oz", "lb", "st"],
+    "Temperature": ["degC", "degF", "K", "degR"],
+    "Time": ["ms", "s", "min", "h", "day", "week", "yr"],
+    "Area": ["cm^2", "m^2", "km^2", "ha", "in^2", "ft^2", "acre", "mi^2"],
+    "Volume": ["mL", "L", "m^3", "floz", "pt", "qt", "gal", "ft^3"],
+    "Speed": ["m/s", "km/h", "mph", "ft/s", "kn"],
+    "Energy": ["J", "kJ", "cal", "kcal", "Wh", "kWh", "eV", "BTU"],
+    "Power": ["W", "kW", "MW", "hp"],
+    "Pressure": ["Pa", "kPa", "bar", "atm", "psi", "mmHg"],
+}
+
+# Dimension vector → category name
+DIMENSION_CATEGORIES = {parse_unit(names[0]).dimension: category for category, names in CATEGORIES.items()}
+
+for _category in CATEGORIES:
+    factor_matrix(_category)
+
+# Preferred SI names when displaying a result without an explicit target unit
+SI_UNIT_NAMES = {
+    parse_unit(name).dimension: name
+    for name in ('m', 'kg', 's', 'A', 'K', 'mol', 'cd', 'm^2', 'm^3', 'm/s', 'm/s^2',
+                 'Hz', 'N', 'Pa', 'J', 'W', 'V', 'ohm')
+}
@@ -0,0 +1,215 @@
+# File: logic/voice_grammar.py
+
+"""
+Spoken-command grammar for voice input.
+
+One compiled regex tokenizes an utterance in a single pass, matching whole
+words only (so "exp" and "max" are never mangled the way per-word
+str.replace did). Tokens are then folded left to right: number words become
+numerals ("two hundred thirty five" → 235, "three point one four" → 3.14,
+paired tens as in years: "nineteen eighty four" → 1984),
+operator and function phrases become symbols, and navigation phrases become
+commands.
+
+    >>> parse_utterance("two hundred thirty five times sine of thirty")
+    VoiceParse(command=None, expression='235 * sin ( 30 )')
+"""
+
+import re
+from collections import namedtuple
+
+VoiceParse = namedtuple('VoiceParse', 'command expression')
+
+# Navigation commands, checked in this priority order when several are spoken
+COMMANDS = (
+    ('stop_voice', ('stop voice', 'stop listening')),
+    ('scientific', ('scientific', 'scientific mode')),
+    ('graph', ('graph', 'graph mode', 'graph plotter', 'plot')),
+    ('unit', ('unit', 'units', 'unit converter')),
+    ('dark_mode', ('dark mode', 'dark theme')),
+    ('light_mode', ('light mode', 'light theme')),
+)
+
+UNITS = {
+    'zero': 0, 'one': 1, 'two': 2, 'three': 3, 'four': 4, 'five': 5,
+    'six': 6, 'seven': 7, 'eight': 8, 'nine': 9, 'ten': 10, 'eleven': 11,
+    'twelve': 12, 'thirteen': 13, 'fourteen': 14, 'fifteen': 15,
+    'sixteen': 16, 'seventeen': 17, 'eighteen': 18, 'nineteen': 19,
+}
+TENS = {
+    'twenty': 20, 'thirty': 30, 'forty': 40, 'fifty': 50,
+    'sixty': 60, 'seventy': 70, 'eighty': 80, 'ninety': 90,
+}
+SCALES = {'hundred': 100, 'thousand': 1000, 'million': 10 ** 6, 'billion': 10 ** 9}
+
+OPERATORS = {
+    'plus': '+', 'add': '+', 'minus': '-', 'negative': '-',
+    'times': '*', 'into': '*', 'multiplied by': '*', 'multiply by': '*',
+    'divided by': '/', 'divide by': '/', 'divide': '/', 'over': '/',
+    'mod': '%', 'modulo': '%',
+    'power': '**', 'to the power of': '**', 'to the power': '**', 'raised to': '**',
+    'squared': '** 2', 'cubed': '** 3', 'factorial': '!',
+    'open bracket': '(', 'close bracket': ')',
+    'open parenthesis': '(', 'close parenthesis': ')',
+    'equals': '=', 'equal to': '=',
+}
+
+FUNCTIONS = {
+    'sine': 'sin', 'sin': 'sin', 'cosine': 'cos', 'cos': 'cos',
+    'tangent': 'tan', 'tan': 'tan', 'square root': 'sqrt', 'root': 'sqrt',
+    'natural log': 'ln', 'log': 'log', 'logarithm': 'log', 'exponential': 'exp',
+    'absolute value': 'abs',
+}
+
+CONSTANTS = {'pi': 'pi'}
+
+# Words that only glue phrases together ("sine of thirty", "one hundred and five")
+FILLERS = {'of', 'and', 'the'}
+
+_LEXICON = {}
+for kind, table in (('op', OPERATORS), ('func', FUNCTIONS), ('const', CONSTANTS)):
+    for phrase, value in table.items():
+        _LEXICON[phrase] = (kind, value)
+for phrase, value in {**UNITS, **TENS}.items():
+    _LEXICON[phrase] = ('num', value)
+for phrase, value in SCALES.items():
+    _LEXICON[phrase] = ('scale', value)
+_LEXICON['point'] = ('point', '.')
+for command, phrases in COMMANDS:
+    for phrase in phrases:
+        _LEXICON[phrase] = ('command', command)
+for word in FILLERS:
+    _LEXICON[word] = ('filler', word)
+
+# Longest phrases first so "divided by" wins over "divide", "natural log" over "log"
+_PHRASE_PATTERN = "|".join(
+    r"\s+".join(map(re.escape, phrase.split()))
+    for phrase in sorted(_LEXICON, key=len, reverse=True)
+)
+_TOKEN_RE = re.compile(
+    rf"(?P<phrase>\b(?:{_PHRASE_PATTERN})\b)"
+    r"|(?P<number>\d+(?:\.\d+)?)"
+    r"|(?P<word>[a-z_][a-z_0-9]*)"
+    r"|(?P<symbol>\*\*|[-+*/^()%!=,])"
+)
+
+
+def tokenize(text: str):
+    """
+    Splits an utterance into (kind, value) tokens in one regex pass.
+    """
+    tokens = []
+    for match in _TOKEN_RE.finditer(text.lower()):
+        kind = match.lastgroup
+        if kind == 'phrase':
+            tokens.append(_LEXICON[" ".join(match.group().split())])
+        elif kind == 'number':
+            tokens.append(('numeral', match.group()))
+        else:
+            tokens.append((kind, match.group()))
+    return tokens
+
+
+def _fold_number(tokens, start):
+    """
+    Reads a run of number words starting at tokens[start] and returns
+    (numeral text, index after the run).
+    """
+    total, current = 0, 0
+    decimals = None
+    previous = None  # the previous number word's value, None after a scale or "and"
+    i = start
+    while i < len(tokens):
+        kind, value = tokens[i]
+        if decimals is not None:
+            if kind == 'num' and value < 10:
+                decimals += str(value)
+                i += 1
+                continue
+            break
+        if kind == 'num':
+            if previous is None or (previous in TENS.values() and value < 10):
+                current += value  # "one hundred twenty", "twenty five"
+            elif 10 <= current < 100 and total == 0 and value >= 10:
+                current = current * 100 + value  # spoken years: "nineteen eighty four", "twenty twenty"
+            else:
+                break  # "three four" is two numbers, not seven
+            previous = value
+            i += 1
+            continue
+        elif kind == 'scale':
+            if value == 100:
+                current = max(current, 1) * 100
+            else:
+                total += max(current, 1) * value
+                current = 0
+        elif kind == 'point':
+            decimals = ""
+        elif (kind == 'filler' and value == 'and' and tokens[i - 1][0] == 'scale'
+              and i + 1 < len(tokens) and tokens[i + 1][0] == 'num'):
+            pass  # "one hundred and five"; elsewhere "and" separates numbers
+        else:
+            break
+        previous = None
+        i += 1
+
+    numeral = str(total + current)
+    if decimals:
+        numeral += "." + decimals
+    return numeral, i
+
+
+def parse_utterance(text: str) -> VoiceParse:
+    """
+    Maps a recognized utterance to a navigation command (or None) and a
+    calculator expression in one left-to-right pass over its tokens.
+    """
+    tokens = tokenize(text)
+    commands = set()
+    parts = []
+    i = 0
+    while i < len(tokens):
+        kind, value = tokens[i]
+        if kind in ('num', 'scale') or (kind == 'point' and i + 1 < len(tokens) and tokens[i + 1][0] == 'num'):
+            numeral, i = _fold_number(tokens, i)
+            parts.append(numeral)
+            continue
+        if kind == 'command':
+            commands.add(value)
+        elif kind != 'filler':
+            parts.append(value)
+        i += 1
+
+    # A lone "x" between two numbers is multiplication ("3 x 4"); otherwise it is the variable
+    for j in range(1, len(parts) - 1):
+        if parts[j] == 'x' and _is_number(parts[j - 1]) and _is_number(parts[j + 1]):
+            parts[j] = '*'
+
+    parts = _bracket_function_arguments(parts)
+    command = next((name for name, _ in COMMANDS if name in commands), None)
+    return VoiceParse(command, " ".join(parts))
+
+
+def _is_number(part):
+    return bool(re.fullmatch(r"\d+(?:\.\d+)?", part)) or part in CONSTANTS.values() or part == ')'
+
+
+def _bracket_function_arguments(parts):
+    """
+    Wraps a single spoken operand in brackets after a function name, so that
+    "sine thirty plus one" becomes sin ( 30 ) + 1 rather than sin(30 + 1).
+    """
+    result = []
+    i = 0
+    function_names = set(FUNCTIONS.values())
+    while i < len(parts):
+        part = parts[i]
+        result.append(part)
+        if part in function_names and i + 1 < len(parts) and parts[i + 1] != '(':
+            operand = parts[i + 1]
+            if operand not in ('+', '-', '*', '/', '**', '%', '=', ')'):
+                result.extend(['(', operand, ')'])
+                i += 2
+                continue
+        i += 1
+    return result
@@ -1,9 +1,59 @@
 # main.py
 
+import time
+
+LAUNCH_STARTED = time.perf_counter()
+
+import argparse
+import os
 import sys
+from PyQt5.QtCore import QEvent, QObject, QTimer
 from PyQt5.QtWidgets import QApplication
+from ui import evaluation_service
 from ui.tab_controller import AdvancedCalculator
 
+IMPORTS_DONE = time.perf_counter()
+
+
+class StartupTimer(QObject):
+    """
+    Reports how long imports, building the window and the first paint took,
+    measured from the top of main.py. With exit_after_paint the app quits
+    right after the report, so the number can be tracked from scripts:
+
+        python main.py --startup-time
+        python -X importtime main.py --startup-time 2> imports.log
+    """
+
+    def __init__(self, window, exit_after_paint=True):
+        super().__init__(window)
+        self.window = window
+        self.exit_after_paint = exit_after_paint
+        self.window_built = None
+        window.installEventFilter(self)
+
+    def mark_window_built(self):
+        self.window_built = time.perf_counter()
+
+    def eventFilter(self, obj, event):
+        if obj is self.window and event.type() == QEvent.Paint:
+            self.window.removeEventFilter(self)
+            # Report once the paint has been handled
+            QTimer.singleShot(0, self.report)
+        return False
+
+    def report(self):
+        now = time.perf_counter()
+        built = self.window_built or now
+        print(
+            f"[startup] imports {(IMPORTS_DONE - LAUNCH_STARTED) * 1000:.1f} ms, "
+            f"window {(built - IMPORTS_DONE) * 1000:.1f} ms, "
+            f"first paint {(now - LAUNCH_STARTED) * 1000:.1f} ms"
+        )
+        sys.stdout.flush()
+        if self.exit_after_paint:
+            QApplication.quit()
+
 
 def main():
     """
@@ -11,16 +61,29 @@ def main():
     Sets up the Qt application, loads the AdvancedCalculator UI,
     and starts the event loop.
     """
-    app = QApplication(sys.argv)
+    parser = argparse.ArgumentParser(description="Futuristic Calculator")
+    parser.add_argument("--startup-time", action="store_true",
+                        help="print import, window and first-paint times, then exit")
+    parser.add_argument("--eager-tabs", action="store_true",
+                        help="build every tab at startup instead of on first activation")
+    parser.add_argument("--session", metavar="PATH", nargs="?", const=True,
+                        help="keep variables and history between runs, in PATH or the per-user session file "
+                             "(also turned on by CALC_SESSION)")
+    args, qt_args = parser.parse_known_args()
+    evaluation_service.session_path = args.session or bool(os.environ.get("CALC_SESSION"))
+
+    app = QApplication(sys.argv[:1] + qt_args)
 
     # App metadata (good for settings, themes, etc.)
     app.setApplicationName("Futuristic Calculator")
     app.setOrganizationName("AyushTech")
 
     try:
-        window = AdvancedCalculator()
+        window = AdvancedCalculator(deferred_tabs=not args.eager_tabs)
         window.setWindowTitle("🧠 Futuristic Calculator")
         window.resize(1000, 700)  # Optimal for modern screens
+        if args.startup_time:
+            StartupTimer(window).mark_window_built()
         window.show()
     except Exception as e:
         print(f"[ERROR] Failed to launch UI: {e}")
@@ -31,5 +94,3 @@ def main():
 
 if __name__ == '__main__':
     main()
-
-
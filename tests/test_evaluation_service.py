@@ -0,0 +1,57 @@
+import threading
+import time
+
+import pytest
+
+pytest.importorskip("PyQt5")
+
+from PyQt5.QtCore import QCoreApplication
+
+from logic.guard import CANCELLED_RESULT, EvaluationLimits, evaluate_guarded
+
+SLOW = "integrate(exp(sin(x**3))*tan(x)**9, x)"
+
+
+@pytest.fixture(scope="module")
+def app():
+    return QCoreApplication.instance() or QCoreApplication([])
+
+
+def wait_until(app, condition, timeout):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        app.processEvents()
+        time.sleep(0.01)
+    return condition()
+
+
+def test_cancelled_sandbox_evaluation_returns_at_once():
+    limits = EvaluationLimits(timeout=60, sandbox=True, start_method="spawn")
+    assert evaluate_guarded("1 + 1", limits=limits)[0] == "✅ Result: 2.00000000000000"
+
+    stop = threading.Event()
+    threading.Timer(0.5, stop.set).start()
+    started = time.monotonic()
+    assert evaluate_guarded(SLOW, limits=limits, cancelled=stop.is_set) == (CANCELLED_RESULT, None)
+    assert time.monotonic() - started < 5
+    assert evaluate_guarded("2 + 2", limits=limits)[0] == "✅ Result: 4.00000000000000"
+
+
+def test_superseded_request_does_not_hold_up_the_next(app):
+    from ui.evaluation_service import EvaluationService
+
+    service = EvaluationService(timeout_ms=60000)
+    results = {}
+    service.finished.connect(lambda request_id, result: results.setdefault(request_id, result))
+    service.warm_up()
+    assert wait_until(app, lambda: service.pool.activeThreadCount() == 0, 60)
+
+    slow = service.submit(SLOW)
+    time.sleep(1.0)  # let it reach the sandbox
+    started = time.monotonic()
+    fast = service.submit("1 + 1")
+    assert wait_until(app, lambda: fast in results, 30)
+
+    assert time.monotonic() - started < 15  # a respawn, not the 60 s timeout
+    assert results[fast] == "✅ Result: 2.00000000000000"
+    assert slow not in results
@@ -0,0 +1,104 @@
+import math
+
+import numpy as np
+import pytest
+
+from logic import solver
+
+
+@pytest.fixture(autouse=True)
+def no_disk_cache(monkeypatch):
+    monkeypatch.setattr(solver, 'formula_cache_dir', None)
+
+
+def test_factorial_is_vectorized():
+    assert solver.evaluate_array('factorial(x)', {'x': [3, 4]}).tolist() == [6.0, 24.0]
+    assert solver.evaluate_array('x!', {'x': [5, 6]}).tolist() == [120.0, 720.0]
+
+
+def test_factorial_outside_the_integers():
+    result = solver.evaluate_array('factorial(x)', {'x': [-1, 0.5, 200]})
+    assert math.isnan(result[0])
+    assert result[1] == pytest.approx(math.gamma(1.5))
+    assert result[2] == math.inf
+
+
+def test_factorial_on_the_math_backend():
+    assert solver.optimize_expression('factorial(x)', backend='math')(4.0) == 24.0
+
+
+FUNCTIONS = sorted(name for name, value in solver.allowed_symbols.items() if callable(value))
+
+
+@pytest.mark.parametrize("deg_mode", [True, False])
+@pytest.mark.parametrize("name", FUNCTIONS)
+def test_every_allowed_function_runs_on_arrays(name, deg_mode):
+    formula = solver.optimize_expression(f"{name}(x)", ('x',), deg_mode)
+    assert 'math.' not in formula.source
+    values = np.array([0.5, 2.0])
+    with np.errstate(all='ignore'):
+        result = np.asarray(formula(values))
+    assert result.shape == (2,)
+    for value, computed in zip(values, result):
+        expected = solver.evaluate_expression(f"{name}({value})", deg_mode)
+        if expected.startswith("✅ Result: ") and "I" not in expected and "zoo" not in expected:
+            assert computed == pytest.approx(float(expected.split(": ", 1)[1]), rel=1e-9)
+
+
+def test_scalar_only_code_is_rejected_for_numpy():
+    with pytest.raises(ValueError, match="No vectorized implementation for: erf"):
+        solver.generate_formula_source(solver.erf(solver.Symbol('x')), ('x',))
+
+
+def test_disk_cache_is_off_by_default():
+    assert solver.get_formula_cache_stats()['directory'] is None
+
+
+@pytest.fixture
+def disk_cache(monkeypatch, tmp_path):
+    monkeypatch.setattr(solver, 'formula_cache_dir', str(tmp_path))
+    monkeypatch.setattr(solver, '_formula_stats', {'memory_hits': 0, 'disk_hits': 0, 'generated': 0})
+    solver._formulas.clear()
+    yield tmp_path
+    solver._formulas.clear()
+
+
+def test_disk_cache_stores_data_not_code(disk_cache):
+    source = solver.optimize_expression('sin(x)**2 + sin(x)').source
+    (path,) = disk_cache.glob('*.json')
+    assert 'def ' not in path.read_text()
+
+    solver._formulas.clear()
+    formula = solver.optimize_expression('sin(x)**2 + sin(x)')
+    assert solver.get_formula_cache_stats()['disk_hits'] == 1
+    assert formula.source == source
+
+
+def test_tampered_cache_file_is_not_executed(disk_cache, tmp_path_factory):
+    marker = tmp_path_factory.mktemp('marker') / 'ran'
+    solver.optimize_expression('x + 1')
+    (path,) = disk_cache.glob('*.json')
+    path.write_text(
+        '{"variables": ["x"], "replacements": [], '
+        f'"reduced": "__import__(\'pathlib\').Path({str(marker)!r}).touch()"}}'
+    )
+
+    solver._formulas.clear()
+    assert solver.optimize_expression('x + 1')(2.0) == 3.0
+    assert not marker.exists()
+    assert solver.get_formula_cache_stats()['generated'] == 2
+
+
+def test_disk_cache_is_bounded(disk_cache, monkeypatch):
+    monkeypatch.setattr(solver, 'formula_cache_files', 3)
+    for n in range(5):
+        solver.optimize_expression(f'x + {n}')
+    assert len(list(disk_cache.glob('*.json'))) == 3
+
+
+def test_degree_mode_arrays_are_exact_at_multiples():
+    angles = [0, 90, 180, 270, 360, 540, -180, 720]
+    assert solver.evaluate_array('sin(x)', {'x': angles}).tolist() == [0, 1, 0, -1, 0, 0, 0, 0]
+    assert solver.evaluate_array('cos(x)', {'x': angles}).tolist() == [1, 0, -1, 0, 1, -1, -1, 1]
+    assert solver.evaluate_array('sin(2*x + 90)', {'x': [45, 90]}).tolist() == [0, -1]
+    assert solver.evaluate_expression('sin(180)') == "✅ Result: 0"
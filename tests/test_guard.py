@@ -0,0 +1,47 @@
+import pytest
+
+from logic import batch
+from logic.guard import EvaluationLimits, LimitExceeded, check_limits, evaluate_guarded, parse_limit
+
+
+def test_size_limit_has_no_tier():
+    text, tier = evaluate_guarded("expand((x+y)**30)", limits=EvaluationLimits(max_result_chars=50))
+    assert parse_limit(text)[0] == 'size'
+    assert tier is None
+
+
+def test_digit_limit_without_size_check():
+    text, tier = evaluate_guarded("9**9**9", limits=EvaluationLimits(max_result_chars=None))
+    assert parse_limit(text)[0] == 'digits'
+    assert tier is None
+    assert evaluate_guarded("2**10", limits=EvaluationLimits(max_digits=None))[1] == 'numeric'
+
+
+def limits_for(*argv):
+    return batch.build_limits(batch.build_parser().parse_args(list(argv)))
+
+
+def test_batch_bounds_digits_by_default():
+    limits = limits_for()
+    assert limits.max_digits is not None and not limits.sandbox
+    assert limits_for("--max-digits", "0").max_digits is None
+    assert batch.evaluate_one("9**9**9", limits=limits)['status'] == 'limit'
+
+
+def test_batch_timeout_implies_sandbox():
+    limits = limits_for("--timeout", "2")
+    assert limits.sandbox and limits.timeout == 2
+
+
+@pytest.mark.parametrize("expr", [
+    "(1/3)**(-10**9)", "0.5**-(10**9)", "(-1/3)**(-10**9)", "(1/10)**(-10**6)",
+    "(2+3)**(10**9)", "sqrt(10**-400)**-(10**6)", "(1/2)**-(3**30)",
+])
+def test_digit_limit_covers_negative_exponents_and_small_bases(expr):
+    with pytest.raises(LimitExceeded):
+        check_limits(expr)
+
+
+@pytest.mark.parametrize("expr", ["2**-1000", "(2/3)**(-100)", "1**(10**99)", "(1/(10**-400))**2", "1/(2-2)"])
+def test_digit_limit_lets_small_results_through(expr):
+    check_limits(expr)
@@ -0,0 +1,34 @@
+import pytest
+
+from logic import metrics, numeric, solver
+
+
+@pytest.fixture(autouse=True)
+def metrics_off():
+    metrics.enable(False)
+    metrics.reset()
+    solver.invalidate_expression_cache()
+    yield
+    metrics.enable(False)
+    metrics.reset()
+
+
+@pytest.mark.parametrize("module, name, expr", [
+    (numeric, 'compile_cached', "2 + 3"),
+    (solver, 'unit_plan', "3 ft in m"),
+    (solver, 'parse_expr', "x + 1"),
+    (solver, 'evalf_cached', "x + 2"),
+    (solver, 'evaluate_expression_math', "undefined_function(2)"),
+])
+@pytest.mark.parametrize("initially", [False, True])
+def test_toggling_metrics_mid_evaluation(monkeypatch, module, name, expr, initially):
+    original = getattr(module, name)
+
+    def toggling(*args, **kwargs):
+        metrics.enable(not initially)
+        return original(*args, **kwargs)
+
+    monkeypatch.setattr(module, name, toggling)
+    metrics.enable(initially)
+    result, _ = solver.evaluate_expression_tiered(expr)
+    assert isinstance(result, str)
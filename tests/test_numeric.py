@@ -0,0 +1,34 @@
+import pytest
+
+from logic import solver
+
+
+@pytest.mark.parametrize("expr, expected", [
+    ("sin(pi)", "✅ Result: 0"),
+    ("cos(pi/2)", "✅ Result: 0"),
+    ("tan(pi)", "✅ Result: 0"),
+    ("sin(3*pi/2)", "✅ Result: -1.00000000000000"),
+    ("cos(π)", "✅ Result: -1.00000000000000"),
+])
+def test_radian_trig_is_exact_at_multiples_of_half_pi(expr, expected):
+    assert solver.evaluate_expression_tiered(expr, deg_mode=False) == (expected, solver.TIER_NUMERIC)
+
+
+def test_radian_tan_at_half_pi_escalates():
+    result, tier = solver.evaluate_expression_tiered("tan(pi/2)", deg_mode=False)
+    assert tier == solver.TIER_SYMPY
+    assert result == "✅ Result: zoo"
+
+
+def test_radian_trig_leaves_nearby_arguments_alone():
+    assert solver.evaluate_expression("sin(1e-13)", deg_mode=False) == "✅ Result: 1.00000000000000E-13"
+    assert solver.evaluate_expression("sin(3.14159265358979)", deg_mode=False) != "✅ Result: 0"
+
+
+@pytest.mark.parametrize("expr, expected", [
+    ("sin(180)", "✅ Result: 0"),
+    ("cos(90)", "✅ Result: 0"),
+    ("tan(45)", "✅ Result: 1.00000000000000"),
+])
+def test_degree_trig_is_exact(expr, expected):
+    assert solver.evaluate_expression(expr, deg_mode=True) == expected
@@ -0,0 +1,75 @@
+import pytest
+
+from logic import batch, solver
+from logic.session import SessionStore, parse_value
+
+
+@pytest.fixture(autouse=True)
+def clean_namespace():
+    solver.user_namespace.clear()
+    solver.pending_variables.clear()
+    solver.invalidate_expression_cache()
+    yield
+    solver.user_namespace.clear()
+    solver.pending_variables.clear()
+    solver.invalidate_expression_cache()
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = SessionStore(str(tmp_path / "session.sqlite3"))
+    yield store
+    store.close()
+
+
+def test_restore_parses_on_first_use(store):
+    store.record("r = 2/3", solver.evaluate_expression("r = 2/3"), "sympy")
+    solver.user_namespace.clear()
+
+    assert store.restore() == 1
+    assert 'r' not in solver.user_namespace and 'r' in solver.pending_variables
+    assert solver.evaluate_expression("3*r") == "✅ Result: 2.00000000000000"
+    assert solver.user_namespace['r'] == solver.Rational(2, 3)
+    assert not solver.pending_variables
+
+
+def test_session_text_is_never_executed(store, tmp_path):
+    marker = tmp_path / "pwned"
+    store.conn.execute(
+        "INSERT INTO variables (name, value) VALUES (?, ?)",
+        ("evil", f"__import__('pathlib').Path({str(marker)!r}).touch()")
+    )
+    store.conn.execute(
+        "INSERT INTO variables (name, value) VALUES (?, ?)",
+        ("sneaky", f"sin(\"__import__('pathlib').Path({str(marker)!r}).touch()\")")
+    )
+    store.restore()
+
+    solver.evaluate_expression("evil + sneaky")
+    assert not marker.exists()
+    assert not solver.pending_variables
+    assert 'evil' not in solver.user_namespace and 'sneaky' not in solver.user_namespace
+
+
+@pytest.mark.parametrize("value", [
+    "Integer(5)", "Float('2.5', precision=53)", "Add(Symbol('x'), Rational(1, 3))",
+    "Piecewise(ExprCondPair(Symbol('x'), StrictGreaterThan(Symbol('x'), Integer(0))), "
+    "ExprCondPair(Integer(0), true))",
+])
+def test_parse_value_round_trips_srepr(value):
+    assert solver.srepr(parse_value(value)) == value
+
+
+@pytest.mark.parametrize("text", ["sympify('1+1')", "Integer(5).evalf()", "S('1')", "[x for x in ()]"])
+def test_parse_value_rejects_code(text):
+    with pytest.raises(ValueError):
+        parse_value(text)
+
+
+def test_batch_records_the_value_each_assignment_made(store):
+    # With --workers results are recorded after later assignments have run
+    results = [batch.evaluate_one(expr, index=i) for i, expr in enumerate(["a = 1", "a = 2"])]
+    list(batch.record_results(results, store))
+
+    values = [row[0] for row in store.conn.execute("SELECT value FROM variables ORDER BY id")]
+    assert values == ["Integer(1)", "Integer(2)"]
@@ -0,0 +1,84 @@
+import pytest
+
+from logic import solver
+
+
+@pytest.fixture(autouse=True)
+def clean_namespace():
+    solver.user_namespace.clear()
+    solver.invalidate_expression_cache()
+    yield
+    solver.user_namespace.clear()
+    solver.invalidate_expression_cache()
+
+
+def result(expr):
+    return solver.evaluate_expression(expr)
+
+
+@pytest.mark.parametrize("expr, expected", [
+    ("2 degC", "✅ Result: 275.150000000000 K"),
+    ("20 °C in degF", "✅ Result: 68.0000000000000 degF"),
+    ("68 fahrenheit in celsius", "✅ Result: 20.0000000000000 celsius"),
+])
+def test_temperatures(expr, expected):
+    assert result(expr) == expected
+
+
+def test_bare_c_and_f_are_not_temperatures():
+    assert result("2C") == "✅ Result: 2.0*C"
+    assert result("3 F + 1") == "✅ Result: 3.0*F + 1.0"
+
+
+@pytest.mark.parametrize("expr, expected", [
+    ("3 ft 2 in", "✅ Result: 0.965200000000000 m"),
+    ("5 ft 11 in in cm", "✅ Result: 180.340000000000 cm"),
+    ("1 h 30 min in min", "✅ Result: 90.0000000000000 min"),
+    ("3 m / 1 ft", "✅ Result: 9.84251968503937"),
+])
+def test_juxtaposed_quantities_add(expr, expected):
+    assert result(expr) == expected
+
+
+def test_juxtaposed_quantities_of_different_dimensions_are_rejected():
+    assert result("2 kg 3 m") == "❌ Error: Put an operator between kg and m quantities"
+
+
+@pytest.mark.parametrize("expr, expected", [
+    ("2g + 3", "✅ Result: 2.0*g + 3.0"),
+    ("2m + 3", "✅ Result: 2.0*m + 3.0"),
+    ("2t + 3t", "✅ Result: 5.0*t"),
+    ("3 h", "✅ Result: 3.0*h"),
+])
+def test_implicit_units_fall_through_to_sympy(expr, expected):
+    assert solver.evaluate_expression_tiered(expr) == (expected, solver.TIER_SYMPY)
+
+
+@pytest.mark.parametrize("expr, expected", [
+    ("2**3 m", "✅ Result: 8.00000000000000 m"),
+    ("10 t in kg", "✅ Result: 10000.0000000000 kg"),
+    ("5 kg + 200 g", "✅ Result: 5.20000000000000 kg"),
+])
+def test_explicit_units(expr, expected):
+    assert solver.evaluate_expression_tiered(expr) == (expected, solver.TIER_UNITS)
+
+
+def test_bad_conversion_target_is_not_read_as_inches():
+    assert not result("3 ft in cm + 1").startswith("❌ Error: Cannot add")
+    assert result("3 ft + 1 in cm") == "❌ Error: Cannot add m and 1"
+
+
+def test_assignment_keeps_units():
+    assert result("x = 3 ft") == "✅ Assigned: x = 0.914400000000000 m"
+    assert result("x in ft") == "✅ Result: 3.00000000000000 ft"
+    assert result("x + 2 m") == "✅ Result: 2.91440000000000 m"
+    assert result("x * x") == "✅ Result: 0.836127360000000 m^2"
+    assert result("x + 1 in m").startswith("❌ Error: Cannot add m and 1")
+    assert result("x + 1") == "✅ Result: 0.9144*m + 1.0"
+
+
+def test_dimensionless_and_temperature_assignments():
+    assert result("r = 3 m / 1 ft") == "✅ Assigned: r = 9.84251968503937"
+    assert solver.evaluate_expression_tiered("r * 2")[1] == solver.TIER_NUMERIC
+    assert result("t = 20 degC") == "✅ Assigned: t = 293.150000000000 K"
+    assert result("t in degC") == "✅ Result: 20.0000000000000 degC"
@@ -0,0 +1,27 @@
+import pytest
+
+from logic.voice_grammar import parse_utterance
+
+
+@pytest.mark.parametrize("text, expression", [
+    ("two hundred thirty five times sine of thirty", "235 * sin ( 30 )"),
+    ("one hundred and twenty five", "125"),
+    ("two thousand and one", "2001"),
+    ("three point one four", "3.14"),
+    ("one million two hundred thousand", "1200000"),
+    ("nineteen eighty four", "1984"),
+    ("nineteen hundred", "1900"),
+    ("twenty twenty four", "2024"),
+    ("two thousand twenty", "2020"),
+    ("twenty four plus nineteen eighty four", "24 + 1984"),
+])
+def test_number_words(text, expression):
+    assert parse_utterance(text).expression == expression
+
+
+def test_and_only_joins_after_hundred_or_thousand():
+    assert parse_utterance("five and six times two").expression == "5 6 * 2"
+
+
+def test_juxtaposed_digits_are_not_summed():
+    assert parse_utterance("three four").expression == "3 4"
@@ -0,0 +1,111 @@
+import struct
+import threading
+import time
+import wave
+
+import pytest
+
+sr = pytest.importorskip("speech_recognition")
+pytest.importorskip("PyQt5")
+
+from PyQt5.QtCore import QCoreApplication
+
+from ui.voice_pipeline import VoicePipeline, wav_sources
+
+
+@pytest.fixture(scope="module")
+def app():
+    return QCoreApplication.instance() or QCoreApplication([])
+
+
+def write_clip(path, seconds=0.3, rate=16000):
+    with wave.open(str(path), "wb") as clip:
+        clip.setnchannels(1)
+        clip.setsampwidth(2)
+        clip.setframerate(rate)
+        frames = (int(8000 * ((i // 40) % 2 * 2 - 1)) for i in range(int(seconds * rate)))
+        clip.writeframes(b"".join(struct.pack("<h", frame) for frame in frames))
+    return str(path)
+
+
+def collect(pipeline):
+    texts = []
+    pipeline.recognized.connect(texts.append)
+    return texts
+
+
+def wait_for(pipeline, app, timeout=5):
+    for thread in pipeline.threads:
+        thread.join(timeout)
+    app.processEvents()
+
+
+def test_wav_clips_flow_through_the_recognizer_queue(app, tmp_path):
+    paths = [write_clip(tmp_path / "one.wav"), write_clip(tmp_path / "two.wav", seconds=0.5)]
+    heard = []
+
+    def recognize(recognizer, audio):
+        assert isinstance(audio, sr.AudioData)
+        heard.append(len(audio.get_raw_data()))
+        return ["Two Plus Two", "Clear"][len(heard) - 1]
+
+    pipeline = VoicePipeline(recognize=recognize, source_factory=wav_sources(paths))
+    texts = collect(pipeline)
+    pipeline.start()
+    wait_for(pipeline, app)
+
+    assert texts == ["two plus two", "clear"]
+    assert heard[0] < heard[1]  # clips arrive in order, whole
+
+
+class SilentSource:
+    """
+    Live source whose listen() blocks for the full timeout, like a quiet room.
+    """
+
+    def __init__(self, opened):
+        self.opened = opened
+
+    def __enter__(self):
+        self.opened.append(threading.current_thread())
+        return self
+
+    def __exit__(self, *exc):
+        self.opened.remove(threading.current_thread())
+
+
+def test_restart_while_previous_capture_is_still_listening(app):
+    opened = []
+    overlaps = []
+    pipeline = VoicePipeline(recognize=lambda recognizer, audio: audio, source_factory=lambda: SilentSource(opened),
+                             listen_timeout=0.3)
+    pipeline.calibrated = True
+
+    def listen(source, timeout=None, phrase_time_limit=None):
+        overlaps.append(len(opened))
+        time.sleep(timeout)
+        if pipeline.stop_event.is_set() or len(overlaps) < 3:
+            raise sr.WaitTimeoutError()
+        return "three"
+
+    pipeline.recognizer.listen = listen
+    texts = collect(pipeline)
+
+    pipeline.start()
+    time.sleep(0.05)
+    first = list(pipeline.threads)
+    pipeline.stop()
+    pipeline.start()  # within listen_timeout: the old capture thread is still blocked
+    assert pipeline.threads != first
+    assert pipeline.is_running()
+
+    deadline = time.time() + 5
+    while not texts and time.time() < deadline:
+        app.processEvents()
+        time.sleep(0.02)
+    pipeline.stop(wait=True)
+    app.processEvents()
+
+    assert "three" in texts
+    assert max(overlaps) == 1  # never two listeners on the source
+    assert not any(thread.is_alive() for thread in first)
@@ -0,0 +1,168 @@
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+
+# logic.solver (and with it SymPy) is imported on the pool thread, not at startup
+WARM_UP_EXPRESSION = "sin(x) + sqrt(2)"
+
+# Where variables and history persist (see logic.session). Opt-in: None
+# keeps the session in memory only, True means the default per-user file,
+# a string names the file. Set by main.py.
+session_path = None
+_session = None
+
+
+def open_session():
+    """
+    The SessionStore for this process, opened and restored into the solver
+    on first use. Call it on the pool thread only.
+    """
+    global _session
+    if _session is None and session_path:
+        from logic import session
+        _session = session.SessionStore(session.DEFAULT_PATH if session_path is True else session_path)
+        _session.restore()
+    return _session
+
+
+def sandbox_limits(timeout_s=None):
+    """
+    Guard limits for GUI evaluations: static digit/size checks (a 9**9**9
+    would otherwise hold the CPU for minutes) and a killable child process
+    for the timeout. The child is spawned, not forked, because this process
+    runs Qt's threads.
+    """
+    from logic.guard import EvaluationLimits
+    return EvaluationLimits(timeout=timeout_s, sandbox=True, start_method="spawn")
+
+
+class EvaluationSignals(QObject):
+    done = pyqtSignal(int, str, bool)
+
+
+class EvaluationTask(QRunnable):
+    """
+    Runs one guarded evaluation from the pool thread, appends it to the
+    session history and reports back through signals.done(request_id,
+    result, timed_out). With a precision other than the solver's default,
+    results are tagged with the digits they were actually computed with.
+    """
+
+    def __init__(self, request_id, expr, deg_mode, precision=None, timeout_s=None):
+        super().__init__()
+        self.request_id = request_id
+        self.expr = expr
+        self.deg_mode = deg_mode
+        self.precision = precision
+        self.timeout_s = timeout_s
+        self.signals = EvaluationSignals()
+        self.cancelled = False  # set from the GUI thread when superseded
+
+    def is_cancelled(self):
+        return self.cancelled
+
+    def run(self):
+        timed_out = False
+        try:
+            from logic import solver
+            from logic.guard import CANCELLED_RESULT, evaluate_guarded, parse_limit
+            store = open_session()
+            solver.set_precision(self.precision or solver.DEFAULT_PRECISION)
+            result, tier = evaluate_guarded(
+                self.expr, self.deg_mode, sandbox_limits(self.timeout_s), self.is_cancelled
+            )
+            limit = parse_limit(result)
+            timed_out = limit is not None and limit[0] == 'timeout'
+            if store is not None and result != CANCELLED_RESULT:
+                try:
+                    store.record(self.expr, result, tier, self.deg_mode)
+                except Exception:
+                    pass  # an unwritable session file must not cost the user their result
+            if tier is not None and solver.precision != solver.DEFAULT_PRECISION and not result.startswith("❌"):
+                result += f"  ({solver.computed_precision(tier)} digits)"
+        except Exception as e:
+            result = f"❌ Error: {str(e)}"
+        self.signals.done.emit(self.request_id, result, timed_out)
+
+
+class WarmUpTask(QRunnable):
+    """
+    Imports the solver, restores the saved session and starts the sandbox
+    process with one symbolic evaluation, so SymPy is loaded on both sides
+    before the first real request.
+    """
+
+    def run(self):
+        try:
+            open_session()
+            from logic.guard import evaluate_guarded
+            evaluate_guarded(WARM_UP_EXPRESSION, True, sandbox_limits())
+        except Exception:
+            pass  # a real request will report the problem
+
+
+class EvaluationService(QObject):
+    """
+    Evaluates expressions off the GUI thread so heavy inputs never freeze the
+    window.
+
+    Every submit() returns a request id; results arrive through finished(id,
+    result). A new submission supersedes older ones: queued requests are
+    dropped, and one that is already running is cancelled.
+
+    Requests run one at a time on a single pool thread, the only thread that
+    touches solver and session state. The evaluation itself happens in a
+    sandbox process (logic.guard.SandboxExecutor) that is killed and
+    replaced once it exceeds timeout_ms (reported as a timeout limit) or as
+    soon as its request is superseded, so the next request starts right
+    away instead of waiting behind it.
+    """
+
+    finished = pyqtSignal(int, str)
+    timed_out = pyqtSignal(int)
+
+    def __init__(self, timeout_ms=10000, parent=None):
+        super().__init__(parent)
+        self.timeout_ms = timeout_ms
+        self.next_id = 0
+        self.pending = {}  # request id → task
+        # One thread: assignments must apply in submission order, and the
+        # solver's namespace, caches and the session store are not thread-safe
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(1)
+
+    def warm_up(self):
+        """
+        Queues a background SymPy warm-up. Real requests run after it on the
+        same thread, so they never race with the import.
+        """
+        self.pool.start(WarmUpTask())
+
+    def submit(self, expr, deg_mode=True, precision=None):
+        self.cancel()
+        self.next_id += 1
+        request_id = self.next_id
+
+        task = EvaluationTask(request_id, expr, deg_mode, precision, self.timeout_ms / 1000)
+        task.signals.done.connect(self.on_task_done)
+        self.pending[request_id] = task
+        self.pool.start(task)
+        return request_id
+
+    def cancel(self, request_id=None):
+        """
+        Cancels one pending request, or all of them when request_id is None.
+        """
+        ids = list(self.pending) if request_id is None else [request_id]
+        for rid in ids:
+            task = self.pending.pop(rid, None)
+            if task is not None and not self.pool.tryTake(task):
+                task.cancelled = True  # running: the sandbox is killed within CANCEL_POLL_S
+
+    def is_busy(self):
+        return bool(self.pending)
+
+    def on_task_done(self, request_id, result, timed_out):
+        if self.pending.pop(request_id, None) is None:
+            return  # superseded or cancelled
+        if timed_out:
+            self.timed_out.emit(request_id)
+        self.finished.emit(request_id, result)
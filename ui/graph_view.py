@@ -2,14 +2,51 @@ from PyQt5.QtWidgets import (
     QWidget, QVBoxLayout, QPushButton, QLineEdit, QLabel,
     QFileDialog, QColorDialog, QHBoxLayout, QSlider, QTextEdit, QApplication
 )
-from PyQt5.QtCore import Qt
+from PyQt5.QtCore import Qt, QTimer, QObject, QRunnable, QThreadPool, pyqtSignal
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
+from matplotlib.backends.backend_qt5agg import NavigationToolbar2QT as NavigationToolbar
 from matplotlib.figure import Figure
 from mpl_toolkits.mplot3d import Axes3D
 import numpy as np
 import matplotlib.pyplot as plt
-import sympy as sp
 import math
+from logic.plotting import (
+    compile_plot_function, mesh_grid, adaptive_sample, view_limits,
+    DEFAULT_RANGE, DEFAULT_POINTS
+)
+
+
+class ResampleSignals(QObject):
+    finished = pyqtSignal(int, list)
+
+
+class ResampleTask(QRunnable):
+    """
+    Re-evaluates the plotted functions over a new viewport off the GUI thread.
+    Each job is (func, x_range, y_range, resolution); results come back in the
+    same order through signals.finished, tagged with the request generation.
+    """
+
+    def __init__(self, generation, jobs, a):
+        super().__init__()
+        self.generation = generation
+        self.jobs = jobs
+        self.a = a
+        self.signals = ResampleSignals()
+
+    def run(self):
+        results = []
+        for func, x_range, y_range, resolution in self.jobs:
+            try:
+                if func.is_3d:
+                    X, Y = mesh_grid(x_range, y_range, resolution)
+                    results.append((X, Y, func(X, Y, self.a)))
+                else:
+                    results.append(adaptive_sample(func, *x_range, a=self.a, budget=resolution))
+            except Exception as e:
+                print(f"❌ Resample failed: {func.source} | {e}")
+                results.append(None)
+        self.signals.finished.emit(self.generation, results)
 
 
 class GraphView(QWidget):
@@ -60,12 +97,46 @@ class GraphView(QWidget):
 
         self.canvas = FigureCanvas(Figure())
         self.ax = self.canvas.figure.add_subplot(111)
+        self.toolbar = NavigationToolbar(self.canvas, self)
+        self.layout.addWidget(self.toolbar)
         self.layout.addWidget(self.canvas)
 
         self.expressions = []
         self.colors = []
         self.current_color = 'blue'
 
+        # Maximum samples per 2D curve; the adaptive sampler spends them where the curve bends
+        self.sample_budget = DEFAULT_POINTS
+
+        # Live artists from the last full plot, updated in place by the slider
+        self.plotted = []
+
+        # Coalesces bursts of valueChanged signals into one data swap per frame
+        self.animation_timer = QTimer(self)
+        self.animation_timer.setSingleShot(True)
+        self.animation_timer.setInterval(16)
+        self.animation_timer.timeout.connect(self.update_plot_data)
+
+        # Domain the live artists were sampled over; zoom/pan resamples the visible part
+        self.x_range = DEFAULT_RANGE
+        self.y_range = DEFAULT_RANGE
+        self.resample_generation = 0
+        self.resample_task = None
+        self.pending_ranges = (DEFAULT_RANGE, DEFAULT_RANGE)
+        self.resample_timer = QTimer(self)
+        self.resample_timer.setSingleShot(True)
+        self.resample_timer.setInterval(150)
+        self.resample_timer.timeout.connect(self.resample_viewport)
+
+        # 3D level of detail: coarse meshes while rotating or dragging the
+        # slider, refined once the plot has been idle for a moment
+        self.refine_timer = QTimer(self)
+        self.refine_timer.setSingleShot(True)
+        self.refine_timer.setInterval(300)
+        self.refine_timer.timeout.connect(self.refine_surfaces)
+        self.canvas.mpl_connect('button_press_event', self.on_canvas_press)
+        self.canvas.mpl_connect('button_release_event', self.on_canvas_release)
+
     def paste_expression(self):
         try:
             clipboard = QApplication.clipboard()
@@ -75,14 +146,9 @@ class GraphView(QWidget):
             print(f"Clipboard paste failed: {e}")
 
     def sanitize_expression(self, expr):
-        replacements = {
-            '^': '**',
-            'π': 'pi',
-            'e': 'E'
-        }
-        for key, val in replacements.items():
-            expr = expr.replace(key, val)
-        return expr
+        # e, pi and ^ are resolved by the plotting parser; rewriting them here
+        # would corrupt names such as exp
+        return expr.replace('π', 'pi').replace('^', '**')
 
     def add_expression(self):
         expr = self.input_field.text().strip()
@@ -106,6 +172,11 @@ class GraphView(QWidget):
                 self.colors = [self.current_color]
                 self.input_field.clear()
 
+        self.plotted = []
+        self.resample_generation += 1
+        self.x_range = DEFAULT_RANGE
+        self.y_range = DEFAULT_RANGE
+
         if not self.expressions:
             self.ax.clear()
             self.ax.set_title("❌ No expression to plot!", fontsize=10, color='red')
@@ -114,39 +185,43 @@ class GraphView(QWidget):
 
         self.canvas.figure.clf()
 
+        functions = []
+        for expr in self.expressions:
+            try:
+                functions.append(compile_plot_function(expr))
+            except Exception as e:
+                functions.append(e)
+
         try:
-            is_3d = any('y' in expr for expr in self.expressions)
+            is_3d = any(getattr(func, 'is_3d', False) for func in functions)
             self.ax = self.canvas.figure.add_subplot(111, projection='3d' if is_3d else None)
         except Exception as e:
             print(f"Error initializing canvas: {e}")
             self.ax = self.canvas.figure.add_subplot(111)
 
-        x = sp.Symbol('x')
-        y = sp.Symbol('y')
-        a = self.slider.value() / 10.0
-        x_vals = np.linspace(-10, 10, 500)
-        y_vals = np.linspace(-10, 10, 500)
-        X, Y = np.meshgrid(x_vals, y_vals)
+        a = self.current_parameter()
+        resolution = self.surface_resolution()
+        X, Y = mesh_grid(self.x_range, self.y_range, resolution) if is_3d else (None, None)
 
         has_labels = False
 
-        for expr, color in zip(self.expressions, self.colors):
+        for expr, func, color in zip(self.expressions, functions, self.colors):
             try:
-                expr = expr.replace("^", "**").replace("π", "pi").replace("e", "E").replace("a", str(a))
-                parsed = sp.sympify(expr)
+                if isinstance(func, Exception):
+                    raise func
 
-                if 'y' in expr:
-                    func = sp.lambdify((x, y), parsed, modules=["numpy"])
-                    Z = func(X, Y)
+                if func.is_3d:
+                    Z = func(X, Y, a)
                     if np.isnan(Z).all() or np.isinf(Z).all():
                         raise ValueError("NaN or Inf in Z values")
-                    self.ax.plot_surface(X, Y, Z, cmap='viridis', edgecolor='k', linewidth=0.2, alpha=0.9)
+                    surface = self.draw_surface(X, Y, Z)
+                    self.plotted.append({'func': func, 'artist': surface, 'X': X, 'Y': Y, 'coarse': False})
                 else:
-                    func = sp.lambdify(x, parsed, modules=["numpy"])
-                    y_vals_plot = func(x_vals)
-                    if np.isnan(y_vals_plot).all() or np.isinf(y_vals_plot).all():
+                    x_vals, y_vals_plot = adaptive_sample(func, *self.x_range, a=a, budget=self.curve_budget())
+                    if np.isnan(y_vals_plot).all():
                         raise ValueError("NaN or Inf in y values")
-                    self.ax.plot(x_vals, y_vals_plot, color=color, label=expr, linewidth=2.2)
+                    line, = self.ax.plot(x_vals, y_vals_plot, color=color, label=expr, linewidth=2.2)
+                    self.plotted.append({'func': func, 'artist': line})
                     self.ax.axhline(0, color='gray', linewidth=0.8)
                     self.ax.axvline(0, color='gray', linewidth=0.8)
                     self.ax.grid(True, which='both', linestyle='--', alpha=0.3)
@@ -166,11 +241,179 @@ class GraphView(QWidget):
 
         if has_labels:
             self.ax.legend()
+            self.apply_view_limits()
 
         self.canvas.draw()
 
+        # Connected after the initial layout so only user zoom/pan triggers resampling.
+        # The sampled domain follows the view, so the view must not follow the data.
+        self.ax.set_autoscalex_on(False)
+        self.ax.callbacks.connect('xlim_changed', self.on_limits_changed)
+        if is_3d:
+            self.ax.set_autoscaley_on(False)
+            self.ax.callbacks.connect('ylim_changed', self.on_limits_changed)
+
+    def current_parameter(self):
+        return self.slider.value() / 10.0
+
+    def curve_budget(self):
+        # About two samples per horizontal pixel of the axes, never below the configured budget
+        return max(self.sample_budget, int(2 * self.ax.bbox.width))
+
+    def visible_ranges(self):
+        return tuple(self.ax.get_xlim()), tuple(self.ax.get_ylim())
+
+    def on_limits_changed(self, ax):
+        if self.plotted:
+            self.resample_timer.start()  # restart: wait until the zoom/pan settles
+
+    def surface_resolution(self, coarse=False):
+        """
+        Mesh size for surfaces, derived from the canvas size: roughly one grid
+        line per 6 pixels when refined, a third of that while interacting.
+        """
+        width, height = self.canvas.get_width_height()
+        refined = int(np.clip(min(width, height) / 6, 30, 150))
+        return max(15, refined // 3) if coarse else refined
+
+    def resample_viewport(self):
+        """
+        Re-evaluates the cached compiled functions over the visible range in a
+        worker thread; superseded requests are dropped when they return.
+        """
+        if not self.plotted:
+            return
+        x_range, y_range = self.visible_ranges()
+        is_3d = self.plotted[0]['func'].is_3d
+        if x_range == self.x_range and (not is_3d or y_range == self.y_range):
+            return
+        self.start_resample(x_range, y_range)
+
+    def refine_surfaces(self):
+        # Idle again: replace coarse interaction meshes with full-detail ones
+        if any(entry.get('coarse') for entry in self.plotted):
+            self.start_resample(self.x_range, self.y_range)
+
+    def start_resample(self, x_range, y_range):
+        self.resample_generation += 1
+        jobs = []
+        for entry in self.plotted:
+            resolution = self.surface_resolution() if entry['func'].is_3d else self.curve_budget()
+            jobs.append((entry['func'], x_range, y_range, resolution))
+
+        task = ResampleTask(self.resample_generation, jobs, self.current_parameter())
+        task.signals.finished.connect(self.on_resampled)
+        self.resample_task = task  # keep the signals object alive until delivery
+        self.pending_ranges = (x_range, y_range)
+        QThreadPool.globalInstance().start(task)
+
+    def on_resampled(self, generation, results):
+        if generation != self.resample_generation or len(results) != len(self.plotted):
+            return  # a newer zoom, plot or animation frame superseded this one
+
+        self.x_range, self.y_range = self.pending_ranges
+        for entry, result in zip(self.plotted, results):
+            if result is None:
+                continue
+            if entry['func'].is_3d:
+                X, Y, Z = result
+                entry['artist'].remove()
+                entry['artist'] = self.draw_surface(X, Y, Z)
+                entry['X'], entry['Y'], entry['coarse'] = X, Y, False
+            else:
+                entry['artist'].set_data(*result)
+        self.resample_task = None
+        self.canvas.draw_idle()
+
+    def draw_surface(self, X, Y, Z, coarse=False):
+        # rcount/ccount keep Matplotlib from silently downsampling to 50×50;
+        # coarse meshes also skip the edge lines, which dominate draw time
+        rows, cols = Z.shape
+        return self.ax.plot_surface(
+            X, Y, Z, rcount=rows, ccount=cols, cmap='viridis',
+            edgecolor='k' if not coarse else 'none', linewidth=0.2 if not coarse else 0, alpha=0.9
+        )
+
+    def show_coarse_surfaces(self, a=None):
+        """
+        Redraws every surface on a coarse mesh over the current domain.
+        """
+        a = self.current_parameter() if a is None else a
+        resolution = self.surface_resolution(coarse=True)
+        for entry in self.plotted:
+            func = entry['func']
+            if not func.is_3d:
+                continue
+            X, Y = mesh_grid(self.x_range, self.y_range, resolution)
+            entry['artist'].remove()
+            entry['artist'] = self.draw_surface(X, Y, func(X, Y, a), coarse=True)
+            entry['X'], entry['Y'], entry['coarse'] = X, Y, True
+
+    def on_canvas_press(self, event):
+        # Rotating a 3D plot: drop to the coarse mesh until the button is released
+        if self.plotted and self.plotted[0]['func'].is_3d and event.inaxes is self.ax:
+            self.refine_timer.stop()
+            self.show_coarse_surfaces()
+            self.canvas.draw_idle()
+
+    def on_canvas_release(self, event):
+        if any(entry.get('coarse') for entry in self.plotted):
+            self.refine_timer.start()
+
     def animate_plot(self):
-        self.plot_graphs()
+        # Throttle rather than restart, so a continuous drag still updates every frame
+        if not self.animation_timer.isActive():
+            self.animation_timer.start()
+
+    def update_plot_data(self):
+        """
+        Pushes new data for the current slider value into the existing artists
+        instead of rebuilding the figure.
+        """
+        if not self.plotted:
+            self.plot_graphs()
+            return
+
+        animated = [entry for entry in self.plotted if entry['func'].uses_parameter]
+        if not animated:
+            return
+
+        a = self.current_parameter()
+        if self.plotted[0]['func'].is_3d:
+            # Poly3DCollection has no set_data; swap in coarse surfaces on the same
+            # axes and refine once the slider has been still for a moment
+            self.show_coarse_surfaces(a)
+            self.refine_timer.start()
+        for entry in animated:
+            if not entry['func'].is_3d:
+                entry['artist'].set_data(*adaptive_sample(entry['func'], *self.x_range, a=a, budget=self.curve_budget()))
+
+        if not self.plotted[0]['func'].is_3d:
+            self.ax.relim()
+            self.ax.autoscale_view(scalex=False)
+            self.apply_view_limits()
+
+        if self.resample_task is not None:
+            # An in-flight viewport resample was computed for the old value of a
+            self.resample_generation += 1
+            self.resample_timer.start()
+        self.canvas.draw_idle()
+
+    def apply_view_limits(self):
+        # Keep asymptotes (tan, 1/x) from stretching the y-axis to the refined pole values
+        limits, clipped = [], False
+        for entry in self.plotted:
+            if entry['func'].is_3d:
+                continue
+            x_data, y_data = entry['artist'].get_data()
+            limit = view_limits(x_data, y_data)
+            if limit is None:
+                limit = (np.nanmin(y_data), np.nanmax(y_data))
+            else:
+                clipped = True
+            limits.append(limit)
+        if clipped:
+            self.ax.set_ylim(min(l[0] for l in limits), max(l[1] for l in limits))
 
     def export_graph(self):
         path, _ = QFileDialog.getSaveFileName(self, "Save Graph", "graph.png", "PNG Files (*.png)")
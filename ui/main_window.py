@@ -1,15 +1,14 @@
 from PyQt5.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QPushButton,
-    QLineEdit, QLabel, QGridLayout, QShortcut
+    QLineEdit, QLabel, QGridLayout, QShortcut, QSpinBox
 )
 from PyQt5.QtCore import Qt, QTimer
 from PyQt5.QtGui import QIcon, QFont, QKeySequence
 from ui.themes import dark_theme, light_theme
-from logic.solver import evaluate_expression
+from logic.numeric import compile_cached
+from logic.voice_grammar import parse_utterance
+from ui.evaluation_service import EvaluationService
 import math
-import speech_recognition as sr
-from ui.graph_view import GraphView
-from ui.unit_converter import UnitConverterView
 
 
 class CalculatorWindow(QWidget):
@@ -23,6 +22,12 @@ class CalculatorWindow(QWidget):
         self.scientific_visible = False
         self.voice_mode_active = False
         self.external_input = input_field
+        self.evaluator = EvaluationService(parent=self)
+        self.evaluator.finished.connect(self.on_evaluation_finished)
+        self.current_request = None
+        self.result_prefix = ""
+        self.voice_pipeline = None
+        self.warmed_up = False
         self.init_ui()
         self.setup_shortcuts()
 
@@ -40,6 +45,15 @@ class CalculatorWindow(QWidget):
         self.result_label.setFont(QFont("Arial", 11))
         self.layout.addWidget(self.result_label)
 
+        precision_row = QHBoxLayout()
+        precision_row.addWidget(QLabel("Precision (digits):"))
+        self.precision_box = QSpinBox()
+        self.precision_box.setRange(1, 1000)
+        self.precision_box.setValue(15)
+        precision_row.addWidget(self.precision_box)
+        precision_row.addStretch()
+        self.layout.addLayout(precision_row)
+
         self.keypad_layout = QVBoxLayout()
         self.scientific_layout = QGridLayout()
 
@@ -93,11 +107,21 @@ class CalculatorWindow(QWidget):
         QShortcut(QKeySequence("Ctrl+U"), self, self.open_unit_converter)
         QShortcut(QKeySequence("Ctrl+D"), self, self.toggle_theme)
 
+    def showEvent(self, event):
+        super().showEvent(event)
+        if not self.warmed_up:
+            # Load SymPy on the evaluation thread once the window is up
+            self.warmed_up = True
+            QTimer.singleShot(0, self.evaluator.warm_up)
+
     def open_graph_plotter(self):
+        # matplotlib and the plotting engine load on first use only
+        from ui.graph_view import GraphView
         self.graph_view = GraphView()
         self.graph_view.show()
 
     def open_unit_converter(self):
+        from ui.unit_converter import UnitConverterView
         self.unit_view = UnitConverterView()
         self.unit_view.show()
 
@@ -117,8 +141,7 @@ class CalculatorWindow(QWidget):
             self.expression = self.expression[:-1]
         elif key in (Qt.Key_Enter, Qt.Key_Return):
             safe_expr = self.format_expression(self.expression)
-            result = evaluate_expression(safe_expr)
-            self.result_label.setText(result)
+            self.start_evaluation(safe_expr)
             if self.external_input:
                 self.external_input.setText(self.expression)
         elif key == Qt.Key_Escape:
@@ -185,8 +208,7 @@ class CalculatorWindow(QWidget):
             while self.expression.count('(') > self.expression.count(')'):
                 self.expression += ')'
             safe_expr = self.format_expression(self.expression)
-            result = evaluate_expression(safe_expr)
-            self.result_label.setText(result)
+            self.start_evaluation(safe_expr)
             if self.external_input:
                 self.external_input.setText(self.expression)
         elif button_text == ')':
@@ -217,6 +239,17 @@ class CalculatorWindow(QWidget):
         self.display.setText(self.expression)
         self.validate_expression()
 
+    def start_evaluation(self, expr, prefix=""):
+        # Evaluated on the service's worker thread; the result arrives via on_evaluation_finished
+        self.result_prefix = prefix
+        self.current_request = self.evaluator.submit(expr, precision=self.precision_box.value())
+        self.result_label.setText("Evaluating...")
+
+    def on_evaluation_finished(self, request_id, result):
+        if request_id == self.current_request:
+            self.result_label.setText(self.result_prefix + result)
+            self.current_request = None
+
     def format_expression(self, expr):
         formatted = ""
         prev = ""
@@ -229,11 +262,11 @@ class CalculatorWindow(QWidget):
         return formatted.replace('×', '*').replace('÷', '/')
 
     def validate_expression(self):
-        try:
-            expr = self.format_expression(self.expression)
-            compile(expr, "<string>", "eval")
+        # Same parser the numeric engine evaluates with, so π, √, ^ and n! validate too
+        expr = self.format_expression(self.expression)
+        if compile_cached(expr) is not None:
             self.display.setStyleSheet("color: black; background-color: white;" if not self.is_dark_mode else "color: white; background-color: #222222;")
-        except:
+        else:
             self.display.setStyleSheet("color: red; background-color: #fff;" if not self.is_dark_mode else "color: red; background-color: #222;")
 
     def toggle_theme(self):
@@ -258,59 +291,51 @@ class CalculatorWindow(QWidget):
         self.toggle_sci_btn.setText("Hide Scientific Mode" if self.scientific_visible else "Show Scientific Mode")
 
     def voice_to_expression(self, voice_text):
-        voice_text = voice_text.lower()
-        replacements = {
-            "x": "*", "times": "*", "into": "*", "plus": "+", "minus": "-",
-            "divide": "/", "mod": "%", "power": "**",
-            "open bracket": "(", "close bracket": ")"
-        }
-        for word, symbol in replacements.items():
-            voice_text = voice_text.replace(word, symbol)
-        return voice_text
+        return parse_utterance(voice_text).expression
 
     def voice_input(self):
+        # Capture and recognition run on the pipeline's threads; we only react to signals
+        if self.voice_pipeline is None:
+            from ui.voice_pipeline import VoicePipeline  # speech_recognition is only needed here
+            self.voice_pipeline = VoicePipeline(parent=self)
+            self.voice_pipeline.recognized.connect(self.handle_voice_command)
+            self.voice_pipeline.status.connect(self.on_voice_status)
+        self.voice_pipeline.start()
+
+    def on_voice_status(self, text):
+        # Listening progress goes on the button so it never hides the last result
+        if text.endswith("..."):
+            if self.voice_mode_active:
+                self.voice_toggle_btn.setText(f"🛑 Stop Voice Mode ({text.rstrip('.')})")
+        else:
+            self.result_label.setText(text)
+
+    def handle_voice_command(self, command):
         if not self.voice_mode_active:
             return
-
-        recognizer = sr.Recognizer()
-        try:
-            with sr.Microphone() as source:
-                self.result_label.setText("Listening...")
-                audio = recognizer.listen(source, timeout=5)
-                command = recognizer.recognize_google(audio).lower()
-                self.result_label.setText("Recognized: " + command)
-
-                if "stop voice" in command:
-                    self.voice_mode_active = False
-                    self.voice_toggle_btn.setText("🎤 Start Voice Mode")
-                    return
-                elif "scientific" in command:
-                    self.toggle_scientific()
-                elif "graph" in command:
-                    self.open_graph_plotter()
-                elif "unit" in command:
-                    self.open_unit_converter()
-                elif "dark mode" in command:
-                    if not self.is_dark_mode:
-                        self.toggle_theme()
-                elif "light mode" in command:
-                    if self.is_dark_mode:
-                        self.toggle_theme()
-                else:
-                    self.expression = self.voice_to_expression(command)
-                    self.display.setText(self.expression)
-                    result = evaluate_expression(self.format_expression(self.expression))
-                    self.result_label.setText("Result: " + result)
-
-        except sr.UnknownValueError:
-            self.result_label.setText("Could not understand audio")
-        except sr.RequestError:
-            self.result_label.setText("Speech service unavailable")
-        except Exception as e:
-            self.result_label.setText(f"Error: {str(e)}")
-
-        if self.voice_mode_active:
-            QTimer.singleShot(1000, self.voice_input)
+        self.result_label.setText("Recognized: " + command)
+        parsed = parse_utterance(command)
+
+        if parsed.command == "stop_voice":
+            self.voice_mode_active = False
+            self.voice_toggle_btn.setText("🎤 Start Voice Mode")
+            self.voice_pipeline.stop()
+        elif parsed.command == "scientific":
+            self.toggle_scientific()
+        elif parsed.command == "graph":
+            self.open_graph_plotter()
+        elif parsed.command == "unit":
+            self.open_unit_converter()
+        elif parsed.command == "dark_mode":
+            if not self.is_dark_mode:
+                self.toggle_theme()
+        elif parsed.command == "light_mode":
+            if self.is_dark_mode:
+                self.toggle_theme()
+        elif parsed.expression:
+            self.expression = parsed.expression
+            self.display.setText(self.expression)
+            self.start_evaluation(self.format_expression(self.expression), prefix="Result: ")
 
     def toggle_voice_mode(self):
         self.voice_mode_active = not self.voice_mode_active
@@ -318,4 +343,6 @@ class CalculatorWindow(QWidget):
             self.voice_toggle_btn.setText("🛑 Stop Voice Mode")
             self.voice_input()
         else:
-            self.voice_toggle_btn.setText("🎤 Start Voice Mode")
\ No newline at end of file
+            self.voice_toggle_btn.setText("🎤 Start Voice Mode")
+            if self.voice_pipeline is not None:
+                self.voice_pipeline.stop()
\ No newline at end of file
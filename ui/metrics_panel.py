@@ -0,0 +1,81 @@
+from PyQt5.QtWidgets import (
+    QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QCheckBox,
+    QPlainTextEdit, QFileDialog
+)
+from PyQt5.QtCore import QTimer
+from PyQt5.QtGui import QFont
+
+from logic import metrics
+
+
+class MetricsPanel(QWidget):
+    """
+    Debug panel for logic.metrics: turns recording on and off, shows
+    per-stage timings and event counts (refreshed while visible), and exports
+    a JSON or Prometheus snapshot.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+
+        controls = QHBoxLayout()
+        self.record_box = QCheckBox("Record evaluation metrics")
+        self.record_box.setChecked(metrics.enabled)
+        self.record_box.toggled.connect(metrics.enable)
+        controls.addWidget(self.record_box)
+        controls.addStretch()
+
+        reset_btn = QPushButton("Reset")
+        reset_btn.clicked.connect(self.reset)
+        controls.addWidget(reset_btn)
+
+        export_btn = QPushButton("Export...")
+        export_btn.clicked.connect(self.export)
+        controls.addWidget(export_btn)
+        layout.addLayout(controls)
+
+        self.view = QPlainTextEdit()
+        self.view.setReadOnly(True)
+        self.view.setFont(QFont("Consolas", 9))
+        self.view.setFixedHeight(160)
+        layout.addWidget(self.view)
+
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.setInterval(1000)
+        self.refresh_timer.timeout.connect(self.refresh)
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.refresh()
+        self.refresh_timer.start()
+
+    def hideEvent(self, event):
+        super().hideEvent(event)
+        self.refresh_timer.stop()
+
+    def reset(self):
+        metrics.reset()
+        self.refresh()
+
+    def refresh(self):
+        data = metrics.snapshot()
+        lines = [f"{'stage':<14}{'count':>8}{'mean ms':>11}{'max ms':>11}{'total ms':>12}"]
+        for name, stage in data['stages'].items():
+            lines.append(
+                f"{name:<14}{stage['count']:>8}{stage['mean_ms']:>11.3f}"
+                f"{stage['max_ms']:>11.3f}{stage['total_ms']:>12.1f}"
+            )
+        counters = ", ".join(f"{name}={count}" for name, count in data['counters'].items())
+        lines.append("")
+        lines.append(counters or "No evaluations recorded yet.")
+        lines.append(f"fallback rate {data['fallback_rate']:.1%}   error rate {data['error_rate']:.1%}")
+        self.view.setPlainText("\n".join(lines))
+
+    def export(self):
+        path, _ = QFileDialog.getSaveFileName(
+            self, "Export Metrics", "metrics.prom", "Prometheus (*.prom *.txt);;JSON (*.json)"
+        )
+        if path:
+            metrics.write(path)
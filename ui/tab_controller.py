@@ -6,14 +6,42 @@ from PyQt5.QtGui import QIcon, QFont, QKeySequence
 from PyQt5.QtCore import Qt
 
 from ui.main_window import CalculatorWindow
-from ui.graph_view import GraphView
-from ui.unit_converter import UnitConverterView  # ✅ FIXED: Correct class name
 
 import sys
 
 
+def build_graph_view():
+    from ui.graph_view import GraphView  # matplotlib + SymPy, loaded on first visit
+    return GraphView()
+
+
+def build_unit_converter():
+    from ui.unit_converter import UnitConverterView
+    return UnitConverterView()
+
+
+class LazyTab(QWidget):
+    """
+    Tab page that builds its real view the first time the tab is activated,
+    keeping heavy views out of the first paint.
+    """
+
+    def __init__(self, factory, parent=None):
+        super().__init__(parent)
+        self.factory = factory
+        self.view = None
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+
+    def ensure_built(self):
+        if self.view is None:
+            self.view = self.factory()
+            self.layout().addWidget(self.view)
+        return self.view
+
+
 class AdvancedCalculator(QWidget):
-    def __init__(self):
+    def __init__(self, deferred_tabs=True):
         super().__init__()
         self.setWindowTitle("🧠 Futuristic Engineering Calculator")
         self.setGeometry(100, 100, 960, 720)
@@ -27,7 +55,12 @@ class AdvancedCalculator(QWidget):
         self.theme_btn = QPushButton("🌙 Switch to Dark Mode")
         self.theme_btn.setFixedHeight(35)
         self.theme_btn.clicked.connect(self.toggle_theme)
+        self.metrics_btn = QPushButton("📊 Metrics")
+        self.metrics_btn.setFixedHeight(35)
+        self.metrics_btn.setToolTip("Evaluation timing debug panel (Ctrl+Shift+M)")
+        self.metrics_btn.clicked.connect(self.toggle_metrics_panel)
         top_bar.addStretch()
+        top_bar.addWidget(self.metrics_btn)
         top_bar.addWidget(self.theme_btn)
         main_layout.addLayout(top_bar)
 
@@ -70,15 +103,23 @@ class AdvancedCalculator(QWidget):
 
         # Child tabs
         self.calculator_tab = CalculatorWindow(self.input_field)
-        self.graph_tab = GraphView()
-        self.unit_tab = UnitConverterView()
+        self.graph_tab = LazyTab(build_graph_view)
+        self.unit_tab = LazyTab(build_unit_converter)
 
         self.tabs.addTab(self.calculator_tab, QIcon(), "🧮 Calculator")
         self.tabs.addTab(self.graph_tab, QIcon(), "📈 Graph Plotter")
         self.tabs.addTab(self.unit_tab, QIcon(), "🔁 Unit Converter")
+        self.tabs.currentChanged.connect(self.on_tab_changed)
+        if not deferred_tabs:
+            self.graph_tab.ensure_built()
+            self.unit_tab.ensure_built()
 
         main_layout.addWidget(self.tabs)
 
+        # Debug panel for solver metrics, built on first use
+        self.metrics_panel = None
+        self.main_layout = main_layout
+
         # Quick Math Shortcuts
         quick_math_layout = QHBoxLayout()
         quick_math_label = QLabel("Quick Functions:")
@@ -110,6 +151,20 @@ class AdvancedCalculator(QWidget):
         # Keyboard shortcut for Enter = evaluate
         QShortcut(QKeySequence(Qt.Key_Return), self, self.evaluate_input_expression)
         QShortcut(QKeySequence(Qt.Key_Enter), self, self.evaluate_input_expression)
+        QShortcut(QKeySequence("Ctrl+Shift+M"), self, self.toggle_metrics_panel)
+
+    def on_tab_changed(self, index):
+        page = self.tabs.widget(index)
+        if isinstance(page, LazyTab):
+            page.ensure_built()
+
+    def toggle_metrics_panel(self):
+        if self.metrics_panel is None:
+            from ui.metrics_panel import MetricsPanel
+            self.metrics_panel = MetricsPanel(self)
+            self.metrics_panel.setVisible(False)
+            self.main_layout.insertWidget(self.main_layout.indexOf(self.tabs) + 1, self.metrics_panel)
+        self.metrics_panel.setVisible(not self.metrics_panel.isVisible())
 
     def insert_function(self, func_text):
         try:
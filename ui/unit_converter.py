@@ -5,6 +5,8 @@ from PyQt5.QtWidgets import (
 from PyQt5.QtCore import Qt
 from PyQt5.QtGui import QFont
 
+from logic.units import CATEGORIES, UnitError, convert
+
 
 class UnitConverterView(QWidget):
     def __init__(self):
@@ -27,11 +29,7 @@ class UnitConverterView(QWidget):
 
         # Category Dropdown
         self.category_box = QComboBox()
-        self.units = {
-            "Length": ["cm", "m", "inch", "ft"],
-            "Temperature": ["C", "F", "K"],
-            "Weight": ["kg", "g", "lb"]
-        }
+        self.units = CATEGORIES
         self.category_box.addItems(self.units.keys())
         self.category_box.currentTextChanged.connect(self.update_units)
         layout.addWidget(self.category_box)
@@ -78,64 +76,14 @@ class UnitConverterView(QWidget):
             value = float(value_text)
             from_u = self.from_unit.currentText()
             to_u = self.to_unit.currentText()
-            category = self.category_box.currentText()
-
-            if category == "Length":
-                result = self.convert_length(value, from_u, to_u)
-            elif category == "Temperature":
-                result = self.convert_temperature(value, from_u, to_u)
-            elif category == "Weight":
-                result = self.convert_weight(value, from_u, to_u)
-            else:
-                self.result_label.setText("Invalid category.")
-                return
-
-            self.result_label.setText(f"Result: {result} {to_u}")
+            result = convert(value, from_u, to_u)
+            self.result_label.setText(f"Result: {result:.10g} {to_u}")
 
+        except UnitError as e:
+            self.result_label.setText(f"❌ Error: {str(e)}")
         except ValueError:
             self.result_label.setText("Invalid input. Enter a number.")
 
-    def convert_length(self, value, from_u, to_u):
-        conversions = {
-            "cm": 0.01,
-            "m": 1.0,
-            "inch": 0.0254,
-            "ft": 0.3048
-        }
-        meters = value * conversions[from_u]
-        return round(meters / conversions[to_u], 4)
-
-    def convert_temperature(self, value, from_u, to_u):
-        if from_u == to_u:
-            return round(value, 2)
-
-        # Convert to Celsius
-        if from_u == "C":
-            temp_c = value
-        elif from_u == "F":
-            temp_c = (value - 32) * 5 / 9
-        elif from_u == "K":
-            temp_c = value - 273.15
-        else:
-            return "Unsupported unit"
-
-        # Convert from Celsius to target
-        if to_u == "C":
-            return round(temp_c, 2)
-        elif to_u == "F":
-            return round((temp_c * 9 / 5) + 32, 2)
-        elif to_u == "K":
-            return round(temp_c + 273.15, 2)
-
-    def convert_weight(self, value, from_u, to_u):
-        conversions = {
-            "kg": 1.0,
-            "g": 0.001,
-            "lb": 0.453592
-        }
-        kg = value * conversions[from_u]
-        return round(kg / conversions[to_u], 4)
-
 
 # Testing standalone
 if __name__ == '__main__':
@@ -0,0 +1,161 @@
+import queue
+import threading
+
+import speech_recognition as sr
+from PyQt5.QtCore import QObject, pyqtSignal
+
+
+def google_recognizer(recognizer, audio):
+    return recognizer.recognize_google(audio)
+
+
+def sphinx_recognizer(recognizer, audio):
+    # Offline: needs the pocketsphinx package
+    return recognizer.recognize_sphinx(audio)
+
+
+def microphone_source():
+    return sr.Microphone()
+
+
+def wav_sources(paths):
+    """
+    Source factory that replays recorded WAV files in order, one utterance
+    per file; handy for running the pipeline without a microphone.
+    """
+    def factory():
+        return [sr.AudioFile(path) for path in paths]
+    return factory
+
+
+class VoicePipeline(QObject):
+    """
+    Streaming voice input that never touches the GUI thread.
+
+    A capture thread calibrates for ambient noise once, then keeps listening
+    and pushes each utterance into a small bounded queue (dropping the oldest
+    clip if recognition falls behind). A recognition thread drains the queue
+    and emits recognized(text) for every command. Progress and failures are
+    reported through status(text).
+
+    The recognizer is pluggable: any callable (recognizer, audio) -> str,
+    e.g. sphinx_recognizer for offline use. source_factory returns either a
+    live source (default: the microphone) or a list of sr.AudioFile clips.
+    """
+
+    recognized = pyqtSignal(str)
+    status = pyqtSignal(str)
+    stopped = pyqtSignal()
+
+    def __init__(self, recognize=google_recognizer, source_factory=microphone_source,
+                 listen_timeout=5, phrase_time_limit=8, queue_size=4, parent=None):
+        super().__init__(parent)
+        self.recognize = recognize
+        self.source_factory = source_factory
+        self.listen_timeout = listen_timeout
+        self.phrase_time_limit = phrase_time_limit
+        self.recognizer = sr.Recognizer()
+        self.queue_size = queue_size
+        self.audio_queue = queue.Queue(maxsize=queue_size)
+        self.stop_event = threading.Event()
+        self.threads = []
+        self.calibrated = False
+
+    def is_running(self):
+        return any(thread.is_alive() for thread in self.threads) and not self.stop_event.is_set()
+
+    def start(self):
+        """
+        Starts a fresh capture/recognition pair with its own stop event and
+        queue. Threads from an earlier run may still be blocked in listen();
+        they see their own (set) event and exit on their own, and the new
+        capture thread waits for the old one to release the source first, so
+        toggling off and on again never blocks the GUI or loses the restart.
+        """
+        if self.is_running():
+            return
+        previous = self.threads[0] if self.threads else None
+        self.stop_event = threading.Event()
+        self.audio_queue = queue.Queue(maxsize=self.queue_size)
+        run = (self.stop_event, self.audio_queue)
+        self.threads = [
+            threading.Thread(target=self.capture_loop, args=run + (previous,), name="voice-capture", daemon=True),
+            threading.Thread(target=self.recognition_loop, args=run, name="voice-recognition", daemon=True),
+        ]
+        for thread in self.threads:
+            thread.start()
+
+    def stop(self, wait=False):
+        self.stop_event.set()
+        if wait:
+            for thread in self.threads:
+                thread.join(timeout=self.listen_timeout + 1)
+
+    @staticmethod
+    def enqueue(audio_queue, audio):
+        # Bounded queue: prefer fresh commands over a backlog of stale ones
+        while True:
+            try:
+                audio_queue.put_nowait(audio)
+                return
+            except queue.Full:
+                try:
+                    audio_queue.get_nowait()
+                except queue.Empty:
+                    pass
+
+    def capture_loop(self, stop_event, audio_queue, previous=None):
+        try:
+            if previous is not None:
+                previous.join()  # one listener per source at a time
+                if stop_event.is_set():
+                    return
+            source = self.source_factory()
+            if isinstance(source, list):
+                for clip in source:
+                    if stop_event.is_set():
+                        break
+                    with clip as opened:
+                        self.enqueue(audio_queue, self.recognizer.record(opened))
+                return
+
+            with source as opened:
+                if not self.calibrated:
+                    self.status.emit("Calibrating microphone...")
+                    self.recognizer.adjust_for_ambient_noise(opened, duration=0.5)
+                    self.calibrated = True
+                while not stop_event.is_set():
+                    self.status.emit("Listening...")
+                    try:
+                        audio = self.recognizer.listen(
+                            opened, timeout=self.listen_timeout, phrase_time_limit=self.phrase_time_limit
+                        )
+                    except sr.WaitTimeoutError:
+                        continue
+                    self.enqueue(audio_queue, audio)
+        except Exception as e:
+            self.status.emit(f"Error: {str(e)}")
+        finally:
+            self.enqueue(audio_queue, None)  # wake the recognizer so it can exit
+
+    def recognition_loop(self, stop_event, audio_queue):
+        while True:
+            audio = audio_queue.get()
+            if audio is None:
+                break
+            if stop_event.is_set():
+                continue
+            try:
+                text = self.recognize(self.recognizer, audio).lower()
+            except sr.UnknownValueError:
+                self.status.emit("Could not understand audio")
+                continue
+            except sr.RequestError:
+                self.status.emit("Speech service unavailable")
+                continue
+            except Exception as e:
+                self.status.emit(f"Error: {str(e)}")
+                continue
+            if text:
+                self.recognized.emit(text)
+        self.stopped.emit()